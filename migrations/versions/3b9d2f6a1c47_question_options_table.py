@@ -0,0 +1,76 @@
+"""move quiz question options into question_options table
+
+Revision ID: 3b9d2f6a1c47
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+Options used to be stored as a "|"-joined string on quiz_questions.options.
+Existing rows are backfilled by splitting on "|"; options that already
+contained a "|" were corrupted when they were written and cannot be
+recovered here.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2f6a1c47'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    question_options = op.create_table(
+        'question_options',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('question_id', 'position', name='uq_question_options_question_position'),
+    )
+    op.create_index(op.f('ix_question_options_id'), 'question_options', ['id'], unique=False)
+    op.create_index(op.f('ix_question_options_question_id'), 'question_options', ['question_id'], unique=False)
+
+    # Backfill from the legacy pipe-joined column
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, options FROM quiz_questions")).fetchall()
+    backfill = [
+        {"question_id": question_id, "position": position, "text": text}
+        for question_id, options in rows
+        for position, text in enumerate((options or "").split("|"))
+        if options
+    ]
+    if backfill:
+        op.bulk_insert(question_options, backfill)
+
+    with op.batch_alter_table('quiz_questions') as batch_op:
+        batch_op.drop_column('options')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('quiz_questions') as batch_op:
+        batch_op.add_column(sa.Column('options', sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT question_id, text FROM question_options ORDER BY question_id, position"
+    )).fetchall()
+    joined: dict[int, list[str]] = {}
+    for question_id, text in rows:
+        joined.setdefault(question_id, []).append(text)
+    for question_id, texts in joined.items():
+        conn.execute(
+            sa.text("UPDATE quiz_questions SET options = :options WHERE id = :id"),
+            {"options": "|".join(texts), "id": question_id},
+        )
+
+    op.drop_index(op.f('ix_question_options_question_id'), table_name='question_options')
+    op.drop_index(op.f('ix_question_options_id'), table_name='question_options')
+    op.drop_table('question_options')
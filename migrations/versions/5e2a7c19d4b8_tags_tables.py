@@ -0,0 +1,49 @@
+"""add tags and question_tags tables
+
+Revision ID: 5e2a7c19d4b8
+Revises: 8c41e7d09a3f
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a7c19d4b8'
+down_revision: Union[str, Sequence[str], None] = '8c41e7d09a3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_tags_name'), 'tags', ['name'], unique=True)
+
+    op.create_table(
+        'question_tags',
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('question_id', 'tag_id'),
+    )
+    op.create_index('ix_question_tags_tag_id_question_id', 'question_tags', ['tag_id', 'question_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_question_tags_tag_id_question_id', table_name='question_tags')
+    op.drop_table('question_tags')
+    op.drop_index(op.f('ix_tags_name'), table_name='tags')
+    op.drop_table('tags')
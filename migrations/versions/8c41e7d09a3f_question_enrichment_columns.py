@@ -0,0 +1,37 @@
+"""store per-question explanation and confidence
+
+Revision ID: 8c41e7d09a3f
+Revises: 3b9d2f6a1c47
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e7d09a3f'
+down_revision: Union[str, Sequence[str], None] = '3b9d2f6a1c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('quiz_questions') as batch_op:
+        batch_op.add_column(sa.Column('explanation', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('enrichment_hash', sa.String(length=64), nullable=True))
+        batch_op.alter_column('confidence', existing_type=sa.Integer(), type_=sa.Float(), existing_nullable=True)
+
+    # The old value was a hard-coded placeholder, not an estimate
+    op.execute("UPDATE quiz_questions SET confidence = NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('quiz_questions') as batch_op:
+        batch_op.alter_column('confidence', existing_type=sa.Float(), type_=sa.Integer(), existing_nullable=True)
+        batch_op.drop_column('enrichment_hash')
+        batch_op.drop_column('explanation')
@@ -0,0 +1,38 @@
+"""add content-addressed library columns to quizzes
+
+Revision ID: a71f3c85e2d6
+Revises: 5e2a7c19d4b8
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71f3c85e2d6'
+down_revision: Union[str, Sequence[str], None] = '5e2a7c19d4b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.add_column(sa.Column('library_key', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('generation_payload', sa.Text(), nullable=True))
+        batch_op.alter_column('user_id', existing_type=sa.String(), nullable=True)
+        batch_op.create_index(batch_op.f('ix_quizzes_library_key'), ['library_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Library quizzes have no owner and cannot satisfy the NOT NULL constraint
+    op.execute("DELETE FROM quizzes WHERE user_id IS NULL")
+    with op.batch_alter_table('quizzes') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_quizzes_library_key'))
+        batch_op.alter_column('user_id', existing_type=sa.String(), nullable=False)
+        batch_op.drop_column('generation_payload')
+        batch_op.drop_column('library_key')
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Latency of local (LLM-free) cloze quizzes, the ``mode=local`` path.
+
+Articles are assembled from the hand-labeled paragraphs in
+``data/topic_eval.jsonl``. For each quiz type the benchmark reports the
+wall time per quiz (including the first ``analyze`` of each article) and how
+many of the requested questions were produced.
+
+Usage:
+    python smart_quiz_api/benchmarks/bench_cloze_generation.py [--articles 200] [--questions 10]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.services.quiz_library import questions_from_text
+from smart_quiz_api.services.scraper_services.cloze_generator import generate_cloze
+
+PARAGRAPHS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "topic_eval.jsonl")
+
+
+def build_articles(count: int) -> List[str]:
+    with open(PARAGRAPHS, encoding="utf-8") as f:
+        paragraphs = [json.loads(line)["text"] for line in f if line.strip()]
+    rng = random.Random(42)
+    # A trailing article number keeps every text distinct, so no analysis is memoized across articles
+    return [" ".join(rng.choices(paragraphs, k=rng.randint(6, 16))) + f" Article {n}." for n in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"🕳️  {args.articles} articles, {args.questions} questions per quiz")
+    for quiz_type in ("MCQ", "TF"):
+        articles = build_articles(args.articles)
+        wall, produced = [], []
+        for text in articles:
+            start = time.perf_counter()
+            quiz = generate_cloze(text, quiz_type, args.questions)
+            wall.append(time.perf_counter() - start)
+            produced.append(len(questions_from_text(quiz)) if quiz else 0)
+        wall.sort()
+        print(f"{quiz_type:<4} {statistics.mean(wall) * 1000:6.2f} ms/quiz mean, "
+              f"p95 {wall[int(len(wall) * 0.95) - 1] * 1000:6.2f} ms, "
+              f"{statistics.mean(produced):4.1f}/{args.questions} questions")
+
+
+if __name__ == "__main__":
+    main()
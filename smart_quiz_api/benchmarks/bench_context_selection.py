@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Prompt content: article prefix snippet vs salience-based context selection.
+
+Articles are assembled from the hand-labeled paragraphs in
+``data/topic_eval.jsonl``, each opened by a few boilerplate lines (share
+buttons, byline, timestamp) as scraped pages often are. For both prompt
+contents the benchmark reports the tokens sent, how many of the article's
+top keywords they cover, and the CPU time of the selection.
+
+Tokens are counted with the model's tokenizer when tiktoken can load it,
+otherwise estimated from length.
+
+Usage:
+    python smart_quiz_api/benchmarks/bench_context_selection.py [--articles 200] [--budget 300]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.constants import DEFAULT_MODEL
+from smart_quiz_api.services.openai_service import estimate_tokens
+from smart_quiz_api.services.scraper_services.context_selector import KEYWORDS, select_context
+from smart_quiz_api.services.scraper_services.quiz_generator import make_snippet
+from smart_quiz_api.utils.text_analysis import analyze
+from smart_quiz_api.utils.text_utils import extract_keywords
+
+PARAGRAPHS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "topic_eval.jsonl")
+BOILERPLATE = [
+    "Share this article on Facebook, Twitter or by email.",
+    "Subscribe to our newsletter.",
+    "By Staff Writer.",
+    "Updated 3 hours ago.",
+    "Advertisement.",
+    "Sign up for our daily briefing and get the top stories in your inbox every morning.",
+]
+
+
+def build_articles(count: int) -> List[str]:
+    with open(PARAGRAPHS, encoding="utf-8") as f:
+        paragraphs = [json.loads(line)["text"] for line in f if line.strip()]
+    rng = random.Random(42)
+    return [
+        " ".join(rng.sample(BOILERPLATE, 3) + rng.choices(paragraphs, k=rng.randint(6, 16)))
+        for _ in range(count)
+    ]
+
+
+def coverage(content: str, keywords: List[str]) -> float:
+    words = set(analyze(content).words)
+    return sum(keyword in words for keyword in keywords) / len(keywords)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=300, help="Context token budget")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    snippet_tokens, context_tokens, snippet_cover, context_cover, cpu = [], [], [], [], []
+    for text in build_articles(args.articles):
+        keywords = extract_keywords(text, KEYWORDS)
+        snippet = make_snippet(text)
+        start = time.process_time()
+        selection = select_context(text, args.budget, DEFAULT_MODEL, snippet)
+        cpu.append(time.process_time() - start)
+        snippet_tokens.append(estimate_tokens(snippet, DEFAULT_MODEL))
+        context_tokens.append(selection.tokens)
+        snippet_cover.append(coverage(snippet, keywords))
+        context_cover.append(coverage(selection.text, keywords))
+
+    print(f"✂️  {args.articles} articles, context budget {args.budget} tokens")
+    print(f"prefix snippet:    {statistics.mean(snippet_tokens):6.1f} tokens, "
+          f"{statistics.mean(snippet_cover):.0%} of top-{KEYWORDS} keywords")
+    print(f"selected context:  {statistics.mean(context_tokens):6.1f} tokens, "
+          f"{statistics.mean(context_cover):.0%} of top-{KEYWORDS} keywords")
+    print(f"tokens saved:      {statistics.mean(snippet_tokens) - statistics.mean(context_tokens):6.1f} per request "
+          f"({1 - sum(context_tokens) / sum(snippet_tokens):.0%})")
+    print(f"selection CPU:     {statistics.mean(cpu) * 1000:6.2f} ms/article")
+
+
+if __name__ == "__main__":
+    main()
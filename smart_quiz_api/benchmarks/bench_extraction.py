@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Corpus benchmark: per-article extraction time and output parity.
+
+Compares the readability path of ``extract_clean_text`` (readability ->
+BeautifulSoup, BeautifulSoup fallback) with the single-parse lxml engine.
+Parity is reported as the word-level similarity of the two outputs
+(``difflib.SequenceMatcher`` ratio, 1.0 = identical).
+
+By default a synthetic corpus of news/blog/docs-style pages with navigation,
+sidebars, comments and footers is generated. Point ``--corpus`` at a
+directory of saved ``*.html`` pages to run on real articles.
+
+Usage:
+    python smart_quiz_api/benchmarks/bench_extraction.py [--articles 60] [--corpus DIR]
+"""
+
+import argparse
+import difflib
+import glob
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.services.scraper_services.text_cleaner import extract_clean_text
+
+WORDS = (
+    "energy climate ocean river mountain forest history science economy market policy government "
+    "research student teacher language culture music theatre painting engine software network data "
+    "planet orbit galaxy cell protein gene species habitat migration harvest trade empire revolution"
+).split()
+
+
+def sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 22))]
+    if rng.random() < 0.5:
+        words.insert(rng.randint(1, len(words) - 1), ",")
+    return (" ".join(words).replace(" ,", ",") + ".").capitalize()
+
+
+def paragraph(rng: random.Random) -> str:
+    return " ".join(sentence(rng) for _ in range(rng.randint(3, 7)))
+
+
+def synthetic_article(rng: random.Random, index: int) -> str:
+    layout = index % 3
+    links = "".join(f'<li><a href="/s/{i}">{rng.choice(WORDS).title()} section</a></li>' for i in range(12))
+    body = "".join(f"<p>{paragraph(rng)}</p>" for _ in range(rng.randint(5, 14)))
+    comments = "".join(
+        f'<div class="comment"><p>{sentence(rng)}</p><a href="/u/{i}">reply</a></div>' for i in range(rng.randint(0, 8))
+    )
+    related = "".join(f'<a href="/r/{i}">{sentence(rng)}</a><br>' for i in range(6))
+    head = (
+        f"<head><title>Article {index}</title><style>body{{margin:0}}</style>"
+        f"<script>window.dataLayer=[{{'id':{index}}}];</script></head>"
+    )
+    chrome_top = f'<header class="masthead"><h1>Site</h1></header><nav class="menu"><ul>{links}</ul></nav>'
+    chrome_bottom = f'<footer><p>Copyright {2000 + index % 25}, all rights reserved, terms and privacy.</p></footer>'
+    if layout == 0:  # news
+        main = (
+            f'<div class="page"><article class="story"><h2>{sentence(rng)}</h2>{body}</article>'
+            f'<aside class="sidebar"><h3>Related</h3>{related}</aside>'
+            f'<section class="comments">{comments}</section></div>'
+        )
+    elif layout == 1:  # blog with div soup
+        main = (
+            f'<div id="wrapper"><div id="main"><div class="post-content">{body}</div>'
+            f'<div class="share-widget">{related}</div></div>'
+            f'<div class="sidebar-widgets">{links}</div><div id="comments">{comments}</div></div>'
+        )
+    else:  # docs with a table
+        rows = "".join(f"<tr><td>{sentence(rng)}</td><td>{rng.randint(1, 99)}</td></tr>" for _ in range(5))
+        main = (
+            f'<main><div class="doc-body"><h2>Guide</h2>{body}<table>{rows}</table>'
+            f'<pre>def example():\n    return {index}</pre></div></main>'
+        )
+    return f"<!DOCTYPE html><html>{head}<body>{chrome_top}{main}{chrome_bottom}</body></html>"
+
+
+def load_corpus(directory: Optional[str], count: int) -> List[str]:
+    if directory:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.html")))[:count]:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+        return pages
+    rng = random.Random(42)
+    return [synthetic_article(rng, i) for i in range(count)]
+
+
+def run(extract: Callable[[str], str], html: str) -> Tuple[float, Optional[str]]:
+    start = time.perf_counter()
+    try:
+        text: Optional[str] = extract(html)
+    except ValueError:
+        text = None
+    return time.perf_counter() - start, text
+
+
+def p95(times: List[float]) -> float:
+    return sorted(times)[int(len(times) * 0.95) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=60)
+    parser.add_argument("--corpus", help="Directory of saved *.html pages")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    pages = load_corpus(args.corpus, args.articles)
+    if not pages:
+        sys.exit("No pages to benchmark")
+
+    slow_times, fast_times, parity = [], [], []
+    for html in pages:
+        slow_time, slow_text = run(lambda h: extract_clean_text(h, engine="readability"), html)
+        fast_time, fast_text = run(extract_clean_text, html)
+        slow_times.append(slow_time)
+        fast_times.append(fast_time)
+        if slow_text and fast_text:
+            parity.append(difflib.SequenceMatcher(None, slow_text.split(), fast_text.split(), autojunk=False).ratio())
+        else:
+            parity.append(1.0 if slow_text == fast_text else 0.0)
+
+    print(f"📰 {len(pages)} articles ({'corpus ' + args.corpus if args.corpus else 'synthetic'})")
+    print(f"readability path: {statistics.mean(slow_times) * 1000:7.2f} ms/article (p95 {p95(slow_times) * 1000:.2f})")
+    print(f"lxml single-pass: {statistics.mean(fast_times) * 1000:7.2f} ms/article (p95 {p95(fast_times) * 1000:.2f})")
+    print(f"speedup: {statistics.mean(slow_times) / statistics.mean(fast_times):.1f}x")
+    print(f"parity: mean {statistics.mean(parity):.3f}, min {min(parity):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark: article fetch throughput against a local HTTP server.
+
+Starts a keep-alive capable HTTP server on localhost that serves one article
+page per path with an ``ETag``, then compares:
+
+- legacy:     ``requests.get`` per call (new connection each time) + extraction,
+              run in a thread pool of the same concurrency
+- async:      shared pooled ``AsyncArticleFetcher``, first fetch (200 + extraction)
+- revalidate: same fetcher again; every page answers 304 and the stored text is reused
+
+Usage:
+    python smart_quiz_api/benchmarks/bench_fetcher.py [--pages 200] [--concurrency 16] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import requests
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.services.scraper_services.async_fetcher import AsyncArticleFetcher, ValidatorStore
+from smart_quiz_api.services.scraper_services.content_fetcher import HEADERS
+from smart_quiz_api.services.scraper_services.text_cleaner import extract_clean_text
+
+PARAGRAPH = (
+    "The water cycle describes how water evaporates from the surface of the earth, rises into the "
+    "atmosphere, cools and condenses into clouds, and falls again to the surface as precipitation. "
+)
+
+
+def article_html(path: str) -> bytes:
+    body = "".join(f"<p>{PARAGRAPH * 3}</p>" for _ in range(12))
+    return (
+        f"<html><head><title>{path}</title><script>var x = 1;</script></head>"
+        f"<body><nav>Home | About</nav><article><h1>Article {path}</h1>{body}</article>"
+        f"<footer>Footer</footer></body></html>"
+    ).encode("utf-8")
+
+
+def make_handler(latency: float):
+    class ArticleHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Allow keep-alive
+
+        def do_GET(self) -> None:
+            time.sleep(latency)  # Simulated network/server latency
+            body = article_html(self.path)
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    return ArticleHandler
+
+
+def legacy_fetch(url: str) -> str:
+    response = requests.get(url, headers=HEADERS, timeout=15)
+    response.raise_for_status()
+    return extract_clean_text(response.text)
+
+
+def run_legacy(urls: List[str], concurrency: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(legacy_fetch, urls))
+    return time.perf_counter() - start
+
+
+async def run_async(fetcher: AsyncArticleFetcher, urls: List[str], concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(url: str) -> None:
+        async with semaphore:
+            await fetcher.fetch(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(url) for url in urls))
+    return time.perf_counter() - start
+
+
+async def run_pooled(urls: List[str], concurrency: int):
+    fetcher = AsyncArticleFetcher(limit_per_host=concurrency, validators=ValidatorStore(use_redis=False))
+    try:
+        cold = await run_async(fetcher, urls, concurrency)
+        revalidate = await run_async(fetcher, urls, concurrency)
+        result = await fetcher.fetch(urls[0])
+        assert result.not_modified and result.text, "expected a 304 with reused text"
+    finally:
+        await fetcher.close()
+    return cold, revalidate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/article/{i}" for i in range(args.pages)]
+
+    try:
+        legacy = run_legacy(urls, args.concurrency)
+        cold, revalidate = asyncio.run(run_pooled(urls, args.concurrency))
+    finally:
+        server.shutdown()
+
+    print(f"🌐 {args.pages} pages, concurrency {args.concurrency}, {args.latency_ms:g} ms server latency")
+    print(f"legacy     (requests.get per call): {args.pages / legacy:8.1f} pages/s")
+    print(f"async      (pooled, 200 + parse):   {args.pages / cold:8.1f} pages/s")
+    print(f"revalidate (pooled, 304 reuse):     {args.pages / revalidate:8.1f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
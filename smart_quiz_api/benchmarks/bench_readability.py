@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Corpus benchmark: readability engine vs textstat.
+
+Times ``textstat.flesch_kincaid_grade`` against the in-house engine, one
+article at a time and as one batch, and reports how far the in-house
+Flesch-Kincaid grade is from textstat's and how often the resulting
+easy/medium/hard label agrees.
+
+By default articles are assembled from the hand-labeled paragraphs in
+``data/topic_eval.jsonl``, with ``--oov`` of the words swapped for invented
+names: real articles carry names and jargon missing from CMUdict, for which
+textstat falls back to Pyphen. Point ``--corpus`` at a directory of ``*.txt``
+files to run on real articles. textstat needs NLTK's ``cmudict`` corpus;
+both are listed in ``benchmarks/requirements.txt``.
+
+Usage:
+    pip install -r smart_quiz_api/benchmarks/requirements.txt
+    python smart_quiz_api/benchmarks/bench_readability.py [--articles 200] [--oov 0.1] [--corpus DIR]
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.services.scraper_services.readability import score_text, score_texts
+
+try:
+    import textstat  # type: ignore
+except ImportError:
+    sys.exit("textstat is required for the comparison: pip install -r smart_quiz_api/benchmarks/requirements.txt")
+
+PARAGRAPHS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "topic_eval.jsonl")
+
+
+def invented_name(rng: random.Random) -> str:
+    return "".join(rng.choice("bcdfgklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def load_corpus(directory: Optional[str], count: int, oov: float) -> List[str]:
+    if directory:
+        texts = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.txt")))[:count]:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+        return texts
+    with open(PARAGRAPHS, encoding="utf-8") as f:
+        paragraphs = [json.loads(line)["text"] for line in f if line.strip()]
+    rng = random.Random(42)
+    texts = []
+    for _ in range(count):
+        text = "\n\n".join(rng.choices(paragraphs, k=rng.randint(8, 24)))
+        texts.append(" ".join(invented_name(rng) if rng.random() < oov else word for word in text.split(" ")))
+    return texts
+
+
+def label(grade: float) -> str:
+    return "easy" if grade < 6 else "medium" if grade < 10 else "hard"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--oov", type=float, default=0.1, help="Share of words replaced by invented names")
+    parser.add_argument("--corpus", help="Directory of *.txt articles")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    texts = load_corpus(args.corpus, args.articles, args.oov)
+    if not texts:
+        sys.exit("No articles to benchmark")
+
+    # Warm up: textstat loads cmudict on first use
+    textstat.flesch_kincaid_grade("A short warm-up sentence for the dictionary.")
+    score_text("A short warm-up sentence for the engine.")
+
+    start = time.perf_counter()
+    reference = [textstat.flesch_kincaid_grade(text) for text in texts]
+    textstat_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [score_text(text).flesch_kincaid_grade for text in texts]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = [scores.flesch_kincaid_grade for scores in score_texts(texts)]
+    batch_time = time.perf_counter() - start
+
+    assert all(abs(a - b) < 1e-9 for a, b in zip(single, batch)), "batch and single scores differ"
+    errors = [abs(ours - theirs) for ours, theirs in zip(single, reference)]
+    words = sum(len(text.split()) for text in texts)
+    per_article = lambda seconds: seconds / len(texts) * 1000  # noqa: E731
+
+    source = f"corpus {args.corpus}" if args.corpus else "assembled"
+    print(f"📖 {len(texts)} articles, {words / len(texts):.0f} words each ({source})")
+    print(f"textstat FK grade:  {per_article(textstat_time):7.3f} ms/article")
+    print(f"in-house, single:   {per_article(single_time):7.3f} ms/article ({textstat_time / single_time:.1f}x)")
+    print(f"in-house, batch:    {per_article(batch_time):7.3f} ms/article ({textstat_time / batch_time:.1f}x)")
+    print(f"FK grade vs textstat: mean |diff| {statistics.mean(errors):.2f}, max {max(errors):.2f}, "
+          f"within 1.0: {sum(e <= 1.0 for e in errors) / len(errors):.1%}")
+    agreement = sum(label(a) == label(b) for a, b in zip(single, reference)) / len(texts)
+    print(f"difficulty label agreement: {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    main()
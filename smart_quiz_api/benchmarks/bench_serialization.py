@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: serialization time per 100 quizzes.
+
+Compares the old response path (dict -> response_model validation ->
+by-alias dump -> stdlib json) with the fast path in
+``smart_quiz_api.serializers`` (explicit row mapping -> orjson), and checks
+that both produce the same JSON document.
+
+Usage:
+    python smart_quiz_api/benchmarks/bench_serialization.py [--quizzes 100] [--questions 10] [--rounds 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.models.enum import DifficultyEnum, QuestionTypeEnum
+from smart_quiz_api.schema import QuizOut
+from smart_quiz_api.serializers import FastJSONResponse, get_type_adapter, quizzes_to_dto
+
+
+def build_rows(num_quizzes: int, num_questions: int) -> List[Any]:
+    """Build ORM-shaped rows without touching the database."""
+    now = datetime.now(timezone.utc)
+    quizzes: List[Any] = []
+    for quiz_id in range(1, num_quizzes + 1):
+        questions = [
+            SimpleNamespace(
+                id=quiz_id * 1000 + n,
+                question_text=f"Question {n} of quiz {quiz_id}: which option is correct?",
+                options=[
+                    SimpleNamespace(id=quiz_id * 10000 + n * 10 + i, text=text)
+                    for i, text in enumerate(["Option A", "Option B", "Option C", "Option D"])
+                ],
+                correct_answer="Option B",
+                question_type=QuestionTypeEnum.MCQ,
+            )
+            for n in range(num_questions)
+        ]
+        quizzes.append(SimpleNamespace(
+            id=quiz_id,
+            title=f"Quiz {quiz_id}",
+            category="Science",
+            difficulty=DifficultyEnum.MEDIUM,
+            created_at=now,
+            questions=questions,
+        ))
+    return quizzes
+
+
+def legacy_path(rows: List[Any]) -> bytes:
+    """What FastAPI does for ``response_model=List[QuizOut]``: validate, dump by alias, json.dumps."""
+    payload = quizzes_to_dto(rows)
+    adapter = get_type_adapter(List[QuizOut])
+    validated = adapter.validate_python(payload)
+    jsonable = adapter.dump_python(validated, mode="json", by_alias=True)
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows: List[Any]) -> bytes:
+    return FastJSONResponse(quizzes_to_dto(rows)).body
+
+
+def timed(fn: Callable[[List[Any]], bytes], rows: List[Any], rounds: int) -> float:
+    fn(rows)  # warm-up (TypeAdapter construction, imports)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(rows)
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quizzes", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = build_rows(args.quizzes, args.questions)
+    assert json.loads(legacy_path(rows)) == json.loads(fast_path(rows)), "fast path output differs from legacy path"
+
+    legacy = timed(legacy_path, rows, args.rounds)
+    fast = timed(fast_path, rows, args.rounds)
+    per_100 = 100 / args.quizzes
+
+    print(f"📦 {args.quizzes} quizzes x {args.questions} questions, {args.rounds} rounds")
+    print(f"legacy (validate + stdlib json): {legacy * 1000 * per_100:8.2f} ms / 100 quizzes")
+    print(f"fast   (mapping + orjson):       {fast * 1000 * per_100:8.2f} ms / 100 quizzes")
+    print(f"speedup: {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Per-article CPU of the scraper's text bookkeeping: repeated passes vs one
+shared ``TextAnalysis``.
+
+"repeated" replays the tokenization work one URL quiz used to do:
+- the word-count checks in extraction and in ``_build_quiz``;
+- the dedupe fingerprint and SimHash word lists;
+- the topic model's tokens;
+- ``estimate_difficulty``'s checks and the readability tokenization;
+- the character-by-character snippet search;
+- ``extract_keywords`` and ``validate_quiz_text``.
+
+"shared" does the same bookkeeping from one ``analyze(text)``. Syllable
+scoring and hashing are identical in both and are left out.
+
+Usage:
+    python smart_quiz_api/benchmarks/bench_text_analysis.py [--articles 200] [--words 1500]
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Callable, List
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.benchmarks.bench_extraction import paragraph
+from smart_quiz_api.utils.text_analysis import STOP_WORDS, TextAnalysis, tokenize
+
+MIN_SNIPPET, MAX_SNIPPET = 1400, 1600
+
+
+def repeated(text: str) -> None:
+    len(text.split())                                        # extraction: article length check
+    len(text.split())                                        # _build_quiz: length check
+    words = re.findall(r"\w+", text.casefold())              # dedupe: fingerprint
+    words = re.findall(r"\w+", text.casefold())              # dedupe: simhash shingles
+    re.findall(r"[a-z0-9]+", text[:6000].lower())            # topic model
+    word_count = len(text.split())                           # estimate_difficulty: length check
+    sum(len(word) for word in text.split()) / word_count     # estimate_difficulty: fallback stats
+    text.count('.') + text.count('!') + text.count('?')
+    tokenize(text)                                           # readability
+    for end in range(min(len(text), MAX_SNIPPET), MIN_SNIPPET, -1):   # snippet
+        if text[end:end + 1] in ".!?":
+            break
+    words = re.findall(r"\b[a-zA-Z]{3,}\b", text.lower())    # extract_keywords
+    Counter(word for word in words if word not in STOP_WORDS).most_common(10)
+    len(text.split())                                        # validate_quiz_text
+    set(text.lower().split())
+
+
+def shared(text: str) -> None:
+    analysis = TextAnalysis(text)
+    analysis.word_count
+    analysis.words
+    analysis.tokens
+    analysis.last_sentence_end(MIN_SNIPPET + 1, MAX_SNIPPET + 1)
+    analysis.keyword_counts.most_common(10)
+    analysis.unique_word_count
+
+
+def measure(work: Callable[[str], None], texts: List[str]) -> float:
+    start = time.process_time()
+    for text in texts:
+        work(text)
+    return (time.process_time() - start) / len(texts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--words", type=int, default=1500, help="Approximate words per article")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = []
+    for _ in range(args.articles):
+        paragraphs: List[str] = []
+        while sum(len(p.split()) for p in paragraphs) < args.words:
+            paragraphs.append(paragraph(rng))
+        texts.append(" ".join(paragraphs))
+
+    repeated_runs = [measure(repeated, texts) for _ in range(3)]
+    shared_runs = [measure(shared, texts) for _ in range(3)]
+    before, after = statistics.median(repeated_runs), statistics.median(shared_runs)
+    print(f"🧮 {len(texts)} articles of ~{args.words} words")
+    print(f"repeated passes: {before * 1000:.3f} ms CPU/article")
+    print(f"shared analysis: {after * 1000:.3f} ms CPU/article")
+    print(f"saved: {(before - after) * 1000:.3f} ms/article ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
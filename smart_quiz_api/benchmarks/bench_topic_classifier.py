@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of the local topic model.
+
+For each confidence threshold, reports the share of articles the local model
+answers on its own (LLM calls avoided), its accuracy on those articles, and
+its accuracy on the whole corpus. Also reports per-article latency.
+
+The corpus is JSONL with one ``{"text": ..., "topic": ...}`` object per
+line. By default the held-out sample in ``data/topic_holdout.jsonl`` is
+used: it was written after the weights were fixed and never used to tune
+them. ``data/topic_eval.jsonl`` is the sample the weights were tuned on, so
+its numbers are optimistic. Both are 30-odd short hand-written paragraphs;
+point ``--corpus`` at a larger labeled set of real articles for numbers
+worth quoting.
+
+Usage:
+    python smart_quiz_api/benchmarks/bench_topic_classifier.py [--corpus FILE] [--thresholds 0.5,0.6,0.7]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from smart_quiz_api.services.scraper_services.topic_model import TopicModel, WEIGHTS_PATH
+
+DEFAULT_CORPUS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "topic_holdout.jsonl"
+)
+
+
+def load_corpus(path: str) -> List[Dict[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Labeled JSONL corpus")
+    parser.add_argument("--weights", default=WEIGHTS_PATH, help="Topic weights JSON")
+    parser.add_argument("--thresholds", default="0.4,0.5,0.6,0.7,0.8")
+    args = parser.parse_args()
+
+    model = TopicModel.load(args.weights)
+    rows = load_corpus(args.corpus)
+    if not rows:
+        sys.exit("No labeled articles to evaluate")
+
+    predictions, times = [], []
+    for row in rows:
+        start = time.perf_counter()
+        predictions.append(model.predict(row["text"]))
+        times.append(time.perf_counter() - start)
+
+    correct = [p.topic.lower() == row["topic"].lower() for p, row in zip(predictions, rows)]
+    print(f"🏷️  {len(rows)} articles from {args.corpus}")
+    print(f"latency: {statistics.mean(times) * 1000:.3f} ms/article (max {max(times) * 1000:.3f})")
+    print(f"top-1 accuracy: {sum(correct) / len(rows):.1%}")
+    print(f"{'threshold':>9}  {'local':>6}  {'acc(local)':>10}  {'LLM calls avoided':>17}")
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        local = [ok for p, ok in zip(predictions, correct) if p.confidence >= threshold]
+        accuracy = f"{sum(local) / len(local):.1%}" if local else "-"
+        print(f"{threshold:>9.2f}  {len(local):>6}  {accuracy:>10}  {len(local) / len(rows):>17.1%}")
+
+    misses = [(row["topic"], p) for p, row, ok in zip(predictions, rows, correct) if not ok]
+    for expected, p in misses:
+        print(f"  ✗ expected {expected}, got {p.topic} ({p.confidence:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,41 @@ class Settings(BaseSettings):
     enable_websockets: bool = Field(default=True, alias="ENABLE_WEBSOCKETS")
     enable_caching: bool = Field(default=True, alias="ENABLE_CACHING")
     enable_rate_limiting: bool = Field(default=True, alias="ENABLE_RATE_LIMITING")
+    enable_quiz_pool: bool = Field(default=True, alias="ENABLE_QUIZ_POOL")
+    enable_extraction_pool: bool = Field(default=True, alias="ENABLE_EXTRACTION_POOL")
+    enable_feed_ingestion: bool = Field(default=False, alias="ENABLE_FEED_INGESTION")
+
+    # Pre-generated quiz pool for hot (topic, difficulty, quiz_type) tuples
+    quiz_pool_size: int = Field(default=3, alias="QUIZ_POOL_SIZE")
+    # Requests per window that make a tuple hot
+    quiz_pool_hot_threshold: int = Field(default=5, alias="QUIZ_POOL_HOT_THRESHOLD")
+    quiz_pool_window_seconds: int = Field(default=600, alias="QUIZ_POOL_WINDOW_SECONDS")
+    quiz_pool_refill_interval: float = Field(default=5.0, alias="QUIZ_POOL_REFILL_INTERVAL")
+
+    # Library of generated quizzes; older entries are regenerated on the next request (0 keeps them forever)
+    library_ttl_hours: float = Field(default=168.0, alias="LIBRARY_TTL_HOURS")
+
+    # Background quiz generation for new articles in RSS/Atom feeds and sitemaps
+    # Comma-separated feed/sitemap URLs
+    ingest_feeds: str = Field(default="", alias="INGEST_FEEDS")
+    ingest_quiz_type: str = Field(default="MCQ", alias="INGEST_QUIZ_TYPE")
+    # Seconds between polls of one feed
+    ingest_poll_interval: float = Field(default=300.0, alias="INGEST_POLL_INTERVAL")
+    # Articles started per minute
+    ingest_max_per_minute: int = Field(default=10, alias="INGEST_MAX_PER_MINUTE")
+    # Articles started per 24 hours
+    ingest_daily_budget: int = Field(default=500, alias="INGEST_DAILY_BUDGET")
+    # Older dated entries are skipped (0 disables)
+    ingest_max_age_hours: float = Field(default=48.0, alias="INGEST_MAX_AGE_HOURS")
+
+    # Worker processes for HTML extraction and difficulty estimation
+    extraction_pool_workers: int = Field(default=2, alias="EXTRACTION_POOL_WORKERS")
+    # Tasks before a worker is recycled (bounds leaks)
+    extraction_max_tasks_per_child: int = Field(default=50, alias="EXTRACTION_MAX_TASKS_PER_CHILD")
+    # CPU time limit per task
+    extraction_cpu_seconds: float = Field(default=5.0, alias="EXTRACTION_CPU_SECONDS")
+    # Wall-clock limit per task
+    extraction_timeout_seconds: float = Field(default=10.0, alias="EXTRACTION_TIMEOUT_SECONDS")
 
     # API Keys and Service URLs
     # Provide sensible defaults so integration tests don't fail if env vars are missing.
@@ -27,6 +62,26 @@ class Settings(BaseSettings):
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
     firebase_cred_path: str = Field(default="firebase-credentials.json", alias="FIREBASE_CRED_PATH")
     scraper_model: str = Field(default="gpt-3.5-turbo", alias="SCRAPER_MODEL")
+    # Local topic model; below this the LLM decides
+    topic_confidence_threshold: float = Field(default=0.6, alias="TOPIC_CONFIDENCE_THRESHOLD")
+    # Topic + questions in one LLM call
+    scraper_combined_generation: bool = Field(default=True, alias="SCRAPER_COMBINED_GENERATION")
+    # Longer articles are quizzed chunk by chunk (0 disables)
+    scraper_long_document_chars: int = Field(default=3200, alias="SCRAPER_LONG_DOCUMENT_CHARS")
+    # Concurrent chunk calls per long-document quiz
+    scraper_max_chunks: int = Field(default=8, alias="SCRAPER_MAX_CHUNKS")
+    # Prompt budget for salient sentences (0 sends the article prefix)
+    scraper_context_tokens: int = Field(default=300, alias="SCRAPER_CONTEXT_TOKENS")
+    # Scraped HTML + extracted text, for offline regeneration
+    content_store_dir: str = Field(default="content_store", alias="CONTENT_STORE_DIR")
+    # LRU-evicted beyond this (0 disables the store)
+    content_store_max_mb: int = Field(default=512, alias="CONTENT_STORE_MAX_MB")
+    # Content-addressed thumbnails for IMAGE quizzes
+    image_store_dir: str = Field(default="image_store", alias="IMAGE_STORE_DIR")
+    # Page images attached to an IMAGE quiz (0 disables)
+    image_max_per_quiz: int = Field(default=5, alias="IMAGE_MAX_PER_QUIZ")
+    # In-flight chat completions per process
+    llm_max_concurrency: int = Field(default=8, alias="LLM_MAX_CONCURRENCY")
     google_application_credentials: str = Field(default="dummy-gcp-key", alias="GOOGLE_APPLICATION_CREDENTIALS")
     api_key_header: str = Field(default="x-api-key", alias="API_KEY_HEADER")
 
@@ -36,11 +36,25 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Services initialized successfully")
     except Exception as e:
         logger.error(f"❌ Failed to initialize services: {str(e)}")
+
+    from smart_quiz_api.services.quiz_pool import quiz_pool
+    if settings.enable_quiz_pool:
+        quiz_pool.start()
+
+    from smart_quiz_api.services.feed_ingestion import feed_ingestor
+    if settings.enable_feed_ingestion:
+        feed_ingestor.start()
     
     yield
     
     # Shutdown
     logger.info("🛑 API server is shutting down...")
+    quiz_pool.stop()
+    await feed_ingestor.stop()
+
+    from smart_quiz_api.services.scraper_services import article_fetcher, extraction_pool
+    await article_fetcher.close()
+    extraction_pool.shutdown()
 
 # App Initialization
 app = FastAPI(
@@ -96,7 +110,13 @@ async def log_request_time(request: Request, call_next: Callable[[StarletteReque
     start_time = time.time()
     response = await call_next(request)
     duration = time.time() - start_time
-    logger.info(f"Request to {request.url.path} took {duration:.3f}s")
+    # Routes that time their stages already set Server-Timing; the total closes the breakdown
+    response.headers.append("Server-Timing", f"total;dur={duration * 1000:.1f}")
+    response.headers["Timing-Allow-Origin"] = "*"
+    logger.info(
+        f"Request to {request.url.path} took {duration:.3f}s",
+        extra={"path": request.url.path, "status_code": response.status_code, "duration_ms": round(duration * 1000, 2)}
+    )
     return response
 
 # Exception Logging Middleware
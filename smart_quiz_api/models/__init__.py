@@ -3,7 +3,8 @@ from .base import Base
 
 # Import all models so they are registered with SQLAlchemy metadata
 from .user import User
-from .quiz import Quiz, QuizQuestion
+from .quiz import Quiz, QuizQuestion, QuestionOption
+from .tag import Tag, QuestionTag
 from .answer import UserAnswer
 from .badge import Badge, UserBadge
 from .feedback import Feedback
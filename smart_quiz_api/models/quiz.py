@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Enum, Boolean
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, Enum, Boolean, UniqueConstraint
+from typing import List
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 
@@ -14,12 +15,14 @@ class Quiz(Base, TimestampMixin):
     title = Column(String, nullable=False)
     category = Column(String, nullable=True)
     difficulty = Column(Enum(DifficultyEnum), nullable=False)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    user_id = Column(String, ForeignKey("users.id"), nullable=True)  # None for generated library quizzes
     start_time = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     end_time = Column(DateTime, nullable=True)
     duration_seconds = Column(Integer, nullable=True)
     source_url = Column(String, nullable=True)
     scraped_at = Column(DateTime, nullable=True)
+    library_key = Column(String(64), unique=True, index=True, nullable=True)  # Hash of normalized generation inputs
+    generation_payload = Column(Text, nullable=True)  # Response document returned by the generation route
 
     # Relationships
     user = relationship("User", back_populates="quizzes")
@@ -34,13 +37,41 @@ class QuizQuestion(Base, TimestampMixin):
     id = Column(Integer, primary_key=True, index=True)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
     question_text = Column(String, nullable=False)
-    options = Column(String, nullable=False)  # Stored as JSON string
     correct_answer = Column(String, nullable=False)
     question_type = Column(Enum(QuestionTypeEnum), nullable=False)
-    confidence = Column(Integer, nullable=True)  # You could use Float if more precision is needed
+    confidence = Column(Float, nullable=True)  # type: ignore  # AI-estimated, filled in the background
+    explanation = Column(Text, nullable=True)  # AI-generated, filled in the background
+    enrichment_hash = Column(String(64), nullable=True)  # Content hash explanation/confidence were computed for
     is_correct = Column(Boolean, default=False)
 
     # Relationships
     quiz = relationship("Quiz", back_populates="questions")
+    options = relationship(
+        "QuestionOption",
+        back_populates="question",
+        order_by="QuestionOption.position",
+        cascade="all, delete-orphan",
+        lazy="selectin",  # Batch-load options for every question in one query
+    )
     answers = relationship("UserAnswer", back_populates="question", cascade="all, delete-orphan")
     feedbacks = relationship("Feedback", back_populates="question", cascade="all, delete-orphan")
+    question_tags = relationship("QuestionTag", back_populates="question", cascade="all, delete-orphan")
+
+    @property
+    def option_texts(self) -> List[str]:
+        return [option.text for option in self.options]
+
+
+class QuestionOption(Base):
+    __tablename__ = "question_options"
+    __table_args__ = (
+        UniqueConstraint("question_id", "position", name="uq_question_options_question_position"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    question_id = Column(Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    text = Column(String, nullable=False)
+
+    # Relationships
+    question = relationship("QuizQuestion", back_populates="options")
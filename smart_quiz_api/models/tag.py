@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from .base import Base
+from .mixins import TimestampMixin
+
+
+class Tag(Base, TimestampMixin):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), unique=True, index=True, nullable=False)  # Normalized: lowercase, single-spaced
+
+    # Relationships
+    question_tags = relationship("QuestionTag", back_populates="tag", cascade="all, delete-orphan")
+
+
+class QuestionTag(Base):
+    __tablename__ = "question_tags"
+    __table_args__ = (
+        # PK covers lookups by question; this covers tag -> questions
+        Index("ix_question_tags_tag_id_question_id", "tag_id", "question_id"),
+    )
+
+    question_id = Column(Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+
+    # Relationships
+    question = relationship("QuizQuestion", back_populates="question_tags")
+    tag = relationship("Tag", back_populates="question_tags")
@@ -0,0 +1,137 @@
+# smart_quiz_api/projections.py
+"""
+Column-level projections for list endpoints.
+
+A ``Projection`` maps API field names to SQL column expressions so that
+``?view=summary`` or ``?fields=id,title`` compile to a Core ``select`` of just
+those columns. No ORM entities are built and no relationships are loaded, so
+payload size and query cost follow what the client asked for. ``view=full``
+(without ``fields``) resolves to ``None`` and routes keep their regular
+ORM + serializer path.
+"""
+
+from enum import Enum
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from smart_quiz_api.models import Quiz, QuizQuestion, UserAnswer
+from smart_quiz_api.serializers import DEFAULT_QUIZ_TYPE
+
+FULL_VIEW = "full"
+SUMMARY_VIEW = "summary"
+
+
+class Projection:
+    """Named set of selectable columns for one entity."""
+
+    def __init__(
+        self,
+        entity: Any,
+        columns: Mapping[str, Any],
+        summary_fields: Sequence[str],
+        defaults: Optional[Mapping[str, Any]] = None,
+    ):
+        self.entity = entity
+        self.columns = dict(columns)
+        self.summary_fields = tuple(summary_fields)
+        self.defaults = dict(defaults or {})
+
+    def resolve(self, view: str = FULL_VIEW, fields: Optional[str] = None) -> Optional[Tuple[str, ...]]:
+        """
+        Turn the ``view``/``fields`` query params into a tuple of field names.
+
+        Returns None when the caller wants the full representation.
+
+        Raises:
+            ValueError: If the view or any requested field is unknown.
+        """
+        if fields:
+            requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+            unknown = [f for f in requested if f not in self.columns]
+            if unknown:
+                raise ValueError(f"Unknown fields: {unknown}. Allowed: {sorted(self.columns)}")
+            if requested:
+                return requested
+        if view == SUMMARY_VIEW:
+            return self.summary_fields
+        if view != FULL_VIEW:
+            raise ValueError(f"Invalid view: {view}. Must be one of: {[SUMMARY_VIEW, FULL_VIEW]}")
+        return None
+
+    def select(self, names: Sequence[str]) -> Select:  # type: ignore[type-arg]
+        return select(*(self.columns[name].label(name) for name in names)).select_from(self.entity)
+
+    def to_dicts(self, rows: Sequence[Any], names: Sequence[str]) -> List[Dict[str, Any]]:
+        result: List[Dict[str, Any]] = []
+        for row in rows:
+            item: Dict[str, Any] = {}
+            for name, value in zip(names, row):
+                if isinstance(value, Enum):
+                    value = value.value
+                item[name] = self.defaults.get(name) if value is None else value
+            result.append(item)
+        return result
+
+    def fetch(self, db: Session, names: Sequence[str], stmt: Select) -> List[Dict[str, Any]]:  # type: ignore[type-arg]
+        return self.to_dicts(db.execute(stmt).all(), names)
+
+
+# === Quiz ===
+_question_count = (
+    select(func.count(QuizQuestion.id))
+    .where(QuizQuestion.quiz_id == Quiz.id)
+    .correlate(Quiz)
+    .scalar_subquery()
+)
+_first_question_type = (
+    select(QuizQuestion.question_type)
+    .where(QuizQuestion.quiz_id == Quiz.id)
+    .order_by(QuizQuestion.id)
+    .limit(1)
+    .correlate(Quiz)
+    .scalar_subquery()
+)
+
+quiz_projection = Projection(
+    Quiz,
+    columns={
+        "id": Quiz.id,
+        "title": Quiz.title,
+        "topic": Quiz.category,
+        "difficulty": Quiz.difficulty,
+        "quiz_type": _first_question_type,
+        "question_count": _question_count,
+        "created_at": Quiz.created_at,
+        "duration_seconds": Quiz.duration_seconds,
+        "source_url": Quiz.source_url,
+        "user_id": Quiz.user_id,
+    },
+    summary_fields=("id", "title", "topic", "difficulty", "question_count"),
+    defaults={"topic": "", "quiz_type": DEFAULT_QUIZ_TYPE, "question_count": 0},
+)
+
+
+# === User Answer ===
+user_answer_projection = Projection(
+    UserAnswer,
+    columns={
+        "id": UserAnswer.id,
+        "question_id": UserAnswer.question_id,
+        "selected_answer": UserAnswer.selected_answer,
+        "is_correct": UserAnswer.is_correct,
+        "created_at": UserAnswer.created_at,
+    },
+    summary_fields=("id", "question_id", "is_correct"),
+    defaults={"is_correct": False},
+)
+
+
+__all__ = [
+    "FULL_VIEW",
+    "SUMMARY_VIEW",
+    "Projection",
+    "quiz_projection",
+    "user_answer_projection",
+]
@@ -5,7 +5,8 @@ from smart_quiz_api.database import get_db
 from smart_quiz_api.schema import (
     FeedbackOut, ErrorLogOut, SessionLogOut, GradingTaskOut,
     APIKeyOut, HealthCheckLogOut, PromptCacheOut, LogOut,
-    CacheClearResponse, RedisStatsResponse, OpenAIStatusResponse
+    CacheClearResponse, RedisStatsResponse, OpenAIStatusResponse, QuizPoolStatsResponse,
+    FeedIngestionStatsResponse
 )
 from smart_quiz_api.models import (
     Feedback, ErrorLog, SessionLog, GradingTask, APIKey,
@@ -14,6 +15,8 @@ from smart_quiz_api.models import (
 from dotenv import load_dotenv
 from smart_quiz_api.services.firebase import get_current_user
 from smart_quiz_api.services.redis_service import redis_service
+from smart_quiz_api.services.quiz_pool import quiz_pool
+from smart_quiz_api.services.feed_ingestion import feed_ingestor
 from smart_quiz_api.config import settings
 
 def verify_admin_user(user: User = Depends(get_current_user)):
@@ -113,6 +116,16 @@ def get_redis_stats():
     stats = redis_service.get_stats()
     return RedisStatsResponse(**stats)
 
+# === Quiz Pool Stats ===
+@router.get("/quiz-pool/stats", response_model=QuizPoolStatsResponse)
+def get_quiz_pool_stats():
+    return QuizPoolStatsResponse(**quiz_pool.stats())
+
+# === Feed Ingestion Stats ===
+@router.get("/ingestion/stats", response_model=FeedIngestionStatsResponse)
+def get_feed_ingestion_stats():
+    return FeedIngestionStatsResponse(**feed_ingestor.stats())
+
 # === OpenAI Status Test ===
 @router.get("/openai/status", response_model=OpenAIStatusResponse)
 def openai_status_check():
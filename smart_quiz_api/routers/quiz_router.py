@@ -2,24 +2,41 @@ from fastapi import (
     APIRouter, Depends, HTTPException, Query, Body,
     BackgroundTasks, Request
 )
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Dict, Any, AsyncIterator, Iterator, Literal, Optional, Union
 from datetime import datetime, timezone
+import json
 import logging
+import time
 
 from smart_quiz_api.models import (
-    Quiz, QuizQuestion, UserAnswer, GradingTask, Feedback, User
+    Quiz, QuizQuestion, QuestionOption, UserAnswer, GradingTask, Feedback, User
 )
 from smart_quiz_api.models.enum import GradingStatusEnum, QuizType
 from smart_quiz_api.schema import (
-    QuizCreate, QuizOut, FeedbackCreate, FeedbackOut
+    QuizCreate, QuizOut, QuizSummaryOut, FeedbackCreate, FeedbackOut, UrlBatchRequest
 )
-from smart_quiz_api.database import get_db
-from smart_quiz_api.services.openai_service import (
-    render_prompt, safe_openai_chat, grade_answer,
-    generate_explanation, estimate_confidence
+from smart_quiz_api.config import settings
+from smart_quiz_api.database import get_db, SessionLocal
+from smart_quiz_api.projections import FULL_VIEW, quiz_projection
+from smart_quiz_api.serializers import (
+    FastJSONResponse, quiz_to_dto, quizzes_to_dto, user_answer_to_dto
 )
-from smart_quiz_api.services.scraper_services import generate_quiz_from_url
+from smart_quiz_api.services.openai_service import grade_answer
+from smart_quiz_api.services.quiz_enrichment import (
+    content_hash_for, enrich_quiz, is_enrichment_running, is_stale, question_content_hash, should_enrich,
+    start_enrichment
+)
+from smart_quiz_api.services.quiz_library import (
+    USER_QUIZZES, get_library_payload, library_key_for_topic, library_key_for_url, store_in_library, store_url_quiz
+)
+from smart_quiz_api.services.quiz_pool import generate_ai_payload, quiz_pool
+from smart_quiz_api.services.quiz_tagging import quiz_ids_for_tag, tag_quiz
+from smart_quiz_api.services.scraper_services import (
+    StageReport, dedupe_urls, generate_quiz_from_url_async, image_store, scrape_and_generate_quiz_many
+)
+from smart_quiz_api.services.scraper_services.image_assets import IMAGE_CACHE_CONTROL, IMAGE_NAME
 from smart_quiz_api.services.firebase import get_current_user
 
 # Set up logger
@@ -28,67 +45,209 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _with_timings(response: Response, report: StageReport, route: str) -> Response:
+    """Expose the stage breakdown of a generate request as a ``Server-Timing`` header and structured log fields."""
+    if report.stages:
+        response.headers["Server-Timing"] = report.server_timing()
+    logger.info(f"{route} [{report.summary()}]", extra=dict(report.log_fields(), route=route))
+    return response
+
+
 # === Generate quiz using OpenAI ===
-@router.get("/generate/ai", response_model=Dict[str, Any])
+@router.get("/generate/ai", response_model=Dict[str, Any], response_class=FastJSONResponse)
 async def generate_ai_quiz(
     request: Request,
+    background_tasks: BackgroundTasks,
     topic: str = Query(...),
     difficulty: str = Query("medium"),
-    quiz_type: str = Query("mcq")
+    quiz_type: str = Query("mcq"),
+    db: Session = Depends(get_db)
 ):
     # Convert quiz_type to proper enum value
     quiz_type_upper = quiz_type.upper()
     if quiz_type_upper not in ["MCQ", "TF", "IMAGE"]:
         quiz_type_upper = "MCQ"  # Default to MCQ if invalid
 
-    # Cast to proper type for render_prompt
-    quiz_type_enum: QuizType = quiz_type_upper  # type: ignore
-    prompt = render_prompt(topic, difficulty, quiz_type_enum)
-    ai_response = safe_openai_chat(prompt)
-    
-    try:
-        from smart_quiz_api.services.openai_service import parse_ai_quiz_response
-        parsed_questions = parse_ai_quiz_response(ai_response, quiz_type_upper)
-        
-        return {
-            "topic": topic,
-            "difficulty": difficulty,
-            "quiz_type": quiz_type_upper,
-            "questions": parsed_questions
-        }
-    except Exception as e:
-        logger.error(f"Error parsing AI response: {e}")
-        # Return raw response if parsing fails
-        return {
+    report = StageReport()
+    route = "generate/ai"
+
+    # Hot tuples are served from the pre-generated pool (a fresh quiz each time)
+    if settings.enable_quiz_pool:
+        start = time.perf_counter()
+        pooled = quiz_pool.take(topic, difficulty, quiz_type_upper)
+        report.record("pool", pooled is not None, time.perf_counter() - start)
+        if pooled is not None:
+            return _with_timings(FastJSONResponse(pooled), report, route)
+
+    # Previously generated quizzes are served from the library without an LLM call
+    start = time.perf_counter()
+    library_key = library_key_for_topic(topic, difficulty, quiz_type_upper)
+    stored = get_library_payload(db, library_key)
+    report.record("library", stored is not None, time.perf_counter() - start)
+    if stored is not None:
+        return _with_timings(FastJSONResponse(stored), report, route)
+
+    payload, ai_response = generate_ai_payload(topic, difficulty, quiz_type_upper, report=report)
+    if payload is None:
+        logger.error(f"Error parsing AI response for topic '{topic}'")
+        # Return raw response if parsing fails (not stored in the library)
+        return _with_timings(FastJSONResponse({
             "topic": topic,
             "difficulty": difficulty,
             "quiz_type": quiz_type_upper,
             "generated_quiz": ai_response
-        }
+        }), report, route)
+
+    start = time.perf_counter()
+    quiz = store_in_library(
+        db, library_key, payload,
+        title=f"{topic} quiz",
+        category=topic,
+        difficulty=difficulty,
+        quiz_type=quiz_type_upper,
+        questions=payload["questions"],
+    )
+    report.record("store", False, time.perf_counter() - start)
+    if quiz is not None:
+        _schedule_background_jobs(background_tasks, quiz.id)
+    return _with_timings(FastJSONResponse(payload), report, route)
 
 
 # === Generate quiz from a URL ===
-@router.get("/generate/from-url", response_model=Dict[str, Any])
+@router.get("/generate/from-url", response_model=Dict[str, Any], response_class=FastJSONResponse)
 async def generate_quiz_from_article(
     request: Request,
+    background_tasks: BackgroundTasks,
     url: str = Query(...),
-    quiz_type: str = Query("mcq")
+    quiz_type: str = Query("mcq"),
+    num_questions: Optional[int] = Query(None, ge=1, le=50),
+    mode: Literal["ai", "local"] = Query("ai", description="local: instant fill-in-the-blank questions, no LLM call"),
+    db: Session = Depends(get_db)
 ):
     # Convert quiz_type to proper enum value
     quiz_type_upper = quiz_type.upper()
     if quiz_type_upper not in ["MCQ", "TF", "IMAGE"]:
         quiz_type_upper = "MCQ"  # Default to MCQ if invalid
+
+    report = StageReport()
+    route = "generate/from-url"
+
+    start = time.perf_counter()
+    library_key = library_key_for_url(url, quiz_type_upper, num_questions, mode)
+    stored = get_library_payload(db, library_key)
+    report.record("library", stored is not None, time.perf_counter() - start)
+    if stored is not None:
+        return _with_timings(FastJSONResponse(stored), report, route)
         
-    # Cast to proper type for generate_quiz_from_url
+    # Cast to proper type for generate_quiz_from_url_async
     quiz_type_enum: QuizType = quiz_type_upper  # type: ignore
-    quiz_data = generate_quiz_from_url(url, quiz_type_enum)
-    return quiz_data
+    quiz_data = await generate_quiz_from_url_async(
+        url, quiz_type_enum, report=report, num_questions=num_questions, mode=mode
+    )
+    start = time.perf_counter()
+    _store_url_quiz(db, background_tasks, url, quiz_type_upper, quiz_data, num_questions, mode)
+    report.record("store", False, time.perf_counter() - start)
+    return _with_timings(FastJSONResponse(quiz_data), report, route)
+
+
+def _store_url_quiz(
+    db: Session,
+    background_tasks: BackgroundTasks,
+    url: str,
+    quiz_type: str,
+    quiz_data: Dict[str, Any],
+    num_questions: Optional[int] = None,
+    mode: str = "ai"
+) -> None:
+    """Add a URL-generated quiz to the library and schedule its enrichment/tagging."""
+    quiz = store_url_quiz(db, url, quiz_type, quiz_data, num_questions, mode)
+    if quiz is not None:
+        _schedule_background_jobs(background_tasks, quiz.id)
+
+
+# === Generate quizzes for a reading list (NDJSON stream) ===
+async def _stream_url_batch(
+    urls: List[str],
+    quiz_type: str,
+    background_tasks: BackgroundTasks
+) -> AsyncIterator[str]:
+    """One NDJSON line per unique URL as soon as it is done, then a summary line."""
+    counts = {"ok": 0, "error": 0}
+    pending: List[str] = []
+    with SessionLocal() as db:
+        # Library hits first: they cost one indexed lookup each
+        for canonical, submitted in dedupe_urls(urls).items():
+            stored = get_library_payload(db, library_key_for_url(canonical, quiz_type))
+            if stored is None:
+                pending.extend(submitted)
+                continue
+            counts["ok"] += 1
+            yield json.dumps({"url": submitted[0], "duplicates": submitted[1:], "status": "ok", "quiz": stored}) + "\n"
+
+    quiz_type_enum: QuizType = quiz_type  # type: ignore
+    async for result in scrape_and_generate_quiz_many(pending, quiz_type_enum):
+        counts[result["status"]] += 1
+        if result["status"] == "ok":
+            with SessionLocal() as db:
+                _store_url_quiz(db, background_tasks, result["url"], quiz_type, result["quiz"])
+        yield json.dumps(result) + "\n"
+
+    yield json.dumps({"done": True, "succeeded": counts["ok"], "failed": counts["error"]}) + "\n"
+
+
+@router.post("/generate/from-urls")
+async def generate_quizzes_from_urls(
+    background_tasks: BackgroundTasks,
+    batch: UrlBatchRequest = Body(...)
+):
+    quiz_type_upper = batch.quiz_type.upper()
+    if quiz_type_upper not in ["MCQ", "TF", "IMAGE"]:
+        quiz_type_upper = "MCQ"  # Default to MCQ if invalid
+
+    return StreamingResponse(
+        _stream_url_batch(batch.urls, quiz_type_upper, background_tasks),
+        media_type="application/x-ndjson",
+        background=background_tasks
+    )
+
+
+# === Serve a stored quiz image ===
+@router.get("/images/{name}")
+def get_quiz_image(name: str, request: Request):
+    """Thumbnails attached to IMAGE quizzes; content-addressed, so cached as immutable."""
+    if not IMAGE_NAME.match(name) or not image_store.exists(name):
+        raise HTTPException(status_code=404, detail="Image not found")
+    etag = f'"{name.split(".", 1)[0]}"'
+    headers = {"Cache-Control": IMAGE_CACHE_CONTROL, "ETag": etag}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(image_store.path(name), headers=headers)
+
+
+# === Build a question row ===
+def _build_question(quiz_id: int, q: Any, question_type: Any) -> QuizQuestion:
+    option_texts = [a.text for a in q.answers]
+    return QuizQuestion(
+        quiz_id=quiz_id,
+        question_text=q.text,
+        options=[QuestionOption(position=i, text=text) for i, text in enumerate(option_texts)],
+        correct_answer=q.correct_answer,
+        question_type=question_type,
+        confidence=None,  # Filled in by the background enrichment job
+        is_correct=False
+    )
+
+
+def _schedule_background_jobs(background_tasks: BackgroundTasks, quiz_id: int) -> None:
+    background_tasks.add_task(enrich_quiz, quiz_id)
+    background_tasks.add_task(tag_quiz, quiz_id)
 
 
 # === Create a new quiz ===
-@router.post("/", response_model=QuizOut)
+@router.post("/", response_model=QuizOut, response_class=FastJSONResponse)
 def create_quiz(
     quiz_data: QuizCreate, 
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -108,94 +267,107 @@ def create_quiz(
     db.refresh(quiz)
 
     for q in quiz_data.questions:
-        question = QuizQuestion(
-            quiz_id=quiz.id,
-            question_text=q.text,
-            options="|".join([a.text for a in q.answers]),
-            correct_answer=q.correct_answer,
-            question_type=quiz_data.question_type_enum,  # Use validated enum from property
-            confidence=1.0,
-            is_correct=False
-        )
-        db.add(question)
+        # Use validated enum from property
+        db.add(_build_question(quiz.id, q, quiz_data.question_type_enum))
 
     db.commit()
-    return quiz
+    db.refresh(quiz)
+    _schedule_background_jobs(background_tasks, quiz.id)
+    return FastJSONResponse(quiz_to_dto(quiz))
+
+
+# === Shared list params ===
+VIEW_QUERY = Query(FULL_VIEW, description="'summary' returns id/title/topic/difficulty/question_count only")
+FIELDS_QUERY = Query(None, description="Comma-separated fields to return, e.g. 'id,title,question_count'")
+
+
+def _resolve_quiz_fields(view: str, fields: Optional[str]):
+    try:
+        return quiz_projection.resolve(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 # === List all quizzes ===
-@router.get("/", response_model=List[QuizOut])
-def list_quizzes(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    quizzes = db.query(Quiz).offset(skip).limit(limit).all()
-    
-    # Prepare response with quiz_type for each quiz
-    result: List[Dict[str, Any]] = []
-    for quiz in quizzes:
-        quiz_data = dict(quiz.__dict__)
-        
-        # Get the first question to determine quiz_type
-        first_question = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz.id).first()
-        quiz_data["quiz_type"] = "mcq"  # Default value
-        if first_question is not None:
-            try:
-                quiz_data["quiz_type"] = first_question.question_type.value
-            except (AttributeError, TypeError):
-                pass  # Keep the default value
-            
-        result.append(quiz_data)
-    
-    return result
+@router.get("/", response_model=Union[List[QuizOut], List[QuizSummaryOut]], response_class=FastJSONResponse)
+def list_quizzes(
+    skip: int = 0,
+    limit: int = 10,
+    view: str = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    tag: Optional[str] = Query(None, description="Only quizzes with at least one question tagged with this tag"),
+    db: Session = Depends(get_db)
+):
+    names = _resolve_quiz_fields(view, fields)
+    # Generated library quizzes are a cache, not listed; tags resolve through the tags / question_tags indexes
+    filters = [USER_QUIZZES] + ([Quiz.id.in_(quiz_ids_for_tag(tag))] if tag else [])
+
+    if names is not None:
+        # Column projection only: no ORM entities, no question loading
+        stmt = quiz_projection.select(names).where(*filters).order_by(Quiz.id).offset(skip).limit(limit)
+        return FastJSONResponse(quiz_projection.fetch(db, names, stmt))
+
+    # Questions are loaded in one extra query for the whole page instead of one per quiz
+    quizzes = (
+        db.query(Quiz)
+        .options(selectinload(Quiz.questions))
+        .filter(*filters)
+        .order_by(Quiz.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return FastJSONResponse(quizzes_to_dto(quizzes))
 
 
 # === List quizzes by user ===
-@router.get("/user/{user_id}", response_model=List[QuizOut])
-def list_user_quizzes(user_id: str, db: Session = Depends(get_db)):
-    quizzes = db.query(Quiz).filter(Quiz.user_id == user_id).all()
-    
-    # Prepare response with quiz_type for each quiz
-    result: List[Dict[str, Any]] = []
-    for quiz in quizzes:
-        quiz_data = dict(quiz.__dict__)
-        
-        # Get the first question to determine quiz_type
-        first_question = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz.id).first()
-        quiz_data["quiz_type"] = "mcq"  # Default value
-        if first_question is not None:
-            try:
-                quiz_data["quiz_type"] = first_question.question_type.value
-            except (AttributeError, TypeError):
-                pass  # Keep the default value
-            
-        result.append(quiz_data)
-    
-    return result
+@router.get(
+    "/user/{user_id}",
+    response_model=Union[List[QuizOut], List[QuizSummaryOut]],
+    response_class=FastJSONResponse
+)
+def list_user_quizzes(
+    user_id: str,
+    view: str = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_db)
+):
+    names = _resolve_quiz_fields(view, fields)
+    if names is not None:
+        stmt = quiz_projection.select(names).where(Quiz.user_id == user_id, USER_QUIZZES).order_by(Quiz.id)
+        return FastJSONResponse(quiz_projection.fetch(db, names, stmt))
+
+    quizzes = (
+        db.query(Quiz)
+        .options(selectinload(Quiz.questions))
+        .filter(Quiz.user_id == user_id, USER_QUIZZES)
+        .all()
+    )
+    return FastJSONResponse(quizzes_to_dto(quizzes))
 
 
 # === Retrieve quiz by ID ===
-@router.get("/{quiz_id}", response_model=QuizOut)
+@router.get("/{quiz_id}", response_model=QuizOut, response_class=FastJSONResponse)
 def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    quiz = (
+        db.query(Quiz)
+        .options(selectinload(Quiz.questions))
+        .filter(Quiz.id == quiz_id)
+        .first()
+    )
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    
-    # Get the first question to determine quiz_type
-    first_question = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz.id).first()
-    quiz_data = dict(quiz.__dict__)
-    
-    # Add quiz_type to the response based on the first question's type
-    quiz_data["quiz_type"] = "mcq"  # Default value
-    if first_question is not None:
-        try:
-            quiz_data["quiz_type"] = first_question.question_type.value
-        except (AttributeError, TypeError):
-            pass  # Keep the default value
-    
-    return quiz_data
+    return FastJSONResponse(quiz_to_dto(quiz))
 
 
 # === Update an existing quiz ===
-@router.put("/{quiz_id}", response_model=QuizOut)
-def update_quiz(quiz_id: int, updated_data: QuizCreate, db: Session = Depends(get_db)):
+@router.put("/{quiz_id}", response_model=QuizOut, response_class=FastJSONResponse)
+def update_quiz(
+    quiz_id: int,
+    updated_data: QuizCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
@@ -207,25 +379,44 @@ def update_quiz(quiz_id: int, updated_data: QuizCreate, db: Session = Depends(ge
     setattr(quiz, 'duration_seconds', len(updated_data.questions) * 30)
     quiz.updated_at = datetime.now(timezone.utc)
 
-    # Delete existing questions
-    db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz.id).delete()
+    question_type = updated_data.question_type_enum  # Use validated enum from property
 
-    # Add new questions
+    # Questions whose content did not change keep their row untouched: explanation, confidence, tags
+    existing = sorted(quiz.questions, key=lambda question: question.id)
+    by_content: Dict[str, List[QuizQuestion]] = {}
+    for question in existing:
+        by_content.setdefault(content_hash_for(question), []).append(question)
+    kept: List[QuizQuestion] = []
+    added = []
     for q in updated_data.questions:
-        question = QuizQuestion(
-            quiz_id=quiz.id,
-            question_text=q.text,
-            options="|".join([a.text for a in q.answers]),
-            correct_answer=q.correct_answer,
-            question_type=updated_data.question_type_enum,  # Use validated enum from property
-            confidence=1.0,
-            is_correct=False
+        matches = by_content.get(question_content_hash(q.text, q.correct_answer, [a.text for a in q.answers]))
+        if matches:
+            kept.append(matches.pop(0))
+        else:
+            added.append(q)
+
+    # Answers and feedback refer to the content they were given for, so answered
+    # questions are immutable: changing or removing one is refused
+    kept_ids = {question.id for question in kept}
+    removed = [question for question in existing if question.id not in kept_ids]
+    answered = [question.id for question in removed if question.answers or question.feedbacks]
+    if answered:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"Questions {answered} have answers or feedback and cannot be changed or removed"
         )
-        db.add(question)
+    for question in kept:
+        question.question_type = question_type
+    for question in removed:
+        db.delete(question)
+    for q in added:
+        db.add(_build_question(quiz.id, q, question_type))
 
     db.commit()
     db.refresh(quiz)
-    return quiz
+    _schedule_background_jobs(background_tasks, quiz.id)
+    return FastJSONResponse(quiz_to_dto(quiz))
 
 
 # === Delete a quiz ===
@@ -240,7 +431,7 @@ def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
 
 
 # === Submit answers to a quiz ===
-@router.post("/{quiz_id}/submit", response_model=Dict[str, Any])
+@router.post("/{quiz_id}/submit", response_model=Dict[str, Any], response_class=FastJSONResponse)
 def submit_quiz_answers(
     quiz_id: int,
     answers: List[Dict[str, Any]] = Body(...),
@@ -252,6 +443,12 @@ def submit_quiz_answers(
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
 
+    # Preload the quiz's questions and their options once; validation is a set lookup
+    questions = {
+        q.id: q for q in db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz.id).all()
+    }
+    valid_options = {qid: frozenset(q.option_texts) for qid, q in questions.items()}
+
     results: List[Dict[str, Any]] = []
     total = 0
     correct = 0
@@ -261,11 +458,11 @@ def submit_quiz_answers(
         selected_answer = ans["selected_answer"]
         user_id = current_user.id
 
-        question = db.query(QuizQuestion).filter(QuizQuestion.id == question_id).first()
+        question = questions.get(question_id)
         if not question:
             continue
 
-        if selected_answer not in question.options.split("|"):
+        if selected_answer not in valid_options[question_id]:
             raise HTTPException(status_code=400, detail=f"Invalid answer for question ID {question_id}")
 
         grading = grade_answer(selected_answer, str(question.correct_answer))
@@ -293,13 +490,7 @@ def submit_quiz_answers(
         db.commit()
         db.refresh(user_answer)
 
-        # Convert UserAnswer to dict for response
-        results.append({
-            "id": user_answer.id,
-            "question_id": user_answer.question_id,
-            "selected_answer": user_answer.selected_answer,
-            "is_correct": user_answer.is_correct
-        })
+        results.append(user_answer_to_dto(user_answer))
         total += 1
         if is_correct:
             correct += 1
@@ -318,7 +509,7 @@ def submit_quiz_answers(
         },
         "answers": results
     }
-    return response
+    return FastJSONResponse(response)
 
 
 # === Submit feedback on a quiz ===
@@ -346,25 +537,96 @@ def submit_feedback(
     return feedback
 
 
-# === Get AI-generated explanation ===
-@router.get("/{quiz_id}/explain", response_model=Dict[str, str])
-def explain_quiz(quiz_id: int, db: Session = Depends(get_db)):
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-    if not quiz or not quiz.questions:
+# === Precomputed explanation / confidence reads ===
+ENRICHMENT_RETRY_AFTER = "5"
+STREAM_POLL_SECONDS = 0.5
+STREAM_TIMEOUT_SECONDS = 60.0
+
+
+def _load_questions(db: Session, quiz_id: int) -> List[QuizQuestion]:
+    questions = (
+        db.query(QuizQuestion)
+        .filter(QuizQuestion.quiz_id == quiz_id)
+        .order_by(QuizQuestion.id)
+        .all()
+    )
+    if not questions:
         raise HTTPException(status_code=404, detail="Quiz or questions not found")
+    return questions
+
+
+def _not_ready(quiz_id: int, background_tasks: BackgroundTasks) -> JSONResponse:
+    # Quizzes created before enrichment existed get computed on first read.
+    # Returned rather than raised so the background task is kept on the response.
+    if should_enrich(quiz_id):
+        background_tasks.add_task(enrich_quiz, quiz_id)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Enrichment in progress, try again shortly"},
+        headers={"Retry-After": ENRICHMENT_RETRY_AFTER},
+        background=background_tasks
+    )
+
+
+def _stream_explanations(quiz_id: int) -> Iterator[str]:
+    """Yield one NDJSON line per question as its explanation becomes available."""
+    sent: set[int] = set()
+    deadline = time.monotonic() + STREAM_TIMEOUT_SECONDS
+    while True:
+        with SessionLocal() as db:
+            questions = _load_questions(db, quiz_id)
+            for q in questions:
+                if q.id in sent or q.explanation is None or is_stale(q):
+                    continue
+                sent.add(q.id)
+                yield json.dumps({
+                    "question_id": q.id,
+                    "explanation": q.explanation,
+                    "confidence": q.confidence
+                }) + "\n"
+            pending = [q.id for q in questions if q.id not in sent]
+
+        if not pending:
+            return
+        if not is_enrichment_running(quiz_id) or time.monotonic() > deadline:
+            yield json.dumps({"pending_question_ids": pending}) + "\n"
+            return
+        time.sleep(STREAM_POLL_SECONDS)
 
-    quiz_text = "\n".join([q.question_text for q in quiz.questions])
-    explanation = generate_explanation(quiz_text)
+
+# === Get AI-generated explanation ===
+@router.get("/{quiz_id}/explain", response_model=Dict[str, str])
+def explain_quiz(
+    quiz_id: int,
+    background_tasks: BackgroundTasks,
+    stream: bool = Query(False, description="Stream per-question explanations as NDJSON"),
+    db: Session = Depends(get_db)
+):
+    questions = _load_questions(db, quiz_id)
+    if stream:
+        # Started now, not as a background task: those only run after the stream ends
+        if any(is_stale(q) for q in questions) and should_enrich(quiz_id):
+            start_enrichment(quiz_id)
+        return StreamingResponse(_stream_explanations(quiz_id), media_type="application/x-ndjson")
+
+    ready = [q for q in questions if q.explanation and not is_stale(q)]
+    if not ready:
+        return _not_ready(quiz_id, background_tasks)
+    if len(ready) < len(questions) and should_enrich(quiz_id):
+        background_tasks.add_task(enrich_quiz, quiz_id)
+
+    explanation = "\n".join(f"{q.question_text}\n{q.explanation}" for q in ready)
     return {"explanation": explanation}
 
 
 # === Get AI-estimated confidence score ===
 @router.get("/{quiz_id}/confidence", response_model=Dict[str, float])
-def confidence_score(quiz_id: int, db: Session = Depends(get_db)):
-    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-    if not quiz or not quiz.questions:
-        raise HTTPException(status_code=404, detail="Quiz or questions not found")
-
-    quiz_text = "\n".join([q.question_text for q in quiz.questions])
-    score = estimate_confidence(quiz_text)
-    return {"confidence_score": score}
+def confidence_score(quiz_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    questions = _load_questions(db, quiz_id)
+    scores = [float(q.confidence) for q in questions if q.confidence is not None and not is_stale(q)]
+    if not scores:
+        return _not_ready(quiz_id, background_tasks)
+    if len(scores) < len(questions) and should_enrich(quiz_id):
+        background_tasks.add_task(enrich_quiz, quiz_id)
+
+    return {"confidence_score": round(sum(scores) / len(scores), 3)}
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 import hashlib
 import os
@@ -13,6 +13,8 @@ from smart_quiz_api.schema import (
     UserAnswerOut, SessionLogOut, BadgeOut,
     UserStatsResponse, DetailResponse
 )
+from smart_quiz_api.projections import FULL_VIEW, user_answer_projection
+from smart_quiz_api.serializers import FastJSONResponse, dump_model, user_answer_to_dto
 from smart_quiz_api.services.firebase import get_current_user
 
 router = APIRouter(
@@ -54,7 +56,7 @@ def verify_password(plain: str, stored_hash: str) -> bool:
 
 
 # === Register a new user ===
-@router.post("/register", response_model=UserOut)
+@router.post("/register", response_model=UserOut, response_class=FastJSONResponse)
 def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
@@ -69,11 +71,11 @@ def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
-    return new_user
+    return FastJSONResponse(dump_model(UserOut, new_user))
 
 
 # === User login ===
-@router.post("/login", response_model=UserOut)
+@router.post("/login", response_model=UserOut, response_class=FastJSONResponse)
 def login_user(email: str = Body(...), password: str = Body(...), db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == email).first()
     if not user or not verify_password(password, user.hashed_password):
@@ -82,11 +84,11 @@ def login_user(email: str = Body(...), password: str = Body(...), db: Session =
     # Check if account is deleted
     if user.is_deleted:
         raise HTTPException(status_code=403, detail="Account is deactivated")
-    return user
+    return FastJSONResponse(dump_model(UserOut, user))
 
 
 # === Get user profile ===
-@router.get("/{user_id}", response_model=UserOut)
+@router.get("/{user_id}", response_model=UserOut, response_class=FastJSONResponse)
 def get_user_profile(
     user_id: str, 
     db: Session = Depends(get_db),
@@ -99,11 +101,11 @@ def get_user_profile(
     # Check if account is deleted
     if user.is_deleted:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return FastJSONResponse(dump_model(UserOut, user))
 
 
 # === Update user profile ===
-@router.put("/{user_id}", response_model=UserOut)
+@router.put("/{user_id}", response_model=UserOut, response_class=FastJSONResponse)
 def update_user_profile(
     user_id: str, 
     update: UserCreate, 
@@ -132,7 +134,7 @@ def update_user_profile(
     user.hashed_password = hash_password(update.password)
     db.commit()
     db.refresh(user)
-    return user
+    return FastJSONResponse(dump_model(UserOut, user))
 
 
 # === Change password ===
@@ -208,9 +210,11 @@ def reactivate_user(
 
 
 # === Get user's quiz answers ===
-@router.get("/{user_id}/answers", response_model=List[UserAnswerOut])
+@router.get("/{user_id}/answers", response_model=List[UserAnswerOut], response_class=FastJSONResponse)
 def get_user_answers(
     user_id: str, 
+    view: str = Query(FULL_VIEW, description="'summary' returns id/question_id/is_correct only"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -227,11 +231,20 @@ def get_user_answers(
     if user.is_deleted and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Cannot access a deactivated account")
         
-    return db.query(UserAnswer).filter(UserAnswer.user_id == user_id).all()
+    try:
+        names = user_answer_projection.resolve(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if names is not None:
+        stmt = user_answer_projection.select(names).where(UserAnswer.user_id == user_id)
+        return FastJSONResponse(user_answer_projection.fetch(db, names, stmt))
+
+    answers = db.query(UserAnswer).filter(UserAnswer.user_id == user_id).all()
+    return FastJSONResponse([user_answer_to_dto(a) for a in answers])
 
 
 # === Get user's earned badges ===
-@router.get("/{user_id}/badges", response_model=List[BadgeOut])
+@router.get("/{user_id}/badges", response_model=List[BadgeOut], response_class=FastJSONResponse)
 def get_user_badges(
     user_id: str, 
     db: Session = Depends(get_db),
@@ -251,11 +264,11 @@ def get_user_badges(
         raise HTTPException(status_code=403, detail="Cannot access a deactivated account")
         
     badge_joins = db.query(UserBadge).filter(UserBadge.user_id == user_id).all()
-    return [ub.badge for ub in badge_joins]
+    return FastJSONResponse(dump_model(List[BadgeOut], [ub.badge for ub in badge_joins]))
 
 
 # === Get user's login sessions ===
-@router.get("/{user_id}/sessions", response_model=List[SessionLogOut])
+@router.get("/{user_id}/sessions", response_model=List[SessionLogOut], response_class=FastJSONResponse)
 def get_user_sessions(
     user_id: str, 
     db: Session = Depends(get_db),
@@ -265,7 +278,14 @@ def get_user_sessions(
     if current_user.id != user_id and not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized to view these sessions")
         
-    return db.query(SessionLog).filter(SessionLog.user_id == user_id).order_by(SessionLog.login_time.desc()).limit(50).all()
+    sessions = (
+        db.query(SessionLog)
+        .filter(SessionLog.user_id == user_id)
+        .order_by(SessionLog.login_time.desc())
+        .limit(50)
+        .all()
+    )
+    return FastJSONResponse(dump_model(List[SessionLogOut], sessions))
 
 
 # === Get user stats (quizzes taken, avg score, streak) ===
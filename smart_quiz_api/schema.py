@@ -112,6 +112,19 @@ class QuizOut(BaseModel):
         arbitrary_types_allowed=True  # This is needed for custom handling of quiz_type
     )
 
+class QuizSummaryOut(BaseModel):
+    """List item returned for ``?view=summary`` (no questions embedded)."""
+    id: int
+    title: str
+    topic: str
+    difficulty: str
+    question_count: int = 0
+
+class UrlBatchRequest(BaseModel):
+    """Reading list for ``POST /quiz/generate/from-urls``."""
+    urls: List[str] = Field(..., min_length=1, max_length=200, description="Article URLs; duplicates are merged")
+    quiz_type: str = Field("mcq", examples=["mcq", "tf", "image"])
+
 
 ### === Badge ===
 class BadgeOut(BaseModel):
@@ -242,6 +255,49 @@ class RedisStatsResponse(BaseModel):
         }
     )
 
+class QuizPoolEntryStats(BaseModel):
+    topic: str
+    difficulty: str
+    quiz_type: str
+    ready: int
+    requests_in_window: int
+    hot: bool
+    refill_pending_seconds: Optional[float] = None
+
+class QuizPoolStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    refills: int
+    refill_failures: int
+    avg_refill_lag_seconds: Optional[float] = None
+    max_refill_lag_seconds: Optional[float] = None
+    pools: List[QuizPoolEntryStats]
+
+class FeedIngestionFeedStats(BaseModel):
+    url: str
+    last_polled_seconds_ago: Optional[float] = None
+    last_error: Optional[str] = None
+    discovered: int
+    generated: int
+    failed: int
+    pending: int
+    oldest_pending_seconds: Optional[float] = None
+    avg_lag_seconds: Optional[float] = None
+    max_lag_seconds: Optional[float] = None
+
+class FeedIngestionStatsResponse(BaseModel):
+    running: bool
+    backlog: int
+    in_flight: int
+    dropped: int
+    already_in_library: int
+    generated_last_hour: int
+    started_last_day: int
+    daily_budget: int
+    allowance: int
+    feeds: List[FeedIngestionFeedStats]
+
 class OpenAIStatusResponse(BaseModel):
     model: str
     status: str
@@ -0,0 +1,140 @@
+# smart_quiz_api/serializers.py
+"""
+Fast serialization path for API payloads.
+
+Routes that return lists of quizzes or answers build plain JSON-ready dicts
+straight from ORM rows and hand them to ``FastJSONResponse``, which skips
+FastAPI's second validation pass and the stdlib JSON encoder. Payloads that
+are still schema-driven (user profile, badges, sessions) go through a cached
+pydantic ``TypeAdapter`` instead of ``jsonable_encoder``.
+
+The dict keys mirror what FastAPI emits for the matching ``response_model``
+(``by_alias=True``), so the wire format is unchanged.
+"""
+
+import json
+import logging
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+# Try to import orjson, fallback to the stdlib encoder if not available
+try:
+    import orjson  # type: ignore
+    _has_orjson = True
+except ImportError:
+    _has_orjson = False
+    logger.warning("orjson library not available, using stdlib json for responses")
+
+DEFAULT_QUIZ_TYPE = "mcq"
+
+
+# === Response Class ===
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson. Pre-encoded ``bytes`` are sent as-is."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if _has_orjson:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+
+
+# === Cached TypeAdapters ===
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:  # type: ignore[type-arg]
+    """Return a process-wide TypeAdapter for ``tp`` (building one is expensive)."""
+    return TypeAdapter(tp)
+
+
+def dump_model(tp: Any, obj: Any) -> Any:
+    """Validate ORM rows against a schema type and dump them as JSON-ready python."""
+    adapter = get_type_adapter(tp)
+    validated = adapter.validate_python(obj, from_attributes=True)
+    return adapter.dump_python(validated, mode="json", by_alias=True)
+
+
+# === Row -> DTO Mapping ===
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def resolve_quiz_type(questions: Iterable[Any]) -> str:
+    """Quiz type is taken from the first question (lowest id), defaulting to MCQ."""
+    first = min(questions, key=lambda q: q.id or 0, default=None)
+    if first is None or first.question_type is None:
+        return DEFAULT_QUIZ_TYPE
+    return str(_enum_value(first.question_type))
+
+
+def answers_to_dto(question: Any) -> List[Dict[str, Any]]:
+    correct = question.correct_answer
+    return [
+        {"id": option.id, "text": option.text, "is_correct": option.text == correct}
+        for option in question.options
+    ]
+
+
+def question_to_dto(question: Any) -> Dict[str, Any]:
+    return {
+        "id": question.id,
+        "question_text": question.question_text,
+        "correct_answer": question.correct_answer,
+        "answers": answers_to_dto(question),
+        "question_type": _enum_value(question.question_type),
+    }
+
+
+def quiz_to_dto(quiz: Any, questions: Optional[List[Any]] = None) -> Dict[str, Any]:
+    """Map a ``Quiz`` row (with its questions) to the ``QuizOut`` wire format."""
+    if questions is None:
+        questions = list(quiz.questions)
+    questions = sorted(questions, key=lambda q: q.id or 0)
+    return {
+        "id": quiz.id,
+        "title": quiz.title,
+        "category": quiz.category or "",
+        "difficulty": _enum_value(quiz.difficulty),
+        "quiz_type": resolve_quiz_type(questions),
+        "created_at": quiz.created_at,
+        "questions": [question_to_dto(q) for q in questions],
+    }
+
+
+def quizzes_to_dto(quizzes: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [quiz_to_dto(quiz) for quiz in quizzes]
+
+
+def user_answer_to_dto(answer: Any) -> Dict[str, Any]:
+    """Map a ``UserAnswer`` row to the ``UserAnswerOut`` wire format."""
+    return {
+        "id": answer.id,
+        "question_id": answer.question_id,
+        "selected_answer": answer.selected_answer,
+        "is_correct": bool(answer.is_correct),
+    }
+
+
+__all__ = [
+    "FastJSONResponse",
+    "get_type_adapter",
+    "dump_model",
+    "resolve_quiz_type",
+    "answers_to_dto",
+    "question_to_dto",
+    "quiz_to_dto",
+    "quizzes_to_dto",
+    "user_answer_to_dto",
+]
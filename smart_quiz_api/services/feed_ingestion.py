@@ -0,0 +1,488 @@
+# smart_quiz_api/services/feed_ingestion.py
+"""
+Background ingestion of RSS/Atom feeds and sitemaps into the quiz library.
+
+Every ``ingest_poll_interval`` seconds each feed in ``ingest_feeds`` is
+fetched and its article URLs are read (RSS items, Atom entries, sitemap
+``<url>`` entries; sitemap indexes are followed one level). URLs not seen
+before and not yet in the library go into a backlog, newest first. Seen URLs
+are remembered in process and in Redis, so a restart does not re-queue a
+whole feed.
+
+The backlog is drained through ``scrape_and_generate_quiz_many`` at most
+``ingest_max_per_minute`` URLs a minute and ``ingest_daily_budget`` URLs a
+day, so fetches share the pooled fetcher, extraction runs in the extraction
+pool and LLM calls go through the LLM limiter like any request. Finished
+quizzes are stored in the library (and enriched/tagged), so the URL routes
+answer them with one indexed lookup. A failed URL is not retried until its
+seen marker expires.
+
+The worker is an asyncio task on the API's event loop. ``stats()`` reports
+the backlog, throughput and, per feed, the lag from publication (discovery
+when the feed has no dates) to quiz ready.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urljoin
+
+from smart_quiz_api.config import settings
+from smart_quiz_api.database import SessionLocal
+from smart_quiz_api.services.quiz_enrichment import enrich_quiz
+from smart_quiz_api.services.quiz_library import (
+    canonical_url, get_library_payload, library_key_for_url, store_url_quiz
+)
+from smart_quiz_api.services.quiz_tagging import tag_quiz
+from smart_quiz_api.services.redis_service import redis_service
+from smart_quiz_api.services.scraper_services import scrape_and_generate_quiz_many
+from smart_quiz_api.services.scraper_services.content_fetcher import (
+    CHUNK_SIZE, MAX_CONTENT_BYTES, _session, is_valid_url, read_bounded
+)
+
+try:
+    # Feeds are untrusted XML: refuse entity expansion and external references
+    from defusedxml.ElementTree import fromstring as parse_xml  # type: ignore
+    _has_defusedxml = True
+except ImportError:
+    from xml.etree.ElementTree import fromstring as parse_xml  # nosec - expat >= 2.4.1 also limits entity expansion
+    _has_defusedxml = False
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES_PER_FEED = 50       # Newest entries looked at per poll; the rest wait for later polls
+MAX_CHILD_SITEMAPS = 5          # Newest sitemaps of a sitemap index followed per poll
+MAX_BACKLOG = 1000              # New URLs beyond this are left for a later poll
+BATCH_SIZE = 10                 # URLs handed to one scrape_and_generate_quiz_many call
+SEEN_TTL = 7 * 24 * 3600
+SEEN_MEMORY_ENTRIES = 50_000
+LAG_SAMPLES = 100               # Recent lags kept per feed
+DAY_SECONDS = 24 * 3600
+
+
+@dataclass(frozen=True)
+class FeedEntry:
+    url: str
+    published: Optional[float] = None   # Unix time, when the feed says
+
+
+@dataclass
+class PendingUrl:
+    url: str
+    feed: str
+    published: Optional[float]
+    discovered_at: float
+
+
+@dataclass
+class FeedState:
+    url: str
+    last_polled: Optional[float] = None
+    last_error: Optional[str] = None
+    discovered: int = 0
+    generated: int = 0
+    failed: int = 0
+    lags: Deque[float] = field(default_factory=lambda: deque(maxlen=LAG_SAMPLES))
+
+
+# === Feed parsing ===
+def _local(tag: Any) -> str:
+    """Tag name without its XML namespace."""
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _child_text(element: Any, *names: str) -> Optional[str]:
+    for name in names:
+        for child in element:
+            if _local(child.tag) == name and child.text and child.text.strip():
+                return child.text.strip()
+    return None
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """Unix time of an RFC 822 (RSS) or ISO 8601 (Atom, sitemap) date, or None."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _atom_link(entry: Any) -> Optional[str]:
+    for child in entry:
+        if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+            return child.get("href")
+    return None
+
+
+def parse_feed(body: bytes, base_url: str) -> Tuple[List[FeedEntry], List[FeedEntry]]:
+    """
+    Article entries and child sitemaps of an RSS, Atom, sitemap or sitemap index document.
+
+    Raises:
+        ValueError: If the document is not well-formed XML or not a known feed format.
+    """
+    try:
+        root = parse_xml(body)
+    except Exception as e:  # ParseError, or a defusedxml refusal
+        raise ValueError(f"Unreadable feed: {e}") from e
+
+    kind = _local(root.tag)
+    found: List[Tuple[Optional[str], Optional[str]]] = []
+    if kind in ("rss", "RDF"):
+        for item in root.iter():
+            if _local(item.tag) == "item":
+                found.append((_child_text(item, "link", "guid"), _child_text(item, "pubDate", "date")))
+    elif kind == "feed":
+        for entry in root.iter():
+            if _local(entry.tag) == "entry":
+                found.append((_atom_link(entry), _child_text(entry, "published", "updated")))
+    elif kind in ("urlset", "sitemapindex"):
+        wanted = "url" if kind == "urlset" else "sitemap"
+        for entry in root:
+            if _local(entry.tag) == wanted:
+                # Google News sitemaps carry the publication date in <news:news>
+                news = next((child for child in entry if _local(child.tag) == "news"), None)
+                published = _child_text(news, "publication_date") if news is not None else None
+                found.append((_child_text(entry, "loc"), published or _child_text(entry, "lastmod")))
+    else:
+        raise ValueError(f"Unknown feed format: <{kind}>")
+
+    entries = []
+    for link, published in found:
+        url = urljoin(base_url, link) if link else None
+        if url and is_valid_url(url):
+            entries.append(FeedEntry(url, parse_date(published)))
+    if kind == "sitemapindex":
+        return [], entries
+    return entries, []
+
+
+def fetch_feed(url: str) -> bytes:
+    """Download a feed or sitemap (gzipped sitemaps are inflated), within the article download limits."""
+    if not is_valid_url(url):
+        raise ValueError(f"Invalid URL: {url}")
+    with _session.get(url, timeout=15, stream=True) as response:
+        response.raise_for_status()
+        body = read_bounded(response.iter_content(CHUNK_SIZE))
+    if body[:2] == b"\x1f\x8b":
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = inflater.decompress(body, MAX_CONTENT_BYTES)
+        if inflater.unconsumed_tail:
+            raise ValueError("Content too large (>10MB)")
+    return body
+
+
+def newest(entries: Iterable[FeedEntry], limit: int) -> List[FeedEntry]:
+    """The ``limit`` newest entries, undated ones last in feed order."""
+    return sorted(entries, key=lambda e: -(e.published or 0.0))[:limit]
+
+
+def read_feed(url: str) -> List[FeedEntry]:
+    """Article entries of a feed, following a sitemap index one level down."""
+    entries, children = parse_feed(fetch_feed(url), url)
+    for child in newest(children, MAX_CHILD_SITEMAPS):
+        try:
+            entries.extend(parse_feed(fetch_feed(child.url), child.url)[0])
+        except Exception as e:
+            logger.warning(f"Skipping sitemap {child.url}: {e}")
+    return newest(entries, MAX_ENTRIES_PER_FEED)
+
+
+# === Seen URLs ===
+def _seen_key(url: str) -> str:
+    return "ingest_seen:" + hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class SeenUrls:
+    """Canonical URLs already queued: an in-process LRU backed by Redis keys with a TTL."""
+
+    def __init__(self, max_entries: int = SEEN_MEMORY_ENTRIES, ttl: int = SEEN_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._urls: "OrderedDict[str, None]" = OrderedDict()
+
+    def __contains__(self, url: str) -> bool:
+        url = canonical_url(url)
+        if url in self._urls:
+            self._urls.move_to_end(url)
+            return True
+        if redis_service.get(_seen_key(url)) is not None:
+            self._remember(url)
+            return True
+        return False
+
+    def add(self, url: str) -> None:
+        url = canonical_url(url)
+        self._remember(url)
+        redis_service.setex(_seen_key(url), self.ttl, "1")
+
+    def _remember(self, url: str) -> None:
+        self._urls[url] = None
+        self._urls.move_to_end(url)
+        while len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+
+
+# === Ingestor ===
+class FeedIngestor:
+    """
+    Polls feeds, keeps a backlog of new article URLs and pre-generates their
+    quizzes within rate and budget limits.
+    """
+
+    def __init__(
+        self,
+        feeds: List[str],
+        quiz_type: str = "MCQ",
+        poll_interval: float = 300,
+        max_per_minute: int = 10,
+        daily_budget: int = 500,
+        max_age_hours: float = 48,
+        tick_interval: float = 5.0
+    ):
+        self.feeds: Dict[str, FeedState] = {url: FeedState(url) for url in feeds}
+        self.quiz_type = quiz_type
+        self.poll_interval = poll_interval
+        self.max_per_minute = max_per_minute
+        self.daily_budget = daily_budget
+        self.max_age_hours = max_age_hours
+        self.tick_interval = tick_interval
+
+        self.seen = SeenUrls()
+        self.backlog: Deque[PendingUrl] = deque()
+        self.dropped = 0
+        self.already_in_library = 0
+        self._started: Deque[float] = deque()     # Job start times of the last day, for the limits
+        self._finished: Deque[float] = deque()    # Quiz ready times of the last hour, for throughput
+        self._in_flight = 0
+
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    # === Polling ===
+    async def poll_due_feeds(self) -> int:
+        """Poll every feed whose interval has passed; returns the number of URLs queued."""
+        now = time.time()
+        queued = 0
+        for state in self.feeds.values():
+            if state.last_polled is not None and now - state.last_polled < self.poll_interval:
+                continue
+            queued += await self.poll_feed(state)
+        return queued
+
+    async def poll_feed(self, state: FeedState) -> int:
+        state.last_polled = time.time()
+        try:
+            entries = await asyncio.to_thread(read_feed, state.url)
+            state.last_error = None
+        except Exception as e:
+            state.last_error = str(e) or type(e).__name__
+            logger.warning(f"Feed poll failed for {state.url}: {state.last_error}")
+            return 0
+
+        queued = await asyncio.to_thread(self._queue_new, state, entries)
+        if queued:
+            logger.info(f"📰 Queued {queued} new article(s) from {state.url}")
+        return queued
+
+    def _queue_new(self, state: FeedState, entries: List[FeedEntry]) -> int:
+        """Append the unseen, recent entries that are not in the library yet to the backlog."""
+        now = time.time()
+        oldest = now - self.max_age_hours * 3600 if self.max_age_hours > 0 else None
+        entries = [
+            entry for entry in entries
+            if entry.url not in self.seen and not (oldest and entry.published and entry.published < oldest)
+        ]
+        in_library = self._in_library([entry.url for entry in entries])
+        queued = 0
+        for entry in entries:
+            if entry.url in in_library:
+                self.seen.add(entry.url)
+                self.already_in_library += 1
+            elif len(self.backlog) >= MAX_BACKLOG:
+                # Not marked seen: picked up again once the backlog has room
+                self.dropped += 1
+            else:
+                self.seen.add(entry.url)
+                self.backlog.append(PendingUrl(entry.url, state.url, entry.published, now))
+                queued += 1
+        state.discovered += queued
+        return queued
+
+    def _in_library(self, urls: List[str]) -> Set[str]:
+        with SessionLocal() as db:
+            return {
+                url for url in urls
+                if get_library_payload(db, library_key_for_url(url, self.quiz_type)) is not None
+            }
+
+    # === Generation ===
+    def allowance(self, now: Optional[float] = None) -> int:
+        """URLs that may start now under the per-minute rate and the daily budget."""
+        now = time.time() if now is None else now
+        while self._started and now - self._started[0] > DAY_SECONDS:
+            self._started.popleft()
+        last_minute = sum(1 for started in self._started if now - started < 60)
+        return max(0, min(self.max_per_minute - last_minute, self.daily_budget - len(self._started)))
+
+    async def drain(self) -> int:
+        """Generate quizzes for the next backlog URLs the limits allow; returns the number stored."""
+        batch: List[PendingUrl] = []
+        allowance = min(self.allowance(), BATCH_SIZE)
+        while self.backlog and len(batch) < allowance:
+            batch.append(self.backlog.popleft())
+        if not batch:
+            return 0
+
+        now = time.time()
+        self._started.extend(now for _ in batch)
+        self._in_flight = len(batch)
+        by_url = {pending.url: pending for pending in batch}
+        stored = 0
+        try:
+            async for result in scrape_and_generate_quiz_many(list(by_url), self.quiz_type):  # type: ignore[arg-type]
+                self._in_flight -= 1
+                pending = by_url[result["url"]]
+                state = self.feeds.get(pending.feed)
+                if result["status"] != "ok":
+                    logger.warning(f"Ingestion failed for {pending.url}: {result.get('error')}")
+                    if state:
+                        state.failed += 1
+                    continue
+                await asyncio.to_thread(self._store, pending.url, result["quiz"])
+                stored += 1
+                ready = time.time()
+                self._finished.append(ready)
+                if state:
+                    state.generated += 1
+                    published = pending.published
+                    since = published if published and published <= ready else pending.discovered_at
+                    state.lags.append(ready - since)
+        finally:
+            self._in_flight = 0
+        return stored
+
+    def _store(self, url: str, quiz_data: Dict[str, Any]) -> None:
+        with SessionLocal() as db:
+            quiz = store_url_quiz(db, url, self.quiz_type, quiz_data)
+        if quiz is not None:
+            enrich_quiz(quiz.id)
+            tag_quiz(quiz.id)
+
+    async def run_once(self) -> int:
+        await self.poll_due_feeds()
+        return await self.drain()
+
+    # === Worker ===
+    def start(self) -> None:
+        """Start the ingestion task on the running event loop."""
+        if self._task and not self._task.done():
+            return
+        if not self.feeds:
+            logger.info("Feed ingestion enabled but no INGEST_FEEDS configured")
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="feed-ingestion")
+        logger.info(f"📰 Feed ingestion started for {len(self.feeds)} feed(s)")
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        if self._stop is not None:
+            self._stop.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        assert self._stop is not None
+        while not self._stop.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Feed ingestion failed: {e}")
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.tick_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # === Stats ===
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        while self._finished and now - self._finished[0] > 3600:
+            self._finished.popleft()
+        pending_by_feed: Dict[str, List[PendingUrl]] = {}
+        for pending in self.backlog:
+            pending_by_feed.setdefault(pending.feed, []).append(pending)
+
+        feeds = []
+        for state in self.feeds.values():
+            lags = list(state.lags)
+            waiting = pending_by_feed.get(state.url, [])
+            feeds.append({
+                "url": state.url,
+                "last_polled_seconds_ago": round(now - state.last_polled, 3) if state.last_polled else None,
+                "last_error": state.last_error,
+                "discovered": state.discovered,
+                "generated": state.generated,
+                "failed": state.failed,
+                "pending": len(waiting),
+                "oldest_pending_seconds": round(now - min(p.discovered_at for p in waiting), 3) if waiting else None,
+                "avg_lag_seconds": round(sum(lags) / len(lags), 3) if lags else None,
+                "max_lag_seconds": round(max(lags), 3) if lags else None,
+            })
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "backlog": len(self.backlog),
+            "in_flight": self._in_flight,
+            "dropped": self.dropped,
+            "already_in_library": self.already_in_library,
+            "generated_last_hour": len(self._finished),
+            "started_last_day": len(self._started),
+            "daily_budget": self.daily_budget,
+            "allowance": self.allowance(now),
+            "feeds": feeds,
+        }
+
+
+def configured_feeds() -> List[str]:
+    return [url.strip() for url in settings.ingest_feeds.split(",") if url.strip()]
+
+
+# Global ingestor (started by the app lifespan when ENABLE_FEED_INGESTION is set)
+feed_ingestor = FeedIngestor(
+    configured_feeds(),
+    quiz_type=settings.ingest_quiz_type.upper(),
+    poll_interval=settings.ingest_poll_interval,
+    max_per_minute=settings.ingest_max_per_minute,
+    daily_budget=settings.ingest_daily_budget,
+    max_age_hours=settings.ingest_max_age_hours,
+)
+
+
+__all__ = [
+    "FeedEntry",
+    "FeedIngestor",
+    "SeenUrls",
+    "feed_ingestor",
+    "fetch_feed",
+    "parse_date",
+    "parse_feed",
+    "read_feed",
+]
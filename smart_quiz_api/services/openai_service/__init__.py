@@ -14,10 +14,13 @@ from .ai_client import (
     openai_client,
     use_new_openai,
     estimate_tokens,
+    get_encoding,
     get_valid_model,
+    FALLBACK_MESSAGE,
     fallback_response,
     trim_prompt_to_fit,
     call_openai,
+    llm_limiter,
 )
 
 # === Prompt Templates and Renderer ===
@@ -38,11 +41,15 @@ from .ai_tasks import(
     safe_openai_chat,
     classify_topic,
     generate_tags,
+    generate_tags_batch,
     generate_explanation,
+    explain_and_score_questions,
     grade_answer,
     estimate_confidence,
     check_openai_health,
     parse_ai_quiz_response,
+    is_unparsed_quiz,
+    extract_json_payload,
 )
 
 # === Public Export Symbols ===
@@ -51,10 +58,13 @@ __all__ = [
     "openai_client",
     "use_new_openai",
     "estimate_tokens",
+    "get_encoding",
     "get_valid_model",
+    "FALLBACK_MESSAGE",
     "fallback_response",
     "trim_prompt_to_fit",
     "call_openai",
+    "llm_limiter",
 
     # prompt.py
     "load_prompt_template",
@@ -69,9 +79,13 @@ __all__ = [
     "safe_openai_chat",
     "classify_topic",
     "generate_tags",
+    "generate_tags_batch",
     "generate_explanation",
+    "explain_and_score_questions",
     "grade_answer",
     "estimate_confidence",
     "check_openai_health",
     "parse_ai_quiz_response",
+    "is_unparsed_quiz",
+    "extract_json_payload",
 ]
@@ -1,4 +1,8 @@
 import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+
 import tiktoken
 
 from smart_quiz_api.core.exceptions import OpenAIResponseError
@@ -30,13 +34,33 @@ except ImportError:
     use_new_openai = False
     logger.info("⚠️  Using legacy OpenAI SDK v0.x client.")
 
+# === Concurrency Limiter ===
+# Every chat completion holds a slot, so bursts (batch URL imports, pool refills)
+# queue here instead of tripping the provider's rate limits.
+llm_limiter = threading.BoundedSemaphore(settings.llm_max_concurrency)
+
 # === Token Estimation ===
-def estimate_tokens(prompt: str, model: str = DEFAULT_MODEL) -> int:
+CHARS_PER_TOKEN = 4  # Rough English average, used when no tokenizer can be loaded
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model: str = DEFAULT_MODEL) -> Optional[tiktoken.Encoding]:
+    """The model's tokenizer, loaded once per process; None if it cannot be loaded (e.g. offline)."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except Exception:
-        encoding = tiktoken.get_encoding("cl100k_base")
-    
+        pass
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ No tokenizer for {model}, estimating tokens from length: {e}")
+        return None
+
+
+def estimate_tokens(prompt: str, model: str = DEFAULT_MODEL) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return -(-len(prompt) // CHARS_PER_TOKEN)
     return len(encoding.encode(prompt))
 
 # === Model Validation ===
@@ -45,16 +69,18 @@ def get_valid_model(requested_model: str) -> str:
     return requested_model if requested_model in supported_models else "gpt-3.5-turbo"
 
 # === Fallback Response Handler ===
+FALLBACK_MESSAGE = "We're currently experiencing technical difficulties. Please try again later."
+
+
 def fallback_response(prompt: str) -> str:
     logger.warning("⚠️ Using fallback response due to OpenAI failure.")
-    return "We're currently experiencing technical difficulties. Please try again later."
+    return FALLBACK_MESSAGE
 
 # === Prompt Trimmer (Optional Helper) === 
 def trim_prompt_to_fit(prompt: str, max_tokens: int, model: str = DEFAULT_MODEL) -> str:
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except Exception:
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = get_encoding(model)
+    if encoding is None:
+        return prompt[:max_tokens * CHARS_PER_TOKEN]
 
     encoded = encoding.encode(prompt)
     if len(encoded) > max_tokens:
@@ -69,38 +95,43 @@ def call_openai(
     temperature: float = 0.7,
 ) -> str:
     try:
-        if use_new_openai:
-            response = openai_client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            content = response.choices[0].message.content
-            return content.strip() if content else ""
-
-        else:
-            # For legacy OpenAI SDK (v0.x)
-            response = openai.ChatCompletion.create(  # type: ignore
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            content = response["choices"][0]["message"]["content"]  # type: ignore
-            return content.strip() if content else ""  # type: ignore
-
+        with llm_limiter:
+            return _chat_completion(prompt, model, max_tokens, temperature)
     except Exception as e:
         logger.error(f"[OpenAI API Error] {e}")
         raise OpenAIResponseError(str(e))
 
+def _chat_completion(prompt: str, model: str, max_tokens: int, temperature: float) -> str:
+    if use_new_openai:
+        response = openai_client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        content = response.choices[0].message.content
+        return content.strip() if content else ""
+
+    else:
+        # For legacy OpenAI SDK (v0.x)
+        response = openai.ChatCompletion.create(  # type: ignore
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        content = response["choices"][0]["message"]["content"]  # type: ignore
+        return content.strip() if content else ""  # type: ignore
+
 # === Public Symbols for Import ===
 __all__ = [
     "openai_client",
     "use_new_openai",
     "estimate_tokens",
+    "get_encoding",
     "get_valid_model",
     "fallback_response",
     "trim_prompt_to_fit",
-    "call_openai"
+    "call_openai",
+    "llm_limiter"
 ]
@@ -1,6 +1,7 @@
 import logging
 import re
-from typing import List, Dict, Any, Optional, cast
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, cast
 import json
 
 from smart_quiz_api.services.openai_service.ai_client import(
@@ -13,25 +14,55 @@ from smart_quiz_api.services.openai_service.cache import get_cached_response, se
 from smart_quiz_api.services.redis_service import redis_service
 from smart_quiz_api.constants import DEFAULT_MODEL
 
+if TYPE_CHECKING:
+    from smart_quiz_api.services.scraper_services.stages import StageReport
+
 logger = logging.getLogger(__name__)
 
 
+# Placeholder question ``parse_ai_quiz_response`` returns for a reply that is not JSON
+UNPARSED_QUESTION = "Generated quiz could not be parsed properly"
+
+
+def is_unparsed_quiz(questions: Any) -> bool:
+    """Whether ``questions`` came from the parse-failure fallback; such quizzes must never be stored or served."""
+    return isinstance(questions, list) and any(
+        isinstance(q, dict) and q.get("question") == UNPARSED_QUESTION for q in questions
+    )
+
+
 # === OpenAI Safe Wrapper ===
-def safe_openai_chat(prompt: str, model: str = DEFAULT_MODEL, max_tokens: int = 700, temperature: float = 0.7) -> str:
+def safe_openai_chat(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    max_tokens: int = 700,
+    temperature: float = 0.7,
+    use_cache: bool = True,
+    report: Optional["StageReport"] = None
+) -> str:
+    """Chat completion through the prompt cache; ``report`` gets an ``llm`` stage (a hit when cached)."""
     model = get_valid_model(model)
     prompt = trim_prompt_to_fit(prompt, 4000, model)
 
+    start = time.perf_counter()
+    hit = False
     try:
-        cached = get_cached_response(prompt)
-        if cached:
-            return cached
+        if use_cache:
+            cached = get_cached_response(prompt)
+            if cached:
+                hit = True
+                return cached
 
         response = call_openai(prompt, model=model, max_tokens=max_tokens, temperature=temperature)
-        set_cached_response(prompt, response)
+        if use_cache:
+            set_cached_response(prompt, response)
         return response
     except Exception as e:
         logger.error(f"OpenAI API Error: {e}")
         return fallback_response(prompt)
+    finally:
+        if report is not None:
+            report.record("llm", hit, time.perf_counter() - start)
 
 def parse_ai_quiz_response(ai_response: Dict[str, Any] | str, quiz_type: str) -> List[Dict[str, Any]]:
     """
@@ -66,17 +97,19 @@ def parse_ai_quiz_response(ai_response: Dict[str, Any] | str, quiz_type: str) ->
         if not content:
             raise ValueError("Missing content in OpenAI response")
 
-        # Parse JSON content
+        # Parse JSON content (```json fences and surrounding prose are tolerated)
         try:
-            questions_raw = json.loads(content)
-        except json.JSONDecodeError:
+            questions_raw = extract_json_payload(content)
+        except ValueError:
             # Try to handle non-JSON formatted responses
             logger.warning("Response is not valid JSON, attempting to parse as text")
             # Simple fallback for text responses - create a single question
-            return [{"question": "Generated quiz could not be parsed properly", 
+            return [{"question": UNPARSED_QUESTION,
                     "options": ["Option A", "Option B", "Option C", "Option D"], 
                     "answer": "Option A"}]
 
+        if isinstance(questions_raw, dict) and "questions" in questions_raw:
+            questions_raw = questions_raw["questions"]
         if not isinstance(questions_raw, list):
             raise ValueError("Expected list of questions")
 
@@ -94,6 +127,33 @@ def parse_ai_quiz_response(ai_response: Dict[str, Any] | str, quiz_type: str) ->
         logger.error(f"❌ Failed to parse AI quiz response: {e}")
         raise ValueError(f"Error parsing AI response: {e}")
 
+# === JSON Payload Extraction ===
+def extract_json_payload(response: str) -> Any:
+    """
+    Parse the JSON document in an LLM response, tolerating ```json fences and
+    leading/trailing prose.
+
+    Raises:
+        ValueError: If no JSON document can be parsed.
+    """
+    content = (response or "").strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", content, re.DOTALL)
+    if fenced:
+        content = fenced.group(1).strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+
+    starts = [i for i in (content.find("["), content.find("{")) if i != -1]
+    if starts:
+        try:
+            payload, _ = json.JSONDecoder().raw_decode(content[min(starts):])
+            return payload
+        except json.JSONDecodeError:
+            pass
+    raise ValueError("No JSON payload found in response")
+
 # === OTHER TASKS ===
 
 
@@ -114,6 +174,51 @@ def generate_explanation(quiz_text: str) -> str:
     return safe_openai_chat(prompt)
 
 
+# === Batched Explanation + Confidence ===
+def explain_and_score_questions(questions: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Explain and confidence-score several questions with a single LLM call.
+
+    Args:
+        questions: Items with "question", "options" and "answer" keys.
+
+    Returns:
+        One {"explanation": str, "confidence": float} per input question, in
+        order, or None if the response could not be parsed.
+    """
+    if not questions:
+        return []
+
+    numbered = "\n\n".join(
+        f"{i}. {q['question']}\nOptions: {' | '.join(q.get('options') or [])}\nCorrect answer: {q['answer']}"
+        for i, q in enumerate(questions, start=1)
+    )
+    prompt = (
+        "For each numbered quiz question below, explain the correct answer in 1-2 beginner-friendly "
+        "sentences and rate your confidence that the marked answer is correct on a scale from 0.0 to 1.0.\n"
+        'Return only JSON: a list with one object per question, in order, with keys '
+        '"index", "explanation" and "confidence".\n\n'
+        f"{numbered}"
+    )
+    try:
+        # Uncached: results are stored per question, and an unparseable reply must not stick
+        payload = extract_json_payload(safe_openai_chat(prompt, temperature=0.3, use_cache=False))
+        if not isinstance(payload, list) or len(payload) != len(questions):
+            raise ValueError("Expected one result per question")
+
+        results: List[Dict[str, Any]] = []
+        for item in cast(List[Dict[str, Any]], payload):
+            explanation = str(item.get("explanation", "")).strip()
+            if not explanation:
+                raise ValueError("Missing explanation")
+            confidence = float(item.get("confidence", 0.8))
+            results.append({"explanation": explanation, "confidence": min(max(confidence, 0.0), 1.0)})
+        return results
+    except Exception as e:
+        logger.error(f"Batched explanation failed: {e}")
+        return None
+
+
 # === Tag Generator ===
 def generate_tags(question: str) -> List[str]:
     prompt = f"Give 3 relevant tags (comma-separated) for this question:\n{question}"
@@ -125,6 +230,40 @@ def generate_tags(question: str) -> List[str]:
         return []
 
 
+# === Batched Tag Generator ===
+def generate_tags_batch(questions: List[str], max_tags: int = 3) -> Optional[List[List[str]]]:
+    """
+    Tag several questions with a single LLM call.
+
+    Returns:
+        One list of tags per input question, in order, or None if the response
+        could not be parsed.
+    """
+    if not questions:
+        return []
+
+    numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, start=1))
+    prompt = (
+        f"Give up to {max_tags} short topical tags for each numbered quiz question below.\n"
+        "Return only JSON: a list with one list of tag strings per question, in order.\n\n"
+        f"{numbered}"
+    )
+    try:
+        # Uncached: tags are stored per question, and an unparseable reply must not stick
+        payload = extract_json_payload(
+            safe_openai_chat(prompt, max_tokens=30 * len(questions) + 50, temperature=0.3, use_cache=False)
+        )
+        if not isinstance(payload, list) or len(payload) != len(questions):
+            raise ValueError("Expected one tag list per question")
+        return [
+            [str(tag).strip() for tag in (tags if isinstance(tags, list) else []) if str(tag).strip()][:max_tags]
+            for tags in cast(List[Any], payload)
+        ]
+    except Exception as e:
+        logger.error(f"Batched tag generation failed: {e}")
+        return None
+
+
 # === Answer Grader ===
 def grade_answer(user_answer: str, correct_option: str, explanation: Optional[str] = "") -> Dict[str, Any]:
     is_correct = user_answer.strip().upper() == correct_option.strip().upper()
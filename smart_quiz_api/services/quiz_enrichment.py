@@ -0,0 +1,177 @@
+# smart_quiz_api/services/quiz_enrichment.py
+"""
+Background enrichment of stored quizzes.
+
+Explanations and confidence scores depend only on a question's content, so
+they are computed once after a quiz is created or updated and stored on
+``QuizQuestion``. Each question remembers the content hash it was enriched
+for (``enrichment_hash``); a later run only touches questions whose text,
+options or answer changed. Read endpoints never call the LLM.
+
+A run that leaves questions unenriched (the LLM failed or its reply did not
+parse) is remembered: reads do not schedule another run for that quiz for
+``ENRICHMENT_RETRY_SECONDS``, so a failing LLM is not hit on every page
+view. Creating or updating the quiz still retries right away.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from smart_quiz_api.database import db_session
+from smart_quiz_api.models import QuizQuestion
+from smart_quiz_api.services.openai_service import explain_and_score_questions
+
+logger = logging.getLogger(__name__)
+
+# Questions per LLM call; results are committed per batch so streaming readers see progress
+ENRICHMENT_BATCH_SIZE = 5
+# Seconds before a read may schedule enrichment again after a failed run
+ENRICHMENT_RETRY_SECONDS = 300
+
+_running: Set[int] = set()
+_rerun: Set[int] = set()
+_failed_at: Dict[int, float] = {}
+_running_lock = threading.Lock()
+# Runs started by readers that poll for the result (streamed explanations)
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="quiz-enrichment")
+
+
+def question_content_hash(question_text: str, correct_answer: str, options: Iterable[str]) -> str:
+    """Stable hash of everything an explanation depends on."""
+    parts = [question_text or "", correct_answer or "", *options]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def content_hash_for(question: Any) -> str:
+    return question_content_hash(question.question_text, question.correct_answer, question.option_texts)
+
+
+def is_stale(question: Any) -> bool:
+    return question.enrichment_hash != content_hash_for(question)
+
+
+def is_enrichment_running(quiz_id: int) -> bool:
+    with _running_lock:
+        return quiz_id in _running
+
+
+def should_enrich(quiz_id: int) -> bool:
+    """Whether a read should schedule enrichment: none running and no recent failed run."""
+    with _running_lock:
+        if quiz_id in _running:
+            return False
+        failed_at = _failed_at.get(quiz_id)
+        return failed_at is None or time.monotonic() - failed_at >= ENRICHMENT_RETRY_SECONDS
+
+
+def enrich_quiz(quiz_id: int) -> int:
+    """
+    Compute explanation and confidence for every stale question of a quiz.
+
+    Intended to run as a FastAPI background task. If a run for the same quiz
+    is already in progress, that run is asked to do one more pass instead of
+    starting a second one. Returns the number of questions updated.
+    """
+    if not _claim(quiz_id):
+        return 0
+    return _run_claimed(quiz_id)
+
+
+def start_enrichment(quiz_id: int) -> bool:
+    """
+    Start ``enrich_quiz`` in a worker thread for a caller that polls for its results.
+
+    The quiz counts as running (``is_enrichment_running``) before this returns,
+    so the caller never sees "not running" for a run it just started. Returns
+    False if a run was already in progress (it is asked to do one more pass).
+    """
+    if not _claim(quiz_id):
+        return False
+    _executor.submit(_run_claimed, quiz_id)
+    return True
+
+
+def _claim(quiz_id: int) -> bool:
+    """Mark ``quiz_id`` as running, or ask the current run for one more pass."""
+    with _running_lock:
+        if quiz_id in _running:
+            _rerun.add(quiz_id)
+            return False
+        _running.add(quiz_id)
+        return True
+
+
+def _run_claimed(quiz_id: int) -> int:
+    updated = 0
+    failed = True
+    try:
+        while True:
+            done, failed = _enrich_stale_questions(quiz_id)
+            updated += done
+            with _running_lock:
+                if quiz_id not in _rerun:
+                    break
+                _rerun.discard(quiz_id)
+        if failed:
+            logger.warning(f"Quiz enrichment left questions stale for quiz {quiz_id}")
+        logger.info(f"✅ Enriched {updated} question(s) for quiz {quiz_id}")
+    except Exception as e:
+        logger.error(f"Quiz enrichment failed for quiz {quiz_id}: {e}")
+    finally:
+        with _running_lock:
+            _running.discard(quiz_id)
+            _rerun.discard(quiz_id)
+            if failed:
+                _failed_at[quiz_id] = time.monotonic()
+            else:
+                _failed_at.pop(quiz_id, None)
+    return updated
+
+
+def _enrich_stale_questions(quiz_id: int) -> Tuple[int, bool]:
+    """Enrich the stale questions; returns (updated, whether any batch failed)."""
+    updated = 0
+    failed = False
+    with db_session() as db:
+        questions: List[QuizQuestion] = (
+            db.query(QuizQuestion)
+            .filter(QuizQuestion.quiz_id == quiz_id)
+            .order_by(QuizQuestion.id)
+            .all()
+        )
+        stale = [q for q in questions if is_stale(q)]
+
+        for start in range(0, len(stale), ENRICHMENT_BATCH_SIZE):
+            batch = stale[start:start + ENRICHMENT_BATCH_SIZE]
+            results = explain_and_score_questions([
+                {"question": q.question_text, "options": q.option_texts, "answer": q.correct_answer}
+                for q in batch
+            ])
+            if results is None:
+                # Leave the batch stale; the next create/update (or read after the backoff) retries it
+                failed = True
+                continue
+            for question, result in zip(batch, results):
+                question.explanation = result["explanation"]
+                question.confidence = result["confidence"]
+                question.enrichment_hash = content_hash_for(question)
+                updated += 1
+            db.commit()
+    return updated, failed
+
+
+__all__ = [
+    "ENRICHMENT_BATCH_SIZE",
+    "ENRICHMENT_RETRY_SECONDS",
+    "question_content_hash",
+    "content_hash_for",
+    "is_stale",
+    "is_enrichment_running",
+    "should_enrich",
+    "start_enrichment",
+    "enrich_quiz",
+]
@@ -0,0 +1,280 @@
+# smart_quiz_api/services/quiz_library.py
+"""
+Content-addressed library of generated quizzes.
+
+AI- and URL-generated quizzes are stored as regular ``Quiz`` rows keyed by a
+hash of their normalized generation inputs (``library_key``). The generation
+routes look the key up before calling the LLM, so asking for the same quiz
+again is a single indexed lookup instead of a new generation. The exact
+response document is kept in ``generation_payload`` so repeat requests get
+the same payload back byte for byte.
+
+Library rows are a generation cache, not user content: ``USER_QUIZZES``
+keeps them out of the quiz listings. Entries expire after
+``LIBRARY_TTL_HOURS``; the next request generates a fresh quiz and the old
+row gives up its key (it keeps its payload, answers and feedback, and stays
+out of the listings).
+"""
+
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from smart_quiz_api.config import settings
+from smart_quiz_api.models import Quiz, QuizQuestion, QuestionOption
+from smart_quiz_api.models.enum import DifficultyEnum, QuestionTypeEnum
+from smart_quiz_api.services.openai_service import FALLBACK_MESSAGE, extract_json_payload, is_unparsed_quiz
+
+logger = logging.getLogger(__name__)
+
+QUESTION_TYPE_BY_QUIZ_TYPE = {
+    "MCQ": QuestionTypeEnum.MCQ,
+    "TF": QuestionTypeEnum.TRUE_FALSE,
+    "IMAGE": QuestionTypeEnum.IMAGE,
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Query parameters that never change page content: campaign tags and ad click ids only.
+# Generic names (ref, share, amp, ...) select content on some sites, e.g. a branch on GitHub.
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid", "ttclid",
+    "igshid", "mc_cid", "mc_eid", "_hsenc", "_hsmi", "_ga", "_gl",
+}
+# Host prefixes for the mobile/AMP editions of the same site
+MIRROR_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+_AMP_PATH = re.compile(r"(/amp/?$|\.amp(?=\.html?$|$))", re.IGNORECASE)
+
+
+# === Key Normalization ===
+def normalize_text(value: str) -> str:
+    return re.sub(r"\s+", " ", (value or "").strip()).casefold()
+
+
+def canonical_host(host: str) -> str:
+    """Lowercase host without ``www.``/``m.``/``mobile.``/``amp.`` mirror prefixes."""
+    host = host.lower().rstrip(".")
+    for prefix in MIRROR_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") >= 2:
+            return host[len(prefix):]
+    return host
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache and library lookups: lowercase scheme,
+    host without mirror prefixes, no default port, fragment, tracking
+    parameters or AMP markers, sorted query string and no trailing slash.
+    """
+    parts = urlsplit((url or "").strip())
+    scheme = parts.scheme.lower()
+    host = canonical_host(parts.hostname or "")
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = _AMP_PATH.sub("", re.sub(r"/{2,}", "/", parts.path or "/")) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def _hash_key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def library_key_for_topic(topic: str, difficulty: str, quiz_type: str) -> str:
+    return _hash_key("ai", normalize_text(topic), normalize_text(difficulty), quiz_type.upper())
+
+
+def library_key_for_url(url: str, quiz_type: str, num_questions: Optional[int] = None, mode: str = "ai") -> str:
+    parts = [canonical_url(url), quiz_type.upper()]
+    if num_questions is not None:
+        parts.append(str(num_questions))
+    if mode != "ai":
+        parts.append(mode)
+    return _hash_key("url", *parts)
+
+
+# Filter for user-authored quizzes: generated library quizzes always carry their payload
+USER_QUIZZES = Quiz.generation_payload.is_(None)
+
+
+# === Lookup / Store ===
+def _expired_before() -> Optional[datetime]:
+    """Library entries created before this are stale, or None when entries never expire."""
+    if settings.library_ttl_hours <= 0:
+        return None
+    # created_at is stored naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=settings.library_ttl_hours)
+
+
+def get_library_payload(db: Session, key: str) -> Optional[Dict[str, Any]]:
+    """Return the stored response for ``key``, or None if missing or expired. One indexed lookup."""
+    row = db.execute(
+        select(Quiz.generation_payload, Quiz.created_at).where(Quiz.library_key == key)
+    ).one_or_none()
+    if row is None:
+        return None
+    payload, created_at = row
+    expired_before = _expired_before()
+    if expired_before is not None and created_at is not None and created_at.replace(tzinfo=None) < expired_before:
+        return None
+    try:
+        return json.loads(payload)
+    except (TypeError, ValueError):
+        logger.warning(f"Corrupt library payload for key {key[:12]}, regenerating")
+        return None
+
+
+def is_generation_failure(text: Any) -> bool:
+    """True for the placeholder strings returned when the LLM call failed."""
+    if not isinstance(text, str):
+        return False
+    content = text.strip()
+    return not content or content == FALLBACK_MESSAGE or content.startswith("Failed to generate quiz")
+
+
+def questions_from_text(text: Any) -> List[Dict[str, Any]]:
+    """Structured questions from a free-form LLM answer, or [] when it is not JSON."""
+    if not isinstance(text, str):
+        return []
+    try:
+        payload = extract_json_payload(text)
+    except ValueError:
+        return []
+    if isinstance(payload, dict):
+        payload = payload.get("questions", [])
+    if not isinstance(payload, list):
+        return []
+    return [q for q in payload if isinstance(q, dict) and {"question", "answer"} <= q.keys()]
+
+
+def _difficulty(value: str) -> DifficultyEnum:
+    try:
+        return DifficultyEnum(normalize_text(value))
+    except ValueError:
+        return DifficultyEnum.MEDIUM
+
+
+def _build_questions(questions: List[Dict[str, Any]], quiz_type: str) -> List[QuizQuestion]:
+    question_type = QUESTION_TYPE_BY_QUIZ_TYPE.get(quiz_type.upper(), QuestionTypeEnum.MCQ)
+    rows: List[QuizQuestion] = []
+    for q in questions:
+        options = q.get("options") or (["True", "False"] if question_type == QuestionTypeEnum.TRUE_FALSE else [])
+        rows.append(QuizQuestion(
+            question_text=str(q["question"]),
+            correct_answer=str(q["answer"]),
+            question_type=question_type,
+            options=[QuestionOption(position=i, text=str(text)) for i, text in enumerate(options)],
+            is_correct=False,
+        ))
+    return rows
+
+
+def store_in_library(
+    db: Session,
+    key: str,
+    payload: Dict[str, Any],
+    *,
+    title: str,
+    category: str,
+    difficulty: str,
+    quiz_type: str,
+    questions: List[Dict[str, Any]],
+    source_url: Optional[str] = None,
+    scraped_at: Optional[datetime] = None,
+) -> Optional[Quiz]:
+    """
+    Persist a generated quiz under ``key``.
+
+    Returns the new ``Quiz``, or None if another request stored the same key
+    first (the unique index on ``library_key`` settles the race) or the
+    questions are the parse-failure placeholder. An expired entry under
+    ``key`` is retired first.
+    """
+    if is_unparsed_quiz(questions):
+        logger.warning(f"Not storing library entry {key[:12]}: the LLM reply could not be parsed")
+        return None
+    expired_before = _expired_before()
+    if expired_before is not None:
+        db.execute(
+            update(Quiz)
+            .where(Quiz.library_key == key, Quiz.created_at < expired_before)
+            .values(library_key=None)
+        )
+    quiz = Quiz(
+        title=title,
+        category=category,
+        difficulty=_difficulty(difficulty),
+        user_id=None,
+        source_url=source_url,
+        scraped_at=scraped_at,
+        library_key=key,
+        generation_payload=json.dumps(payload),
+        questions=_build_questions(questions, quiz_type),
+    )
+    db.add(quiz)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info(f"Library entry {key[:12]} was stored concurrently, keeping the existing one")
+        return None
+    db.refresh(quiz)
+    logger.info(f"📚 Stored generated quiz {quiz.id} in library ({key[:12]})")
+    return quiz
+
+
+def store_url_quiz(
+    db: Session,
+    url: str,
+    quiz_type: str,
+    quiz_data: Dict[str, Any],
+    num_questions: Optional[int] = None,
+    mode: str = "ai"
+) -> Optional[Quiz]:
+    """
+    Add a URL-generated quiz (the ``generate_quiz_from_url`` result) to the library.
+
+    Returns the new ``Quiz``, or None for failed generations, degraded-mode
+    fallback quizzes (the AI quiz should replace them once the LLM is back)
+    and quizzes stored concurrently.
+    """
+    if is_generation_failure(quiz_data.get("quiz")) or quiz_data.get("degraded"):
+        return None
+    scraped_at = quiz_data.get("scraped_at")
+    return store_in_library(
+        db, library_key_for_url(url, quiz_type, num_questions, mode), quiz_data,
+        title=f"{quiz_data.get('topic', 'General')} quiz",
+        category=quiz_data.get("topic", ""),
+        difficulty=quiz_data.get("difficulty", "medium"),
+        quiz_type=quiz_type,
+        questions=questions_from_text(quiz_data.get("quiz")),
+        source_url=canonical_url(url),
+        scraped_at=datetime.fromisoformat(scraped_at) if scraped_at else None,
+    )
+
+
+__all__ = [
+    "USER_QUIZZES",
+    "normalize_text",
+    "canonical_url",
+    "library_key_for_topic",
+    "library_key_for_url",
+    "get_library_payload",
+    "is_generation_failure",
+    "questions_from_text",
+    "store_in_library",
+    "store_url_quiz",
+]
@@ -0,0 +1,261 @@
+# smart_quiz_api/services/quiz_pool.py
+"""
+Pool of pre-generated quizzes for hot (topic, difficulty, quiz_type) tuples.
+
+Every ``/quiz/generate/ai`` request is counted in a sliding window; tuples
+requested at least ``quiz_pool_hot_threshold`` times per window are "hot".
+A background worker thread keeps ``quiz_pool_size`` ready-to-serve quizzes
+for each hot tuple, and the route pops one in O(1) instead of waiting on the
+LLM. Tuples that cool down stop being refilled and are dropped once idle.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+from smart_quiz_api.config import settings
+from smart_quiz_api.services.openai_service import (
+    is_unparsed_quiz, parse_ai_quiz_response, render_prompt, safe_openai_chat
+)
+from smart_quiz_api.services.quiz_library import (
+    is_generation_failure, normalize_text, questions_from_text
+)
+
+if TYPE_CHECKING:
+    from smart_quiz_api.services.scraper_services.stages import StageReport
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, str, str]
+
+# Number of recent refill lags kept for the average
+LAG_SAMPLES = 100
+
+
+def pool_key(topic: str, difficulty: str, quiz_type: str) -> PoolKey:
+    return normalize_text(topic), normalize_text(difficulty), quiz_type.upper()
+
+
+def generate_ai_payload(
+    topic: str,
+    difficulty: str,
+    quiz_type: str,
+    use_cache: bool = True,
+    report: Optional["StageReport"] = None
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Generate one quiz through the prompt template.
+
+    Returns ``(payload, raw_response)``; ``payload`` is None when the LLM call
+    failed or its answer could not be parsed into questions. ``report`` gets
+    the ``llm`` and ``parse`` stages.
+    """
+    prompt = render_prompt(topic, difficulty, quiz_type)  # type: ignore[arg-type]
+    ai_response = safe_openai_chat(prompt, use_cache=use_cache, report=report)
+    start = time.perf_counter()
+    try:
+        if is_generation_failure(ai_response) or not questions_from_text(ai_response):
+            return None, ai_response
+        questions = parse_ai_quiz_response(ai_response, quiz_type)
+    except ValueError:
+        return None, ai_response
+    else:
+        if is_unparsed_quiz(questions):
+            return None, ai_response
+    finally:
+        if report is not None:
+            report.record("parse", False, time.perf_counter() - start)
+    return {
+        "topic": topic,
+        "difficulty": difficulty,
+        "quiz_type": quiz_type,
+        "questions": questions,
+    }, ai_response
+
+
+class QuizPool:
+    """In-process pool of ready quizzes with request-frequency hot detection."""
+
+    def __init__(
+        self,
+        size: int = 3,
+        hot_threshold: int = 5,
+        window_seconds: float = 600,
+        refill_interval: float = 5.0
+    ):
+        self.size = size
+        self.hot_threshold = hot_threshold
+        self.window_seconds = window_seconds
+        self.refill_interval = refill_interval
+
+        self._lock = threading.Lock()
+        self._requests: Dict[PoolKey, Deque[float]] = {}
+        self._pools: Dict[PoolKey, Deque[Dict[str, Any]]] = {}
+        self._display: Dict[PoolKey, Tuple[str, str]] = {}  # Topic/difficulty as first requested
+        self._depleted_at: Dict[PoolKey, float] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self._lags: Deque[float] = deque(maxlen=LAG_SAMPLES)
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    # === Request path ===
+    def take(self, topic: str, difficulty: str, quiz_type: str) -> Optional[Dict[str, Any]]:
+        """Record the request and pop a ready quiz for it, or return None."""
+        key = pool_key(topic, difficulty, quiz_type)
+        now = time.monotonic()
+        with self._lock:
+            requests = self._requests.setdefault(key, deque())
+            requests.append(now)
+            self._trim(requests, now)
+            self._display.setdefault(key, (topic, difficulty))
+
+            pool = self._pools.get(key)
+            payload = pool.popleft() if pool else None
+            if payload is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+            if self._is_hot(key) and len(self._pools.get(key, ())) < self.size:
+                self._pools.setdefault(key, deque())
+                self._depleted_at.setdefault(key, now)
+                self._wake.set()
+        return payload
+
+    # === Refill path ===
+    def refill_once(self) -> int:
+        """Top up every hot pool. Returns the number of quizzes generated."""
+        generated = 0
+        for key in self._keys_needing_refill():
+            topic, difficulty = self._display.get(key, (key[0], key[1]))
+            while self._needs_refill(key) and not self._stop.is_set():
+                # Bypass the prompt cache, otherwise every refill returns the same quiz
+                payload, _ = generate_ai_payload(topic, difficulty, key[2], use_cache=False)
+                # Never pool a placeholder quiz: it would be served to every later user
+                if payload is None or is_unparsed_quiz(payload["questions"]):
+                    with self._lock:
+                        self.refill_failures += 1
+                    # Retry on the next tick rather than hammering a failing LLM
+                    return generated
+                generated += 1
+                with self._lock:
+                    self._pools.setdefault(key, deque()).append(payload)
+                    self.refills += 1
+                    if len(self._pools[key]) >= self.size and key in self._depleted_at:
+                        self._lags.append(time.monotonic() - self._depleted_at.pop(key))
+        self._prune()
+        return generated
+
+    def start(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="quiz-pool-refill", daemon=True)
+        self._worker.start()
+        logger.info("🧺 Quiz pool refill worker started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._worker:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.refill_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.refill_once()
+            except Exception as e:
+                logger.error(f"Quiz pool refill failed: {e}")
+
+    # === Stats ===
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            lookups = self.hits + self.misses
+            lags = list(self._lags)
+            pools: List[Dict[str, Any]] = [
+                {
+                    "topic": key[0],
+                    "difficulty": key[1],
+                    "quiz_type": key[2],
+                    "ready": len(pool),
+                    "requests_in_window": len(self._requests.get(key, ())),
+                    "hot": self._is_hot(key),
+                    "refill_pending_seconds": (
+                        round(now - self._depleted_at[key], 3) if key in self._depleted_at else None
+                    ),
+                }
+                for key, pool in self._pools.items()
+            ]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "refills": self.refills,
+                "refill_failures": self.refill_failures,
+                "avg_refill_lag_seconds": round(sum(lags) / len(lags), 3) if lags else None,
+                "max_refill_lag_seconds": round(max(lags), 3) if lags else None,
+                "pools": pools,
+            }
+
+    # === Internals (call with self._lock held unless noted) ===
+    def _trim(self, requests: Deque[float], now: float) -> None:
+        while requests and now - requests[0] > self.window_seconds:
+            requests.popleft()
+
+    def _is_hot(self, key: PoolKey) -> bool:
+        return len(self._requests.get(key, ())) >= self.hot_threshold
+
+    def _needs_refill(self, key: PoolKey) -> bool:
+        with self._lock:
+            return self._is_hot(key) and len(self._pools.get(key, ())) < self.size
+
+    def _keys_needing_refill(self) -> List[PoolKey]:
+        with self._lock:
+            now = time.monotonic()
+            for requests in self._requests.values():
+                self._trim(requests, now)
+            return [key for key in self._pools if self._is_hot(key) and len(self._pools[key]) < self.size]
+
+    def _prune(self) -> None:
+        """Forget tuples with no requests in the window (their ready quizzes go too)."""
+        with self._lock:
+            now = time.monotonic()
+            for key in list(self._requests):
+                requests = self._requests[key]
+                self._trim(requests, now)
+                if not requests:
+                    del self._requests[key]
+                    self._pools.pop(key, None)
+                    self._display.pop(key, None)
+                    self._depleted_at.pop(key, None)
+
+
+# Global pool instance
+quiz_pool = QuizPool(
+    size=settings.quiz_pool_size,
+    hot_threshold=settings.quiz_pool_hot_threshold,
+    window_seconds=settings.quiz_pool_window_seconds,
+    refill_interval=settings.quiz_pool_refill_interval,
+)
+
+
+__all__ = [
+    "QuizPool",
+    "quiz_pool",
+    "pool_key",
+    "generate_ai_payload",
+]
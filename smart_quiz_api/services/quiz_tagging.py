@@ -0,0 +1,117 @@
+# smart_quiz_api/services/quiz_tagging.py
+"""
+Tagging pipeline for stored quizzes.
+
+All untagged questions of a quiz are tagged with one batched LLM call and the
+result is written to the normalized ``tags`` / ``question_tags`` tables, so
+``GET /quiz/?tag=`` resolves through indexes instead of scanning text.
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from smart_quiz_api.database import db_session
+from smart_quiz_api.models import QuestionTag, QuizQuestion, Tag
+from smart_quiz_api.services.openai_service import generate_tags_batch
+
+logger = logging.getLogger(__name__)
+
+MAX_TAGS_PER_QUESTION = 3
+MAX_TAG_LENGTH = 50
+
+
+def normalize_tag(tag: str) -> Optional[str]:
+    """Lowercase, drop leading '#', collapse whitespace. Returns None for empty tags."""
+    name = re.sub(r"\s+", " ", (tag or "").strip().lstrip("#").strip().lower())
+    return name[:MAX_TAG_LENGTH] or None
+
+
+def get_or_create_tags(db: Session, names: Iterable[str]) -> Dict[str, Tag]:
+    """
+    Resolve tag names to rows with one lookup query, inserting the missing ones.
+
+    Each insert runs in a savepoint: when a concurrent tagging run created the
+    same tag first, the unique-name conflict rolls back only that insert and
+    the other run's row is selected instead.
+    """
+    wanted = {name for name in (normalize_tag(n) for n in names) if name}
+    if not wanted:
+        return {}
+    existing = {tag.name: tag for tag in db.execute(select(Tag).where(Tag.name.in_(wanted))).scalars()}
+    for name in sorted(wanted - existing.keys()):
+        try:
+            with db.begin_nested():
+                tag = Tag(name=name)
+                db.add(tag)
+        except IntegrityError:
+            tag = db.execute(select(Tag).where(Tag.name == name)).scalar_one()
+        existing[name] = tag
+    return existing
+
+
+def tag_questions(db: Session, questions: List[QuizQuestion]) -> int:
+    """Tag the given questions with a single LLM call. Returns the number tagged."""
+    if not questions:
+        return 0
+
+    tag_lists = generate_tags_batch([q.question_text for q in questions], max_tags=MAX_TAGS_PER_QUESTION)
+    if tag_lists is None:
+        return 0
+
+    tags = get_or_create_tags(db, (name for names in tag_lists for name in names))
+    tagged = 0
+    for question, names in zip(questions, tag_lists):
+        tag_ids = {tags[n].id for n in (normalize_tag(name) for name in names) if n}
+        for tag_id in tag_ids:
+            db.add(QuestionTag(question_id=question.id, tag_id=tag_id))
+        tagged += bool(tag_ids)
+    return tagged
+
+
+def tag_quiz(quiz_id: int) -> int:
+    """
+    Tag every question of a quiz that has no tags yet.
+
+    Intended to run as a FastAPI background task after quiz creation/update.
+    """
+    try:
+        with db_session() as db:
+            tagged_ids = select(QuestionTag.question_id)
+            questions = (
+                db.query(QuizQuestion)
+                .filter(QuizQuestion.quiz_id == quiz_id, QuizQuestion.id.not_in(tagged_ids))
+                .order_by(QuizQuestion.id)
+                .all()
+            )
+            tagged = tag_questions(db, questions)
+        if tagged:
+            logger.info(f"🏷️ Tagged {tagged} question(s) for quiz {quiz_id}")
+        return tagged
+    except Exception as e:
+        logger.error(f"Tagging failed for quiz {quiz_id}: {e}")
+        return 0
+
+
+def quiz_ids_for_tag(tag: str) -> Select:  # type: ignore[type-arg]
+    """Subquery of quiz ids having at least one question with ``tag`` (index-only lookup)."""
+    return (
+        select(QuizQuestion.quiz_id)
+        .join(QuestionTag, QuestionTag.question_id == QuizQuestion.id)
+        .join(Tag, Tag.id == QuestionTag.tag_id)
+        .where(Tag.name == normalize_tag(tag))
+    )
+
+
+__all__ = [
+    "MAX_TAGS_PER_QUESTION",
+    "normalize_tag",
+    "get_or_create_tags",
+    "tag_questions",
+    "tag_quiz",
+    "quiz_ids_for_tag",
+]
@@ -2,7 +2,7 @@
 # Redis Service Wrapper with Type Ignore for Redis Library Issues
 
 import redis
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
 from dotenv import load_dotenv
 import logging
 from smart_quiz_api.config import settings
@@ -105,5 +105,29 @@ class RedisService:
             logger.error(f"Failed to set key {key}: {e}")
             return False
 
+    def sadd(self, key: str, *members: str, ttl: Optional[int] = None) -> bool:
+        """Add members to a set, optionally (re)setting its TTL."""
+        try:
+            if self.client:
+                self.client.sadd(key, *members)  # type: ignore
+                if ttl:
+                    self.client.expire(key, ttl)  # type: ignore
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Failed to add to set {key}: {e}")
+            return False
+
+    def smembers(self, key: str) -> Set[str]:
+        """Get all members of a set, empty if missing or on error."""
+        try:
+            if self.client:
+                members = self.client.smembers(key)  # type: ignore
+                return {m.decode("utf-8") if isinstance(m, bytes) else str(m) for m in members}  # type: ignore
+            return set()
+        except Exception as e:
+            logger.error(f"Failed to read set {key}: {e}")
+            return set()
+
 # Global Redis service instance
 redis_service = RedisService() 
\ No newline at end of file
@@ -1,22 +1,41 @@
 # Re-export main interface and utilities for external usage
-from .interface import scrape_and_generate_quiz
-from .quiz_generator import generate_quiz_from_url
+from .interface import dedupe_urls, scrape_and_generate_quiz, scrape_and_generate_quiz_many
+from .quiz_generator import generate_quiz_from_url, generate_quiz_from_url_async
 from .content_fetcher import fetch_article_html, is_valid_url
+from .async_fetcher import FetchResult, article_fetcher, fetch_article_async
 from .text_cleaner import extract_clean_text
+from .process_pool import ExtractionLimitExceeded, extraction_pool
+from .stages import StageReport, stage_cache
+from .content_store import ContentStore
+from .image_assets import ImageStore, image_store
 from .topic_classifier import classify_topic
-from .difficulty_estimator import estimate_difficulty
+from .difficulty_estimator import estimate_difficulty, estimate_difficulty_batch
 from .cache import get_cached_quiz, set_cached_quiz
 from smart_quiz_api.models.enum import QuizType
 
 __all__ = [
     "scrape_and_generate_quiz",
+    "scrape_and_generate_quiz_many",
+    "dedupe_urls",
     "generate_quiz_from_url", 
+    "generate_quiz_from_url_async",
     "QuizType",
     "fetch_article_html",
     "is_valid_url",
+    "FetchResult",
+    "article_fetcher",
+    "fetch_article_async",
     "extract_clean_text",
+    "ExtractionLimitExceeded",
+    "extraction_pool",
+    "StageReport",
+    "stage_cache",
+    "ContentStore",
+    "ImageStore",
+    "image_store",
     "classify_topic",
     "estimate_difficulty",
+    "estimate_difficulty_batch",
     "get_cached_quiz",
     "set_cached_quiz"
 ]
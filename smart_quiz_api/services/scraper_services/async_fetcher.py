@@ -0,0 +1,258 @@
+## async_fetcher.py
+"""
+Async article fetcher on a shared connection pool.
+
+One ``aiohttp`` session is shared by every request, so connections are kept
+alive across calls, concurrent requests to the same host are capped, and DNS
+answers are cached. Each fetched URL remembers its ``ETag`` /
+``Last-Modified`` validators together with the extracted text; the next
+fetch sends a conditional request and a ``304 Not Modified`` reuses the
+stored text without downloading or parsing the page again.
+
+Validators live in a small in-process LRU backed by Redis, so they survive
+restarts when Redis is available and still work in development without it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from smart_quiz_api.services.redis_service import redis_service
+from .content_fetcher import (
+    CHUNK_SIZE, HEADERS, DownloadBudget, check_response_headers, decode_html,
+    fetch_article_html, header_charset, is_valid_url, link_canonical
+)
+from .process_pool import extraction_pool
+from .stages import StageReport, stage_cache
+
+logger = logging.getLogger(__name__)
+
+# Try to import aiohttp, fallback to the blocking fetcher in a worker thread if not available
+try:
+    import aiohttp  # type: ignore
+    _has_aiohttp = True
+except ImportError:
+    _has_aiohttp = False
+    logger.warning("aiohttp library not available, async fetches will run requests in a thread")
+
+POOL_LIMIT = 100            # Open connections across all hosts
+POOL_LIMIT_PER_HOST = 8     # Concurrent connections to a single host
+DNS_CACHE_TTL = 300         # Seconds
+REQUEST_TIMEOUT = 15        # Seconds, whole request
+VALIDATOR_TTL = 7 * 24 * 3600
+VALIDATOR_MEMORY_ENTRIES = 512
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one article fetch."""
+    url: str
+    status: int
+    text: str                           # Extracted article text
+    html: Optional[str] = None          # Raw HTML; None when the stored text was reused
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False          # True if a 304 revalidated the stored copy
+    canonical_link: Optional[str] = None  # <link rel="canonical"> target of the page
+
+
+# === Validator Store ===
+def _validator_key(url: str) -> str:
+    return f"article_validators:{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
+
+
+class ValidatorStore:
+    """ETag/Last-Modified plus extracted text per URL: in-process LRU in front of Redis."""
+
+    def __init__(
+        self,
+        max_entries: int = VALIDATOR_MEMORY_ENTRIES,
+        ttl: int = VALIDATOR_TTL,
+        use_redis: bool = True
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                return entry
+        if not self.use_redis:
+            return None
+        raw = redis_service.get(_validator_key(url))
+        if not raw:
+            return None
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            return None
+        self._remember(url, entry)
+        return entry
+
+    def set(self, url: str, entry: Dict[str, Any]) -> None:
+        self._remember(url, entry)
+        if self.use_redis:
+            redis_service.setex(_validator_key(url), self.ttl, json.dumps(entry))
+
+    def _remember(self, url: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# === Fetcher ===
+class AsyncArticleFetcher:
+    """Shared-session fetcher with conditional GET revalidation."""
+
+    def __init__(
+        self,
+        limit: int = POOL_LIMIT,
+        limit_per_host: int = POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = DNS_CACHE_TTL,
+        timeout: float = REQUEST_TIMEOUT,
+        validators: Optional[ValidatorStore] = None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self.validators = validators or ValidatorStore()
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        # Created lazily: aiohttp sessions must be built inside the event loop that uses them
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._loop = loop
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def fetch(self, url: str, report: Optional[StageReport] = None) -> FetchResult:
+        """
+        Fetch ``url`` and return its extracted text.
+
+        The ``fetch`` and ``extract`` stages are recorded in ``report`` if given.
+
+        Raises:
+            ValueError: If the URL is invalid, the page is not HTML, or it
+                exceeds the size or time budget.
+        """
+        if not is_valid_url(url):
+            raise ValueError(f"Invalid URL: {url}")
+        report = report if report is not None else StageReport()
+        start = time.perf_counter()
+
+        if not _has_aiohttp:
+            html = await asyncio.to_thread(fetch_article_html, url)
+            report.record("fetch", False, time.perf_counter() - start)
+            return await self._extract(url, 200, html, None, None, report)
+
+        stored = self.validators.get(url)
+        headers: Dict[str, str] = {}
+        if stored and stored.get("text"):
+            if stored.get("etag"):
+                headers["If-None-Match"] = stored["etag"]
+            if stored.get("last_modified"):
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+        try:
+            async with self._get_session().get(url, headers=headers) as response:
+                if response.status == 304 and stored:
+                    logger.info(f"Revalidated {url} (304), reusing extracted text")
+                    report.record("fetch", True, time.perf_counter() - start)
+                    report.record("extract", True, 0.0)
+                    return FetchResult(
+                        url=url,
+                        status=304,
+                        text=stored["text"],
+                        etag=stored.get("etag"),
+                        last_modified=stored.get("last_modified"),
+                        not_modified=True,
+                        canonical_link=stored.get("canonical_link"),
+                    )
+                response.raise_for_status()
+
+                content_type = response.headers.get("Content-Type")
+                check_response_headers(content_type, response.content_length)
+
+                # Stream in chunks; stop as soon as the size or time budget is exceeded
+                budget = DownloadBudget()
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    budget.add(chunk)
+
+                html = decode_html(bytes(budget.buffer), header_charset(content_type))
+                report.record("fetch", False, time.perf_counter() - start)
+                return await self._extract(
+                    url,
+                    response.status,
+                    html,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    report,
+                )
+        except aiohttp.ClientError as e:
+            logger.error(f"Request failed for URL {url}: {str(e)}")
+            raise
+
+    async def _extract(
+        self,
+        url: str,
+        status: int,
+        html: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        report: StageReport
+    ) -> FetchResult:
+        # Parsing is CPU-bound; keep it off the event loop and out of this process.
+        # Memoized on the page content, so a changed ETag with an identical body is not re-parsed.
+        text = await stage_cache.run_async(
+            "extract", html, lambda: extraction_pool.extract_clean_text_async(html), report
+        )
+        canonical = link_canonical(html, url)
+        if etag or last_modified:
+            self.validators.set(url, {
+                "etag": etag, "last_modified": last_modified, "text": text, "canonical_link": canonical
+            })
+        return FetchResult(
+            url=url, status=status, text=text, html=html, etag=etag,
+            last_modified=last_modified, canonical_link=canonical
+        )
+
+
+# Global fetcher instance (closed on application shutdown)
+article_fetcher = AsyncArticleFetcher()
+
+
+async def fetch_article_async(url: str, report: Optional[StageReport] = None) -> FetchResult:
+    """Fetch an article through the shared pooled fetcher."""
+    return await article_fetcher.fetch(url, report)
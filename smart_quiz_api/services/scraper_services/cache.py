@@ -5,13 +5,15 @@ from typing import Any, Dict, Optional
 import logging
 
 from smart_quiz_api.services.redis_service import redis_service
+from smart_quiz_api.services.quiz_library import canonical_url
 
 logger = logging.getLogger(__name__)
 
 CACHE_TTL = 3600
 
 def cache_key_url(url: str, quiz_type: str) -> str:
-    combined = f"{quiz_type}:{url}"
+    # Tracking parameters, AMP markers and mobile hosts all map to one key
+    combined = f"{quiz_type}:{canonical_url(url)}"
     return f"url_quiz_cache:{hashlib.sha256(combined.encode('utf-8')).hexdigest()}"
 
 def get_cached_quiz(url: str, quiz_type: str) -> Optional[Dict[str, Any]]:
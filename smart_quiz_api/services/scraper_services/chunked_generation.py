@@ -0,0 +1,195 @@
+## chunked_generation.py
+"""
+Long-document mode: quiz the whole article, not just its first snippet.
+
+The text is split into sentence-aligned chunks of about one snippet each
+(``split_text_into_chunks``). When an article has more chunks than the
+quiz needs (at most ``SCRAPER_MAX_CHUNKS``), chunks are picked evenly over
+its length. Every chunk is asked for a share of the questions, and all chunk calls are in
+flight at once; each still takes a slot of the LLM limiter. A 20-question
+quiz therefore costs about the latency of one short completion instead of
+one long serial completion.
+
+The per-chunk answers are merged: malformed questions are dropped, near-
+duplicates (chunks overlap in subject) are removed, and questions are
+ranked by how many of the article's keywords they cover. They are then
+taken round-robin across chunks so the quiz spans the whole article.
+"""
+
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from smart_quiz_api.config import settings
+from smart_quiz_api.services.openai_service import extract_json_payload
+from smart_quiz_api.services.quiz_library import is_generation_failure
+from smart_quiz_api.utils.text_analysis import TextAnalysis, analyze, tokenize
+from smart_quiz_api.utils.text_utils import split_text_into_chunks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUESTION_COUNTS = {"MCQ": 5, "TF": 10, "IMAGE": 5}
+CHUNK_CHARS = 1600          # Same prompt size as the single-snippet path
+MIN_CHUNK_CHARS = 400       # Shorter chunks for big quizzes on short articles, down to this
+OVERSAMPLE = 1.5            # Extra questions asked for, to absorb duplicates and malformed ones
+MIN_PER_CHUNK = 2
+MAX_PER_CHUNK = 8           # Keeps every chunk call a short completion
+TOKENS_PER_QUESTION = 110   # JSON MCQ question with four options
+DUPLICATE_OVERLAP = 0.7     # Word-set Jaccard above which two questions are the same question
+
+# Threads only wait on the LLM; the LLM limiter bounds the calls actually in flight
+chunk_executor = ThreadPoolExecutor(max_workers=max(1, settings.llm_max_concurrency), thread_name_prefix="quiz-chunk")
+
+
+def select_chunks(text: str, count: int, max_chunks: int) -> List[str]:
+    """Sentence-aligned chunks of ``text`` for a ``count``-question quiz, spread evenly over the text."""
+    # No chunk is asked for more than MAX_PER_CHUNK questions, or for fewer than MIN_PER_CHUNK
+    needed = min(max_chunks, math.ceil(count * OVERSAMPLE / MAX_PER_CHUNK))
+    wanted = min(max_chunks, math.ceil(count * OVERSAMPLE / MIN_PER_CHUNK))
+    chunk_chars = max(MIN_CHUNK_CHARS, min(CHUNK_CHARS, len(text) // needed))
+    chunks = split_text_into_chunks(text, chunk_chars)
+    if len(chunks) <= wanted:
+        return chunks
+    if wanted <= 1:
+        return chunks[:1]
+    step = (len(chunks) - 1) / (wanted - 1)
+    return [chunks[round(i * step)] for i in range(wanted)]
+
+
+def questions_per_chunk(count: int, chunks: int) -> int:
+    return min(MAX_PER_CHUNK, max(MIN_PER_CHUNK, math.ceil(count * OVERSAMPLE / max(chunks, 1))))
+
+
+def max_tokens_for(questions: int) -> int:
+    return 100 + questions * TOKENS_PER_QUESTION
+
+
+def parse_questions(response: Any) -> List[Dict[str, Any]]:
+    """
+    Well-formed questions of one chunk response: a question and an answer,
+    and the answer among the options if any.
+    """
+    if not isinstance(response, str) or is_generation_failure(response):
+        return []
+    try:
+        payload = extract_json_payload(response)
+    except ValueError:
+        return []
+    if isinstance(payload, dict):
+        payload = payload.get("questions", [])
+    if not isinstance(payload, list):
+        return []
+
+    questions = []
+    for q in payload:
+        if not isinstance(q, dict):
+            continue
+        question, answer, options = q.get("question"), q.get("answer"), q.get("options")
+        if not isinstance(question, str) or not question.strip() or not isinstance(answer, str) or not answer.strip():
+            continue
+        if options is not None and (not isinstance(options, list) or answer not in options):
+            continue
+        questions.append(q)
+    return questions
+
+
+def _score(words: Set[str], analysis: TextAnalysis) -> float:
+    """Coverage of the article's keywords, damped by question length."""
+    keywords = analysis.keyword_counts
+    return sum(math.log1p(keywords[word]) for word in words) / math.sqrt(len(words) or 1)
+
+
+def merge_questions(per_chunk: List[List[Dict[str, Any]]], count: int, analysis: TextAnalysis) -> List[Dict[str, Any]]:
+    """Deduplicate and rank the questions of every chunk, then take ``count`` round-robin across chunks."""
+    ranked: List[List[Tuple[float, Set[str], Dict[str, Any]]]] = []
+    for questions in per_chunk:
+        scored = []
+        for q in questions:
+            words = set(tokenize(q["question"])) - {".", "?", "!"}
+            scored.append((_score(words, analysis), words, q))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        ranked.append(scored)
+
+    # Best chunks first, so a short quiz draws from the most topical parts
+    ranked.sort(key=lambda scored: scored[0][0] if scored else 0.0, reverse=True)
+
+    merged: List[Dict[str, Any]] = []
+    seen: List[Set[str]] = []
+    position = 0
+    while len(merged) < count and any(position < len(scored) for scored in ranked):
+        for scored in ranked:
+            if position >= len(scored) or len(merged) >= count:
+                continue
+            _, words, q = scored[position]
+            if any(len(words & other) / (len(words | other) or 1) > DUPLICATE_OVERLAP for other in seen):
+                continue
+            seen.append(words)
+            merged.append(q)
+        position += 1
+    return merged
+
+
+def _chunk_prompt(quiz_type: str, difficulty: str, chunk: str, questions: int, part: int, parts: int) -> str:
+    return f"""Generate {questions} {quiz_type} questions based on the following content \
+(part {part} of {parts} of an article).
+
+Difficulty: {difficulty}
+
+Content:
+{chunk}
+
+Instructions:
+- For MCQ: 4 options each
+- For TF: options ["True", "False"]
+- For IMAGE: questions that would work well with images/diagrams
+- Only ask about facts stated in this part
+
+Respond with JSON only, in this format:
+{{"questions": [{{"question": "...", "options": ["..."], "answer": "..."}}]}}"""
+
+
+def generate_chunked(
+    text: str,
+    quiz_type: str,
+    difficulty: str,
+    count: Optional[int],
+    generate: Callable[[str, int], str],
+    max_chunks: Optional[int] = None
+) -> Optional[str]:
+    """
+    Quiz of ``count`` questions over the whole of ``text``, as a ``{"questions": [...]}``
+    JSON string, or None if no chunk produced a usable question.
+
+    ``generate(prompt, max_tokens)`` runs one LLM call (through the stage cache
+    and the LLM limiter); chunk calls run concurrently.
+    """
+    count = count or DEFAULT_QUESTION_COUNTS.get(quiz_type, 5)
+    chunks = select_chunks(text, count, max_chunks or settings.scraper_max_chunks)
+    per_chunk = questions_per_chunk(count, len(chunks))
+    prompts = [
+        _chunk_prompt(quiz_type, difficulty, chunk, per_chunk, i + 1, len(chunks))
+        for i, chunk in enumerate(chunks)
+    ]
+    futures = [chunk_executor.submit(generate, prompt, max_tokens_for(per_chunk)) for prompt in prompts]
+    responses = [future.result() for future in futures]
+
+    parsed = [parse_questions(response) for response in responses]
+    merged = merge_questions(parsed, count, analyze(text))
+    if not merged:
+        return None
+    if len(merged) < count:
+        logger.warning(f"Long-document quiz has {len(merged)} of {count} questions "
+                       f"({sum(len(p) for p in parsed)} usable from {len(chunks)} chunks)")
+    return json.dumps({"questions": merged})
+
+
+__all__ = [
+    "DEFAULT_QUESTION_COUNTS",
+    "chunk_executor",
+    "generate_chunked",
+    "merge_questions",
+    "parse_questions",
+    "select_chunks",
+]
@@ -0,0 +1,161 @@
+## cloze_generator.py
+"""
+LLM-free fill-in-the-blank questions from extracted article text.
+
+Used for ``mode=local`` requests and as the degraded-mode fallback when the
+LLM call fails. Everything is local and runs in a few milliseconds:
+
+- sentences are ranked by salience (``context_selector.score_sentences``);
+- in each chosen sentence the most salient term not used yet becomes the
+  blank: names and numbers first, then the document's frequent keywords;
+- distractors are terms of the same kind (name, number or common word) from
+  the same document with a similar frequency and length, so they read as
+  plausible answers. Numbers missing distractors get nearby values.
+
+TF questions alternate between the original sentence (True) and the
+sentence with its term swapped for a distractor (False). IMAGE quizzes get
+MCQ questions. Output is the same ``{"questions": [...]}`` JSON the LLM
+paths produce, and the same text always yields the same quiz.
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from smart_quiz_api.utils.text_analysis import analyze, is_terminator, tokenize
+from smart_quiz_api.utils.text_utils import extract_keywords
+from .chunked_generation import DEFAULT_QUESTION_COUNTS
+from .context_selector import KEYWORDS, score_sentences, split_sentences
+
+BLANK = "_____"
+DISTRACTORS = 3
+MIN_ANSWER_CHARS = 4
+MAX_SENTENCE_WORDS = 40         # Longer sentences make unreadable questions
+DISTRACTOR_CANDIDATES = 8       # Closest-frequency terms the distractors are drawn from
+NUMBER_OFFSETS = (-10, -5, -3, 3, 5, 10)
+
+# Common words that make trivial blanks; the shared STOP_WORDS only cover the most frequent ones
+FUNCTION_WORDS = frozenset("""
+    about above after again against also although among another because before behind being below
+    between both cannot down during each either even ever every from further here however into itself
+    just least less many more most much must neither never none nothing once only other others otherwise
+    over same several since some such than that their them themselves then there therefore these they
+    this those though through thus under until upon very what whatever when where whether which while
+    whom whose with within without your yours first second last next often still well
+    made make makes many said says told took went come came like including
+""".split())
+
+
+class _Terms:
+    """Candidate answers of one document, by kind: names, numbers and common words."""
+
+    def __init__(self, text: str, sentences: List[str]):
+        self.counts: Counter = Counter(analyze(text).keyword_counts)
+        self.names: Set[str] = set()
+        for sentence in sentences:
+            # Capitalized anywhere but at the start of a sentence
+            for word in re.findall(r"\b[A-Z][a-z]+\b", sentence.split(" ", 1)[-1] if " " in sentence else ""):
+                self.names.add(word.lower())
+        numbers = [token for token in analyze(text).words if token.isdigit() and len(token) >= 2]
+        self.counts.update(numbers)
+        self.numbers: Set[str] = set(numbers)
+
+    def kind(self, word: str) -> int:
+        return 2 if word in self.names else 1 if word in self.numbers else 0
+
+    def usable(self, word: str) -> bool:
+        if word in self.numbers:
+            return True
+        return word in self.counts and len(word) >= MIN_ANSWER_CHARS and word not in FUNCTION_WORDS
+
+    def salience(self, word: str) -> tuple:
+        return (self.kind(word) > 0, math.log1p(self.counts[word]) + min(len(word), 12) / 12, word)
+
+    def distractors(self, answer: str, exclude: Set[str]) -> List[str]:
+        """Same-kind terms ordered by how close their frequency and length are to ``answer``'s."""
+        kind = self.kind(answer)
+        target = math.log(self.counts[answer])
+        candidates = [
+            word for word in self.counts
+            if word not in exclude and self.kind(word) == kind and self.usable(word)
+            # Inflections of the answer ("glacier"/"glaciers") would be a second right answer
+            and word[:MIN_ANSWER_CHARS] != answer[:MIN_ANSWER_CHARS]
+        ]
+        candidates.sort(key=lambda w: (abs(math.log(self.counts[w]) - target), abs(len(w) - len(answer)), w))
+        candidates = candidates[:DISTRACTOR_CANDIDATES]
+        if kind == 1 and len(candidates) < DISTRACTORS:
+            value = int(answer)
+            candidates += [
+                str(value + offset) for offset in NUMBER_OFFSETS
+                if value + offset > 0 and str(value + offset) not in exclude and str(value + offset) not in candidates
+            ]
+        return candidates
+
+
+def _match_case(word: str, surface: str) -> str:
+    return word.capitalize() if surface[:1].isupper() else word
+
+
+def generate_cloze(text: str, quiz_type: str, count: Optional[int] = None) -> Optional[str]:
+    """
+    Quiz of up to ``count`` cloze questions over ``text``, as a ``{"questions": [...]}``
+    JSON string, or None if the text has no sentence to quiz on.
+    """
+    count = count or DEFAULT_QUESTION_COUNTS.get(quiz_type, 5)
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    sentences = split_sentences(text)
+    scores = score_sentences(sentences, extract_keywords(text, KEYWORDS))
+    terms = _Terms(text, sentences)
+    needed = 1 if quiz_type == "TF" else DISTRACTORS
+
+    chosen: Dict[int, Dict[str, object]] = {}
+    used: Set[str] = set()
+    seen: Set[str] = set()
+    for index in sorted(range(len(sentences)), key=scores.__getitem__, reverse=True):
+        if len(chosen) >= count or scores[index] <= 0:
+            break
+        sentence = sentences[index]
+        words = {token for token in tokenize(sentence) if not is_terminator(token)}
+        # Repeated sentences (pull quotes, syndicated boilerplate) are asked about once
+        if len(words) > MAX_SENTENCE_WORDS or sentence in seen:
+            continue
+        seen.add(sentence)
+        for answer in sorted((w for w in words if w not in used and terms.usable(w)), key=terms.salience, reverse=True):
+            match = re.search(rf"\b{re.escape(answer)}\b", sentence, re.IGNORECASE)
+            pool = terms.distractors(answer, words | used)
+            if match is not None and len(pool) >= needed:
+                break
+        else:
+            continue
+        surface = match.group(0)
+        distractors = [_match_case(word, surface) for word in rng.sample(pool, needed)]
+        used.add(answer)
+
+        if quiz_type == "TF":
+            truthful = len(chosen) % 2 == 0
+            statement = sentence if truthful else sentence[:match.start()] + distractors[0] + sentence[match.end():]
+            chosen[index] = {
+                "question": f"True or false: {statement}",
+                "options": ["True", "False"],
+                "answer": "True" if truthful else "False",
+            }
+        else:
+            options = [surface] + distractors
+            rng.shuffle(options)
+            chosen[index] = {
+                "question": f"Fill in the blank: {sentence[:match.start()]}{BLANK}{sentence[match.end():]}",
+                "options": options,
+                "answer": surface,
+            }
+
+    if not chosen:
+        return None
+    # Article order reads better than salience order
+    return json.dumps({"questions": [chosen[index] for index in sorted(chosen)]})
+
+
+__all__ = ["FUNCTION_WORDS", "generate_cloze"]
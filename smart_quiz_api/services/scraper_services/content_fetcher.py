@@ -1,11 +1,50 @@
 
 ## content_fetcher.py
+import codecs
+import re
+import time
 import requests
-from urllib.parse import urlparse
+from email.message import Message
+from typing import Iterable, Optional
+from urllib.parse import urljoin, urlparse
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Try to import charset_normalizer, fallback to UTF-8 with replacement if not available
+try:
+    from charset_normalizer import from_bytes  # type: ignore
+    _has_charset_normalizer = True
+except ImportError:
+    _has_charset_normalizer = False
+    logger.warning("charset_normalizer library not available, undeclared charsets decode as UTF-8")
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/91.0.4472.124 Safari/537.36"
+    )
+}
+MAX_CONTENT_BYTES = 10 * 1024 * 1024
+MAX_DOWNLOAD_SECONDS = 20       # Wall-clock budget for the whole body
+CHUNK_SIZE = 64 * 1024
+META_SNIFF_BYTES = 4096         # <meta charset> must appear early in the document
+DETECT_SNIFF_BYTES = 64 * 1024  # Charset detection never looks past this prefix
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+_LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_LINK_ATTR = re.compile(r"""(rel|href)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Shared session so blocking callers also reuse keep-alive connections
+_session = requests.Session()
+_session.headers.update(HEADERS)
+
 def is_valid_url(url: str) -> bool:
     """Validate if the given string is a valid HTTP/HTTPS URL."""
     try:
@@ -16,28 +55,128 @@ def is_valid_url(url: str) -> bool:
     except Exception:
         return False
 
+def check_response_headers(content_type: Optional[str], content_length: Optional[int]) -> None:
+    """
+    Reject a response from its headers, before any of the body is read.
+
+    Raises:
+        ValueError: If the declared content type is not HTML or the declared size is over the limit.
+    """
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type and media_type not in HTML_CONTENT_TYPES:
+        raise ValueError(f"Unsupported content type: {media_type}")
+    if content_length is not None and content_length > MAX_CONTENT_BYTES:
+        raise ValueError("Content too large (>10MB)")
+
+def header_charset(content_type: Optional[str]) -> Optional[str]:
+    """The ``charset`` parameter of a Content-Type header, if any."""
+    if not content_type:
+        return None
+    message = Message()
+    message["content-type"] = content_type
+    charset = message.get_param("charset")
+    return str(charset) if charset else None
+
+class DownloadBudget:
+    """Tracks bytes and elapsed time of one body download."""
+
+    def __init__(self, max_bytes: int = MAX_CONTENT_BYTES, max_seconds: float = MAX_DOWNLOAD_SECONDS):
+        self.max_bytes = max_bytes
+        self.deadline = time.monotonic() + max_seconds
+        self.buffer = bytearray()
+
+    def add(self, chunk: bytes) -> None:
+        """
+        Raises:
+            ValueError: As soon as the byte limit or the time budget is exceeded.
+        """
+        self.buffer += chunk
+        if len(self.buffer) > self.max_bytes:
+            raise ValueError("Content too large (>10MB)")
+        if time.monotonic() > self.deadline:
+            raise ValueError("Download exceeded time budget")
+
+def read_bounded(chunks: Iterable[bytes], budget: Optional[DownloadBudget] = None) -> bytes:
+    budget = budget or DownloadBudget()
+    for chunk in chunks:
+        budget.add(chunk)
+    return bytes(budget.buffer)
+
+def _usable_codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip("\"'")).name
+    except LookupError:
+        return None
+
+def _is_utf8(prefix: bytes) -> bool:
+    try:
+        # Incremental so a multi-byte sequence cut at the prefix end is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+def decode_html(body: bytes, declared_charset: Optional[str] = None) -> str:
+    """
+    Decode an HTML body without running detection over the whole document.
+
+    Order: byte-order mark, declared (header) charset, ``<meta charset>`` in
+    the first few KB, a strict UTF-8 check and then charset detection on a
+    bounded prefix, then UTF-8 with replacement.
+    """
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return body.decode(encoding, errors="replace")
+
+    encoding = _usable_codec(declared_charset)
+    if encoding is None:
+        match = _META_CHARSET.search(body[:META_SNIFF_BYTES])
+        encoding = _usable_codec(match.group(1).decode("ascii", "ignore")) if match else None
+    if encoding is None and _is_utf8(body[:DETECT_SNIFF_BYTES]):
+        encoding = "utf-8"
+    if encoding is None and _has_charset_normalizer:
+        try:
+            best = from_bytes(body[:DETECT_SNIFF_BYTES]).best()
+            encoding = _usable_codec(best.encoding) if best else None
+        except Exception as e:
+            logger.warning(f"Charset detection failed: {e}")
+    return body.decode(encoding or "utf-8", errors="replace")
+
+def link_canonical(html: str, base_url: str) -> Optional[str]:
+    """The absolute ``<link rel="canonical">`` target from the document head, if any."""
+    head = html[:DETECT_SNIFF_BYTES]
+    for tag in _LINK_TAG.findall(head):
+        attrs = {}
+        for name, double_quoted, single_quoted, bare in _LINK_ATTR.findall(tag):
+            attrs[name.lower()] = double_quoted or single_quoted or bare
+        if "canonical" in attrs.get("rel", "").lower().split() and attrs.get("href"):
+            target = urljoin(base_url, attrs["href"].strip())
+            return target if is_valid_url(target) else None
+    return None
+
 def fetch_article_html(url: str) -> str:
-    """Fetch HTML content from a URL with proper error handling."""
+    """
+    Fetch HTML content from a URL with proper error handling.
+
+    The body is streamed in chunks and the download is abandoned as soon as
+    it exceeds ``MAX_CONTENT_BYTES`` or ``MAX_DOWNLOAD_SECONDS``; non-HTML
+    responses are rejected from their headers.
+    """
     if not is_valid_url(url):
         raise ValueError(f"Invalid URL: {url}")
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        # Check content size (10MB limit)
-        if len(response.content) > 10 * 1024 * 1024:
-            raise ValueError("Content too large (>10MB)")
+        with _session.get(url, timeout=15, stream=True) as response:
+            response.raise_for_status()
 
-        # Check if we got HTML content
-        content_type = response.headers.get('content-type', '').lower()
-        if 'text/html' not in content_type and 'application/xhtml' not in content_type:
-            logger.warning(f"Content type is not HTML: {content_type}")
+            content_type = response.headers.get("content-type")
+            content_length = response.headers.get("content-length", "")
+            check_response_headers(content_type, int(content_length) if content_length.isdigit() else None)
 
-        return response.text
+            body = read_bounded(response.iter_content(CHUNK_SIZE))
+            return decode_html(body, header_charset(content_type))
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed for URL {url}: {str(e)}")
         raise
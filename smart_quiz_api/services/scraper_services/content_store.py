@@ -0,0 +1,249 @@
+## content_store.py
+"""
+Content-addressed on-disk store for scraped pages.
+
+Every fetched page is kept as zlib-compressed raw HTML plus its extracted
+text, both named by the SHA-256 of the HTML:
+
+    <CONTENT_STORE_DIR>/objects/ab/abcdef....html.z
+    <CONTENT_STORE_DIR>/objects/ab/abcdef....txt.z
+    <CONTENT_STORE_DIR>/index.sqlite3
+
+The SQLite index maps canonical URLs to content hashes and records the
+size and last access of every object. When the store grows past
+``CONTENT_STORE_MAX_MB``, the least recently used objects are deleted
+together with the URLs that point at them. Identical pages served under
+several URLs share one object. Files over ``MMAP_MIN_BYTES`` are memory-
+mapped and decompressed in place instead of being read into a copy first.
+
+``generate_quiz_from_url(..., offline=True)`` and the ``regenerate`` CLI
+build quizzes from stored text without touching the network. That is what
+makes changing prompts or question counts cheap.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from smart_quiz_api.config import settings
+from smart_quiz_api.services.quiz_library import canonical_url
+
+logger = logging.getLogger(__name__)
+
+MMAP_MIN_BYTES = 1024 * 1024      # Smaller files are cheaper to read() than to map
+COMPRESSION_LEVEL = 6
+EVICT_TO = 0.9                    # Evict down to this share of the size limit, so eviction does not run on every put
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    canonical_link TEXT,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES objects(hash) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS objects_last_access ON objects(last_access);
+CREATE INDEX IF NOT EXISTS urls_hash ON urls(hash);
+"""
+
+
+@dataclass
+class StoredArticle:
+    """Extracted text of a stored page and where it came from."""
+    url: str
+    hash: str
+    text: str
+    canonical_link: Optional[str]
+    stored_at: float
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class ContentStore:
+    """Compressed HTML and extracted text keyed by content hash, with a URL index and LRU eviction."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index = os.path.join(root, "index.sqlite3")
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # === Files ===
+    def _path(self, digest: str, kind: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.{kind}.z")
+
+    def _write(self, path: str, data: str, overwrite: bool = False) -> int:
+        """Write ``data`` compressed, atomically; returns the bytes on disk."""
+        if not overwrite and os.path.exists(path):
+            return os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blob = zlib.compress(data.encode("utf-8"), COMPRESSION_LEVEL)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(blob)
+        os.replace(temp, path)
+        return len(blob)
+
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+                return zlib.decompress(f.read()).decode("utf-8")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return zlib.decompress(mapped).decode("utf-8")
+
+    # === Index ===
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    os.makedirs(self.root, exist_ok=True)
+                    with sqlite3.connect(self._index) as db:
+                        db.execute("PRAGMA journal_mode=WAL")
+                        db.executescript(_SCHEMA)
+                    self._ready = True
+        db = sqlite3.connect(self._index, timeout=10)
+        db.execute("PRAGMA foreign_keys=ON")
+        return db
+
+    def put(self, urls: List[Optional[str]], html: str, text: str, canonical_link: Optional[str] = None) -> str:
+        """Store a page and its extracted text under every URL in ``urls``; returns the content hash."""
+        digest = content_hash(html)
+        size = self._write(self._path(digest, "html"), html) + self._write(self._path(digest, "txt"), text)
+        now = time.time()
+        db = self._connect()
+        try:
+            with db:
+                db.execute(
+                    "INSERT INTO objects (hash, size, canonical_link, stored_at, last_access) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(hash) DO UPDATE SET last_access = excluded.last_access",
+                    (digest, size, canonical_link, now, now),
+                )
+                db.executemany(
+                    "INSERT OR REPLACE INTO urls (url, hash) VALUES (?, ?)",
+                    [(canonical_url(url), digest) for url in {u for u in urls if u}],
+                )
+            self._evict(db)
+        finally:
+            db.close()
+        return digest
+
+    def get(self, url: str) -> Optional[StoredArticle]:
+        """The stored text for ``url`` (by canonical form), or None."""
+        db = self._connect()
+        try:
+            row = db.execute(
+                "SELECT o.hash, o.canonical_link, o.stored_at FROM urls u "
+                "JOIN objects o ON o.hash = u.hash WHERE u.url = ?",
+                (canonical_url(url),),
+            ).fetchone()
+            if row is None:
+                return None
+            digest, canonical_link, stored_at = row
+            try:
+                text = self._read(self._path(digest, "txt"))
+            except OSError:
+                # Deleted behind our back: drop the dangling entry
+                with db:
+                    db.execute("DELETE FROM objects WHERE hash = ?", (digest,))
+                return None
+            with db:
+                db.execute("UPDATE objects SET last_access = ? WHERE hash = ?", (time.time(), digest))
+            return StoredArticle(url, digest, text, canonical_link, stored_at)
+        finally:
+            db.close()
+
+    def replace_text(self, digest: str, text: str) -> None:
+        """Swap the extracted text of a stored page (e.g. after the extractor changed)."""
+        size = self._write(self._path(digest, "txt"), text, overwrite=True)
+        db = self._connect()
+        try:
+            with db:
+                db.execute(
+                    "UPDATE objects SET size = ? WHERE hash = ?",
+                    (os.path.getsize(self._path(digest, "html")) + size, digest),
+                )
+        finally:
+            db.close()
+
+    def get_html(self, digest: str) -> Optional[str]:
+        try:
+            return self._read(self._path(digest, "html"))
+        except OSError:
+            return None
+
+    def urls(self) -> Iterator[str]:
+        """Every stored canonical URL, most recently stored first."""
+        db = self._connect()
+        try:
+            rows = db.execute(
+                "SELECT u.url FROM urls u JOIN objects o ON o.hash = u.hash ORDER BY o.stored_at DESC, u.url"
+            ).fetchall()
+        finally:
+            db.close()
+        return (url for (url,) in rows)
+
+    def size(self) -> int:
+        db = self._connect()
+        try:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        finally:
+            db.close()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO
+        evicted = []
+        for digest, size in db.execute("SELECT hash, size FROM objects ORDER BY last_access").fetchall():
+            if total <= target:
+                break
+            evicted.append(digest)
+            total -= size
+        with db:
+            db.executemany("DELETE FROM objects WHERE hash = ?", [(digest,) for digest in evicted])
+        for digest in evicted:
+            for kind in ("html", "txt"):
+                try:
+                    os.remove(self._path(digest, kind))
+                except OSError:
+                    pass
+        logger.info(f"Content store evicted {len(evicted)} pages, {total / (1024 * 1024):.1f} MB left")
+
+
+# Global content store (disabled when CONTENT_STORE_MAX_MB is 0)
+content_store = ContentStore(settings.content_store_dir, settings.content_store_max_mb * 1024 * 1024)
+
+
+def store_article(
+    urls: List[Optional[str]], html: Optional[str], text: str, canonical_link: Optional[str] = None
+) -> None:
+    """Keep a freshly fetched page in the content store; failures are logged, never raised."""
+    if not content_store.enabled or not html:
+        return
+    try:
+        content_store.put(urls, html, text, canonical_link)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Content store write failed: {e}")
+
+
+__all__ = ["ContentStore", "StoredArticle", "content_hash", "content_store", "store_article"]
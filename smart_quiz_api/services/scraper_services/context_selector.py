@@ -0,0 +1,107 @@
+## context_selector.py
+"""
+Salience-based context selection for quiz prompts.
+
+The article prefix is often a lede, a byline or navigation boilerplate. This
+stage instead scores every sentence locally and packs the best ones into a
+token budget (``SCRAPER_CONTEXT_TOKENS``), measured with the model's cached
+tokenizer:
+
+- keyword density: the article's top ``extract_keywords`` terms per word,
+  weighted by rank;
+- named-entity-like words: capitalized words after the first, and numbers;
+- position: a mild preference for earlier sentences.
+
+Very short sentences (headings, bylines, "Read more") and repeats are
+skipped. The chosen sentences keep their article order. ``tokens_saved``
+compares the selection with the prefix snippet it replaces.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+from smart_quiz_api.services.openai_service import estimate_tokens
+from smart_quiz_api.utils.text_analysis import analyze, is_terminator, tokenize
+from smart_quiz_api.utils.text_utils import extract_keywords
+
+KEYWORDS = 15
+MIN_SENTENCE_WORDS = 6
+KEYWORD_WEIGHT = 1.0
+ENTITY_WEIGHT = 0.25
+POSITION_WEIGHT = 0.2
+
+_ENTITY = re.compile(r"\b(?:[A-Z][\w'’-]*|\d[\d,.]*)")
+
+
+@dataclass(frozen=True)
+class ContextSelection:
+    text: str
+    tokens: int
+    snippet_tokens: int     # What the article prefix snippet would have cost
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.snippet_tokens - self.tokens)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Whitespace-normalized sentences of ``text``, cut at its sentence ends (never inside "3.5" or "U.S.")."""
+    sentences = []
+    start = 0
+    for end in analyze(text).sentence_ends + [len(text)]:
+        sentence = " ".join(text[start:end].split())
+        start = end
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def score_sentences(sentences: List[str], keywords: List[str]) -> List[float]:
+    """Salience of each sentence; 0 for sentences too short to quiz on."""
+    weights = {word: 1 - rank / len(keywords) for rank, word in enumerate(keywords)}
+    scores = []
+    for position, sentence in enumerate(sentences):
+        words = [token for token in tokenize(sentence) if not is_terminator(token)]
+        if len(words) < MIN_SENTENCE_WORDS:
+            scores.append(0.0)
+            continue
+        density = sum(weights.get(word, 0.0) for word in words) / len(words)
+        # Capitalized words other than the sentence's first, and numbers
+        entities = len(set(_ENTITY.findall(sentence.split(" ", 1)[-1]))) / len(words)
+        recency = 1 - position / len(sentences)
+        scores.append(KEYWORD_WEIGHT * density + ENTITY_WEIGHT * min(entities, 0.5) + POSITION_WEIGHT * recency)
+    return scores
+
+
+def select_context(text: str, budget: int, model: str, snippet: str) -> ContextSelection:
+    """The highest-value sentences of ``text`` that fit in ``budget`` tokens, in article order."""
+    snippet_tokens = estimate_tokens(snippet, model)
+    sentences = split_sentences(text)
+    costs = [estimate_tokens(sentence, model) for sentence in sentences]
+    if sum(costs) <= budget:
+        whole = " ".join(sentences)
+        return ContextSelection(whole, estimate_tokens(whole, model), snippet_tokens)
+
+    scores = score_sentences(sentences, extract_keywords(text, KEYWORDS))
+    chosen: List[int] = []
+    seen = set()
+    remaining = budget
+    # Tokens of the cheapest sentence worth sending: below that nothing else fits
+    smallest = min((cost for cost, score in zip(costs, scores) if score > 0), default=0)
+    for index in sorted(range(len(sentences)), key=scores.__getitem__, reverse=True):
+        if scores[index] <= 0 or remaining < smallest:
+            break
+        # Repeated sentences (pull quotes, syndicated boilerplate) are sent once
+        if costs[index] <= remaining and sentences[index] not in seen:
+            chosen.append(index)
+            seen.add(sentences[index])
+            remaining -= costs[index]
+
+    if not chosen:
+        return ContextSelection(snippet, snippet_tokens, snippet_tokens)
+    context = " ".join(sentences[i] for i in sorted(chosen))
+    return ContextSelection(context, estimate_tokens(context, model), snippet_tokens)
+
+
+__all__ = ["ContextSelection", "score_sentences", "select_context", "split_sentences"]
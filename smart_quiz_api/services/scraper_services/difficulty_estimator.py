@@ -1,51 +1,46 @@
-
-## difficulty_estimator.py
 import logging
-from typing import Literal
+from typing import List, Literal, Sequence
+
+from smart_quiz_api.utils.text_analysis import analyze, tokenize
+from .readability import ReadabilityScores, score_token_lists
 
 logger = logging.getLogger(__name__)
 
 DifficultyLevel = Literal["easy", "medium", "hard"]
 
-# Try to import textstat, fallback to simple estimation if not available
-try:
-    from textstat import flesch_kincaid_grade  # type: ignore
-    _has_textstat = True
-except ImportError:
-    _has_textstat = False
-    logger.warning("textstat library not available, using simple difficulty estimation")
+
+def _difficulty(scores: ReadabilityScores) -> DifficultyLevel:
+    if scores.words < 100:
+        return "easy"
+    grade = scores.flesch_kincaid_grade
+    if grade < 6:
+        return "easy"
+    elif grade < 10:
+        return "medium"
+    else:
+        return "hard"
+
 
 def estimate_difficulty(text: str) -> DifficultyLevel:
     """Estimate the difficulty level of text using Flesch-Kincaid grade level."""
     try:
         if not text or len(text.strip()) < 50:
             return "medium"
-            
-        word_count = len(text.split())
-        if word_count < 100:
-            return "easy"
-
-        if _has_textstat:
-            grade = flesch_kincaid_grade(text)  # type: ignore
-            if grade < 6:
-                return "easy"
-            elif grade < 10:
-                return "medium"
-            else:
-                return "hard"
-        else:
-            # Simple fallback estimation based on word length and sentence complexity
-            avg_word_length = sum(len(word) for word in text.split()) / word_count
-            sentence_count = text.count('.') + text.count('!') + text.count('?')
-            avg_sentence_length = word_count / max(sentence_count, 1)
-            
-            if avg_word_length > 6 or avg_sentence_length > 20:
-                return "hard"
-            elif avg_word_length > 5 or avg_sentence_length > 15:
-                return "medium"
-            else:
-                return "easy"
-                
+        return _difficulty(score_token_lists([analyze(text).tokens])[0])
+
     except Exception as e:
         logger.warning(f"Difficulty estimation failed: {str(e)}")
         return "medium"
+
+
+def estimate_difficulty_batch(texts: Sequence[str]) -> List[DifficultyLevel]:
+    """``estimate_difficulty`` for many texts (or chunks of one text), scored in one pass."""
+    try:
+        scores = score_token_lists([tokenize(text or "") for text in texts])
+        return [
+            "medium" if not text or len(text.strip()) < 50 else _difficulty(score)
+            for text, score in zip(texts, scores)
+        ]
+    except Exception as e:
+        logger.warning(f"Difficulty estimation failed: {str(e)}")
+        return ["medium"] * len(texts)
@@ -0,0 +1,142 @@
+## html_extractor.py
+"""
+Single-parse article extraction on lxml.
+
+The document is parsed once with lxml's C parser, boilerplate elements are
+stripped in place, and paragraph-like blocks are scored in one pass over the
+tree: each block credits its parent fully and its grandparent by half, the
+same heuristic readability uses. The best-scoring container (plus strong
+siblings) is the article; if it is too short the whole stripped body is
+used instead, mirroring ``extract_clean_text``'s fallback.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional
+
+from lxml import etree  # type: ignore
+from lxml import html as lxml_html  # type: ignore
+
+from smart_quiz_api.utils.text_analysis import analyze
+
+logger = logging.getLogger(__name__)
+
+BOILERPLATE_TAGS = (
+    "script", "style", "noscript", "nav", "header", "footer", "aside",
+    "form", "iframe", "svg", "button", "select", "template",
+)
+SCORED_TAGS = ("p", "pre", "td", "blockquote")
+MIN_BLOCK_CHARS = 25
+MIN_ARTICLE_WORDS = 100   # Same threshold as the readability path
+MIN_FALLBACK_WORDS = 50   # Same threshold as the BeautifulSoup fallback
+SIBLING_SCORE_RATIO = 0.2
+
+_POSITIVE = re.compile(r"article|body|content|entry|main|page|post|story|text", re.IGNORECASE)
+_NEGATIVE = re.compile(
+    r"ad-|banner|comment|combx|contact|footer|footnote|masthead|menu|meta|nav|outbrain|"
+    r"promo|related|scroll|share|shoutbox|sidebar|social|sponsor|subscribe|tags|widget",
+    re.IGNORECASE,
+)
+_TAG_BASE_SCORE = {"article": 10, "main": 10, "div": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3}
+
+
+def _parse(html: str) -> "etree._Element":
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # Unicode strings with an XML encoding declaration must be parsed as bytes
+        parser = lxml_html.HTMLParser(encoding="utf-8")
+        return lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+
+
+def _text(element: "etree._Element") -> str:
+    """Whitespace-joined text, the same shape as BeautifulSoup's get_text(" ", strip=True)."""
+    return " ".join(piece.strip() for piece in element.itertext() if piece.strip())
+
+
+def _class_weight(element: "etree._Element") -> int:
+    weight = 0
+    for attr in (element.get("class"), element.get("id")):
+        if attr:
+            if _NEGATIVE.search(attr):
+                weight -= 25
+            if _POSITIVE.search(attr):
+                weight += 25
+    return weight
+
+
+def _link_density(element: "etree._Element", text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_chars = sum(len(_text(a)) for a in element.iter("a"))
+    return min(link_chars / text_length, 1.0)
+
+
+def _score_blocks(root: "etree._Element") -> Dict["etree._Element", float]:
+    """One pass over paragraph-like blocks, crediting parents and grandparents."""
+    scores: Dict["etree._Element", float] = {}
+
+    def credit(element: Optional["etree._Element"], amount: float) -> None:
+        if element is None or not isinstance(element.tag, str):
+            return
+        if element not in scores:
+            scores[element] = _TAG_BASE_SCORE.get(element.tag, 0) + _class_weight(element)
+        scores[element] += amount
+
+    for block in root.iter(*SCORED_TAGS):
+        text = _text(block)
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = block.getparent()
+        credit(parent, score)
+        credit(parent.getparent() if parent is not None else None, score / 2)
+    return scores
+
+
+def _best_content(scores: Dict["etree._Element", float]) -> List["etree._Element"]:
+    if not scores:
+        return []
+    adjusted = {}
+    for element, score in scores.items():
+        adjusted[element] = score * (1 - _link_density(element, len(_text(element))))
+    best = max(adjusted, key=adjusted.__getitem__)
+    threshold = max(10.0, adjusted[best] * SIBLING_SCORE_RATIO)
+
+    parent = best.getparent()
+    if parent is None:
+        return [best]
+    return [
+        sibling for sibling in parent
+        if sibling is best or adjusted.get(sibling, 0) >= threshold
+    ]
+
+
+def extract_article_text(html: str) -> str:
+    """
+    Extract the main article text with a single lxml parse.
+
+    Raises:
+        ValueError: If the HTML is empty or yields too little text.
+    """
+    if not html or not html.strip():
+        raise ValueError("Empty HTML content")
+
+    root = _parse(html)
+    etree.strip_elements(root, *BOILERPLATE_TAGS, etree.Comment, with_tail=False)
+
+    content = _best_content(_score_blocks(root))
+    if content:
+        text = " ".join(filter(None, (_text(element) for element in content)))
+        if analyze(text).word_count >= MIN_ARTICLE_WORDS:
+            return text
+        logger.debug("Scored content too short, using the whole document")
+
+    body = root.find("body")
+    text = _text(body if body is not None else root)
+    if analyze(text).word_count < MIN_FALLBACK_WORDS:
+        raise ValueError("Insufficient content extracted")
+    return text
+
+
+__all__ = ["extract_article_text"]
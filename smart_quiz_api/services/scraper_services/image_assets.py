@@ -0,0 +1,286 @@
+## image_assets.py
+"""
+Images for IMAGE quizzes, taken from the scraped page itself.
+
+    candidates → download → thumbnail → store → attach
+
+- Candidates are the page's ``og:image``/``twitter:image`` and its ``<img>``
+  tags (``src``, lazy-loading ``data-src`` and the smallest ``srcset``
+  source that is still at least ``THUMBNAIL_SIZE`` wide), without data
+  URIs, SVGs, logos, icons, avatars and images declared smaller than
+  ``MIN_IMAGE_SIDE``.
+- Downloads are bounded like page downloads (``MAX_IMAGE_BYTES``,
+  ``MAX_IMAGE_SECONDS``) and rejected from their headers when they are not
+  images; a few run concurrently.
+- Decoding and resizing run in the extraction pool (see
+  ``image_processing``), never on the API process.
+- Thumbnails are stored content-addressed under ``IMAGE_STORE_DIR`` and
+  served from ``/quiz/images/<sha256>.<ext>`` as immutable, so clients and
+  CDNs cache them forever. The same image found on several pages is stored
+  once; the ``image`` stage caches the asset per image URL.
+
+Each question gets the image whose alt text shares the most words with it,
+spreading the images over the questions when nothing matches.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from smart_quiz_api.config import settings
+from smart_quiz_api.services.openai_service import extract_json_payload
+from smart_quiz_api.services.quiz_library import canonical_url
+from .content_fetcher import CHUNK_SIZE, DownloadBudget, _session, is_valid_url, read_bounded
+from .image_processing import MEDIA_TYPES, MIN_IMAGE_SIDE, THUMBNAIL_SIZE
+from .process_pool import extraction_pool
+from .stages import StageCache, StageReport, stage_key
+
+logger = logging.getLogger(__name__)
+
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+MAX_IMAGE_SECONDS = 10           # Wall-clock budget per image download
+CANDIDATES_PER_IMAGE = 2         # Candidates downloaded per wanted image; some are always unusable
+IMAGE_URL_PREFIX = "/quiz/images/"
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+IMAGE_NAME = re.compile(r"^[0-9a-f]{64}\.(jpg|png|gif|webp)$")
+EXTENSIONS = {media_type: "jpg" if kind == "jpeg" else kind for kind, media_type in MEDIA_TYPES.items()}
+
+_META_TAG = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+_IMG_TAG = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+_ATTR = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+_SHARE_IMAGES = {"og:image", "og:image:url", "og:image:secure_url", "twitter:image", "twitter:image:src"}
+_DECORATION = re.compile(r"logo|icon|avatar|sprite|pixel|spacer|badge|emoji|placeholder", re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9]{4,}")
+
+# Downloads are I/O bound; decoding happens in the extraction pool
+image_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-fetch")
+
+
+@dataclass(frozen=True)
+class ImageCandidate:
+    url: str
+    alt: str
+
+
+# === Candidates ===
+def _attrs(tag: str) -> Dict[str, str]:
+    return {
+        name.lower(): double_quoted or single_quoted or bare
+        for name, double_quoted, single_quoted, bare in _ATTR.findall(tag)
+    }
+
+
+def _from_srcset(srcset: str) -> Optional[str]:
+    """The smallest ``srcset`` source at least ``THUMBNAIL_SIZE`` wide, else the widest one."""
+    sources: List[Tuple[int, str]] = []
+    for entry in srcset.split(","):
+        parts = entry.split()
+        if not parts:
+            continue
+        width = parts[1][:-1] if len(parts) > 1 and parts[1].endswith("w") else ""
+        sources.append((int(width) if width.isdigit() else 0, parts[0]))
+    if not sources:
+        return None
+    large = [source for source in sources if source[0] >= THUMBNAIL_SIZE]
+    return min(large)[1] if large else max(sources)[1]
+
+
+def _too_small(attrs: Dict[str, str]) -> bool:
+    sides = [attrs.get("width", ""), attrs.get("height", "")]
+    return any(side.isdigit() and int(side) < MIN_IMAGE_SIDE for side in sides)
+
+
+def image_candidates(html: str, base_url: str) -> List[ImageCandidate]:
+    """Absolute URLs of the content images of a page, share images first, without duplicates."""
+    found: List[Tuple[str, str]] = []
+    for tag in _META_TAG.findall(html):
+        attrs = _attrs(tag)
+        if (attrs.get("property") or attrs.get("name") or "").lower() in _SHARE_IMAGES and attrs.get("content"):
+            found.append((attrs["content"], ""))
+    for tag in _IMG_TAG.findall(html):
+        attrs = _attrs(tag)
+        if _too_small(attrs):
+            continue
+        srcset = attrs.get("srcset") or attrs.get("data-srcset")
+        src = (srcset and _from_srcset(srcset)) or attrs.get("data-src") or attrs.get("src")
+        if src:
+            found.append((src, attrs.get("alt", "").strip()))
+
+    candidates: List[ImageCandidate] = []
+    seen: Set[str] = set()
+    for src, alt in found:
+        src = src.strip()
+        if src.startswith("data:"):
+            continue
+        url = urljoin(base_url, src)
+        path = urlparse(url).path.lower()
+        if not is_valid_url(url) or path.endswith(".svg") or _DECORATION.search(path):
+            continue
+        key = canonical_url(url)
+        if key in seen:
+            # The share image usually reappears as an <img> with the alt text it lacked
+            if alt:
+                candidates = [
+                    ImageCandidate(c.url, c.alt or alt) if canonical_url(c.url) == key else c
+                    for c in candidates
+                ]
+            continue
+        seen.add(key)
+        candidates.append(ImageCandidate(url, alt))
+    return candidates
+
+
+# === Download and storage ===
+def download_image(url: str, referer: Optional[str] = None) -> bytes:
+    """
+    The body of an image URL, bounded in size and time.
+
+    Raises:
+        ValueError: If the response is not an image or is over the limits.
+        requests.RequestException: If the request fails.
+    """
+    headers = {"Referer": referer} if referer else None
+    with _session.get(url, headers=headers, timeout=MAX_IMAGE_SECONDS, stream=True) as response:
+        response.raise_for_status()
+        media_type = (response.headers.get("content-type") or "").split(";", 1)[0].strip().lower()
+        if media_type and not media_type.startswith("image/"):
+            raise ValueError(f"Unsupported content type: {media_type}")
+        content_length = response.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+            raise ValueError("Image too large (>5MB)")
+        return read_bounded(response.iter_content(CHUNK_SIZE), DownloadBudget(MAX_IMAGE_BYTES, MAX_IMAGE_SECONDS))
+
+
+class ImageStore:
+    """Thumbnails named by the SHA-256 of their bytes: ``<root>/ab/abcdef....jpg``."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name[:2], name)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def put(self, data: bytes, media_type: str) -> str:
+        """Store ``data`` atomically (once per content) and return its file name."""
+        name = f"{hashlib.sha256(data).hexdigest()}.{EXTENSIONS[media_type]}"
+        path = self.path(name)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(data)
+            os.replace(temp, path)
+        return name
+
+
+# Global image store
+image_store = ImageStore(settings.image_store_dir)
+
+
+def fetch_asset(url: str, referer: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Download, thumbnail and store one image; None if it is unusable."""
+    try:
+        thumbnail = extraction_pool.make_thumbnail(download_image(url, referer))
+        name = image_store.put(thumbnail.data, thumbnail.media_type)
+    except (requests.RequestException, ValueError) as e:
+        logger.debug(f"Skipping image {url}: {e}")
+        return None
+    except OSError as e:
+        logger.warning(f"Image store write failed: {e}")
+        return None
+    return {"url": IMAGE_URL_PREFIX + name, "width": thumbnail.width, "height": thumbnail.height, "source_url": url}
+
+
+def collect_images(
+    html: str,
+    base_url: str,
+    limit: int,
+    cache: StageCache,
+    report: StageReport,
+    offline: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Up to ``limit`` stored thumbnails of the page's images, in page order, each with its alt text.
+
+    ``offline`` only reuses thumbnails already in ``cache`` and the image store; nothing is downloaded.
+    """
+    start = time.perf_counter()
+    candidates = image_candidates(html, base_url)[:limit * CANDIDATES_PER_IMAGE]
+
+    def load(candidate: ImageCandidate) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        key = stage_key("image", canonical_url(candidate.url))
+        hit, asset = cache.get("image", key)
+        if hit and asset and image_store.exists(asset["url"][len(IMAGE_URL_PREFIX):]):
+            return True, asset
+        if offline:
+            return False, None
+        asset = fetch_asset(candidate.url, base_url)
+        if asset is not None:
+            cache.set("image", key, asset)
+        return False, asset
+
+    loaded = list(image_executor.map(load, candidates))
+    assets: List[Dict[str, Any]] = []
+    for candidate, (_, asset) in zip(candidates, loaded):
+        # The same picture under several URLs is stored once; show it once
+        if asset is not None and all(asset["url"] != a["url"] for a in assets):
+            assets.append(dict(asset, alt=candidate.alt))
+    assets = assets[:limit]
+
+    report.record("images", bool(loaded) and all(hit for hit, _ in loaded), time.perf_counter() - start)
+    report.count("images", len(assets))
+    return assets
+
+
+# === Attachment ===
+def _words(text: Any) -> Set[str]:
+    return set(_WORD.findall(str(text).lower()))
+
+
+def attach_images(quiz: Any, assets: List[Dict[str, Any]]) -> Any:
+    """
+    ``quiz`` (a JSON quiz string) with an ``image`` on every question.
+
+    Each question gets the asset whose alt text overlaps its question and
+    answer the most; ties go to the least used asset, then page order.
+    Quizzes that are not JSON are returned unchanged.
+    """
+    if not assets or not isinstance(quiz, str):
+        return quiz
+    try:
+        payload = extract_json_payload(quiz)
+    except ValueError:
+        return quiz
+    questions = payload.get("questions") if isinstance(payload, dict) else payload
+    if not isinstance(questions, list):
+        return quiz
+
+    alts = [_words(asset.get("alt", "")) for asset in assets]
+    uses = [0] * len(assets)
+    for q in questions:
+        if not isinstance(q, dict):
+            continue
+        words = _words(q.get("question", "")) | _words(q.get("answer", ""))
+        best = max(range(len(assets)), key=lambda i: (len(words & alts[i]), -uses[i], -i))
+        uses[best] += 1
+        q["image"] = {key: assets[best][key] for key in ("url", "width", "height")}
+    return json.dumps(payload)
+
+
+__all__ = [
+    "IMAGE_CACHE_CONTROL", "IMAGE_NAME", "ImageCandidate", "ImageStore", "attach_images",
+    "collect_images", "download_image", "fetch_asset", "image_candidates", "image_store",
+]
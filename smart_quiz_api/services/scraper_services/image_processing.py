@@ -0,0 +1,133 @@
+## image_processing.py
+"""
+Image sniffing and thumbnailing, run in the extraction pool's workers.
+
+``sniff_image`` reads the format and pixel size from the first bytes of a
+JPEG, PNG, GIF or WebP file without decoding it, so icons, spacers and
+decompression bombs are rejected before any pixel is touched.
+``make_thumbnail`` decodes what is left (JPEGs at a reduced scale via
+``draft``), shrinks it to ``THUMBNAIL_SIZE`` on the longest side and
+re-encodes it as a compact progressive JPEG; transparency is flattened onto
+white.
+
+Pillow is optional: without it, images that are already small
+(``PASSTHROUGH_MAX_BYTES``) are kept as they are and larger ones are
+rejected.
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Try to import Pillow, fallback to passing small images through if not available
+try:
+    from PIL import Image  # type: ignore
+    _has_pil = True
+except ImportError:
+    _has_pil = False
+
+THUMBNAIL_SIZE = 480                   # Longest side, in pixels
+THUMBNAIL_QUALITY = 80
+MIN_IMAGE_SIDE = 100                   # Icons, spacers and tracking pixels are smaller
+MAX_IMAGE_PIXELS = 40_000_000          # Decompression-bomb guard, checked from the header
+PASSTHROUGH_MAX_BYTES = 200 * 1024     # Without Pillow, larger images cannot be shrunk and are rejected
+
+MEDIA_TYPES = {"jpeg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+# JPEG start-of-frame markers (C4, C8 and CC are other segments)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclass(frozen=True)
+class Thumbnail:
+    data: bytes
+    media_type: str
+    width: int
+    height: int
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:          # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:   # Markers without a length
+            i += 2
+            continue
+        if marker in _JPEG_SOF:
+            return int.from_bytes(data[i + 7:i + 9], "big"), int.from_bytes(data[i + 5:i + 7], "big")
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        return int.from_bytes(data[26:28], "little") & 0x3FFF, int.from_bytes(data[28:30], "little") & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def sniff_image(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """``(format, width, height)`` from the header of a JPEG, PNG, GIF or WebP file, or None."""
+    size: Optional[Tuple[int, int]] = None
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        kind, size = "png", (int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big"))
+    elif data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        kind, size = "gif", (int.from_bytes(data[6:8], "little"), int.from_bytes(data[8:10], "little"))
+    elif data[:3] == b"\xff\xd8\xff":
+        kind, size = "jpeg", _jpeg_size(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        kind, size = "webp", _webp_size(data)
+    if size is None:
+        return None
+    return kind, size[0], size[1]
+
+
+def make_thumbnail(data: bytes) -> Thumbnail:
+    """
+    A compact thumbnail of an image file.
+
+    Raises:
+        ValueError: If the data is not a supported image, is too small or too
+            large, or cannot be decoded.
+    """
+    sniffed = sniff_image(data)
+    if sniffed is None:
+        raise ValueError("Not a JPEG, PNG, GIF or WebP image")
+    kind, width, height = sniffed
+    if min(width, height) < MIN_IMAGE_SIDE:
+        raise ValueError(f"Image too small ({width}x{height})")
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"Image too large ({width}x{height})")
+
+    if not _has_pil:
+        if len(data) > PASSTHROUGH_MAX_BYTES:
+            raise ValueError("Pillow is required to shrink images over 200KB")
+        return Thumbnail(data, MEDIA_TYPES[kind], width, height)
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft("RGB", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+                rgba = image.convert("RGBA")
+                flat = Image.new("RGB", rgba.size, "white")
+                flat.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                flat = image.convert("RGB")
+            out = io.BytesIO()
+            flat.save(out, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+            return Thumbnail(out.getvalue(), "image/jpeg", flat.width, flat.height)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Undecodable image: {e}") from e
+
+
+__all__ = ["Thumbnail", "make_thumbnail", "sniff_image"]
@@ -1,10 +1,17 @@
-from typing import Literal
-from .quiz_generator import generate_quiz_from_url
+import asyncio
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Literal
+from urllib.parse import urlsplit
+from .quiz_generator import generate_quiz_from_url, generate_quiz_from_url_async
 from smart_quiz_api.constants import DEFAULT_MODEL
+from smart_quiz_api.services.quiz_library import canonical_url, is_generation_failure
 
 # Define allowed quiz types
 QuizType = Literal["MCQ", "TF", "IMAGE"]
 
+BATCH_CONCURRENCY = 16   # URLs in flight per batch
+BATCH_PER_HOST = 4       # Concurrent page downloads per host within a batch
+
 def scrape_and_generate_quiz(
     url: str,
     quiz_type: QuizType = "MCQ",
@@ -27,3 +34,60 @@ def scrape_and_generate_quiz(
     """
     # If you're planning to pass model/use_cache later, update generate_quiz_from_url
     return generate_quiz_from_url(url, quiz_type, model=model, use_cache=use_cache)
+
+
+def dedupe_urls(urls: Iterable[str]) -> Dict[str, List[str]]:
+    """Group submitted URLs by canonical form, keeping first-seen order."""
+    groups: Dict[str, List[str]] = {}
+    for url in urls:
+        url = (url or "").strip()
+        if url:
+            groups.setdefault(canonical_url(url), []).append(url)
+    return groups
+
+
+async def scrape_and_generate_quiz_many(
+    urls: Iterable[str],
+    quiz_type: QuizType = "MCQ",
+    model: str = DEFAULT_MODEL,
+    use_cache: bool = True,
+    concurrency: int = BATCH_CONCURRENCY,
+    per_host: int = BATCH_PER_HOST
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate quizzes for many URLs, yielding each result as soon as it is ready.
+
+    - URLs are deduplicated by canonical form; copies are listed in ``duplicates``
+    - At most ``concurrency`` URLs are in flight and ``per_host`` downloads per host
+    - Extraction runs in the extraction process pool, LLM calls go through the LLM limiter
+    - A failing URL yields ``{"status": "error", "error": ...}``; the batch continues
+
+    Yields:
+        dict: ``{"url", "duplicates", "status": "ok", "quiz"}`` or ``{"url", "duplicates", "status": "error", "error"}``
+    """
+    slots = asyncio.Semaphore(concurrency)
+    hosts: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    async def one(canonical: str, submitted: List[str]) -> Dict[str, Any]:
+        url = submitted[0]
+        result: Dict[str, Any] = {"url": url, "duplicates": submitted[1:]}
+        async with slots:
+            try:
+                quiz = await generate_quiz_from_url_async(
+                    url, quiz_type, model=model, use_cache=use_cache,
+                    host_slots=hosts[urlsplit(canonical).netloc]
+                )
+            except Exception as e:
+                return {**result, "status": "error", "error": str(e) or type(e).__name__}
+        if is_generation_failure(quiz.get("quiz")):
+            return {**result, "status": "error", "error": "Quiz generation failed"}
+        return {**result, "status": "ok", "quiz": quiz}
+
+    tasks = [asyncio.create_task(one(canonical, submitted)) for canonical, submitted in dedupe_urls(urls).items()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The consumer stopped early (e.g. the client disconnected): drop the remaining work
+        for task in tasks:
+            task.cancel()
@@ -19,8 +19,8 @@ except Exception as e:
     logger.warning(f"Could not load settings, using default model: {e}")
     runtime_model = DEFAULT_MODEL
 
-def call_openai(prompt: str, model: Optional[str] = None) -> str:
+def call_openai(prompt: str, model: Optional[str] = None, max_tokens: int = 700) -> str:
     """Wrapper to use the main OpenAI service with retry logic built-in."""
     # Use provided model, runtime model from settings, or DEFAULT_MODEL as fallback
     model_to_use = model or runtime_model
-    return safe_openai_chat(prompt, model=model_to_use, max_tokens=700, temperature=0.7)
+    return safe_openai_chat(prompt, model=model_to_use, max_tokens=max_tokens, temperature=0.7)
@@ -0,0 +1,337 @@
+## process_pool.py
+"""
+Process-pool isolation for CPU-heavy scraping steps.
+
+HTML extraction, difficulty estimation and image thumbnailing run in a
+small pool of worker processes so a pathological page burns CPU in a worker, not on the API
+process's GIL. Each task gets:
+
+- a CPU budget enforced in the worker with ``RLIMIT_CPU`` (SIGXCPU aborts
+  the task, the worker survives),
+- a wall-clock timeout enforced by the caller, counted from when a worker
+  is free to run the task (callers queue for one of ``max_workers`` slots
+  first, so a burst of tasks never times out in the queue); a worker that
+  blows it is killed and the pool is rebuilt,
+- zero-copy hand-off of large pages and images: the payload is written once
+  into a shared-memory block and the worker reads it in place instead of
+  receiving a pickled copy over the pipe.
+
+Workers are recycled after ``max_tasks_per_child`` tasks so leaks in
+parsers do not accumulate. Workers are forked from a forkserver that has
+the extraction modules preloaded, so recycling does not re-pay import cost.
+When the pool is disabled or cannot start, the same functions run inline.
+"""
+
+import asyncio
+import codecs
+import logging
+import multiprocessing
+import signal
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+from smart_quiz_api.config import settings
+from .difficulty_estimator import DifficultyLevel, estimate_difficulty
+from .image_processing import Thumbnail, make_thumbnail
+from .text_cleaner import extract_clean_text
+
+logger = logging.getLogger(__name__)
+
+# Try to import resource (POSIX only), fallback to wall-clock timeouts only if not available
+try:
+    import resource  # type: ignore
+    _has_resource = hasattr(signal, "SIGXCPU")
+except ImportError:
+    _has_resource = False
+
+SHARED_MEMORY_MIN_BYTES = 256 * 1024   # Smaller payloads are cheaper to pickle
+START_METHOD = "forkserver"            # "fork" cannot be combined with max_tasks_per_child
+
+
+class ExtractionLimitExceeded(ValueError):
+    """A scraping task ran over its CPU or wall-clock budget, or crashed its worker."""
+
+
+# === Worker side ===
+def _on_cpu_limit(signum: int, frame: Any) -> None:
+    raise ExtractionLimitExceeded("Extraction exceeded CPU budget")
+
+
+def _init_worker() -> None:
+    if _has_resource:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+
+def _set_cpu_limit(seconds: Optional[float]) -> None:
+    """Cap this worker's CPU time at what it has used so far plus ``seconds``."""
+    if not _has_resource:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _read_shared(name: str, size: int, binary: bool = False) -> Union[str, bytes]:
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # Decode straight from the mapped buffer; the parent owns (and unlinks) the block
+        view = block.buf[:size]
+        try:
+            return bytes(view) if binary else codecs.decode(view, "utf-8")
+        finally:
+            view.release()
+    finally:
+        block.close()
+
+
+_TASKS: Dict[str, Callable[[Any], Any]] = {
+    "extract": extract_clean_text,
+    "difficulty": estimate_difficulty,
+    "thumbnail": make_thumbnail,
+}
+
+Payload = Union[str, bytes]
+
+
+def _run_task(
+    task: str, payload: Optional[Payload], shared: Optional[Tuple[str, int, bool]], cpu_seconds: float
+) -> Any:
+    _set_cpu_limit(cpu_seconds)
+    try:
+        data = _read_shared(*shared) if shared else payload
+        return _TASKS[task](data)
+    finally:
+        _set_cpu_limit(None)
+
+
+# === Caller side ===
+class _Slots:
+    """Counting semaphore that threads and event loops can both wait on, first come first served."""
+
+    def __init__(self, size: int):
+        self._free = size
+        self._lock = threading.Lock()
+        self._waiters: Deque[Callable[[], None]] = deque()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            granted = threading.Event()
+            self._waiters.append(granted.set)
+        granted.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+            except RuntimeError:  # Loop closed: pass the slot on
+                self.release()
+
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            self._waiters.append(wake)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+                    raise
+            # The slot was handed over as the caller gave up
+            self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._free += 1
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+
+class ExtractionPool:
+    """Bounded process pool with per-task CPU and wall-clock limits."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_tasks_per_child: int = 50,
+        cpu_seconds: float = 5.0,
+        timeout: float = 10.0,
+        enabled: bool = True
+    ):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.cpu_seconds = cpu_seconds
+        self.timeout = timeout
+        self.enabled = enabled
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # At most one task per worker is submitted, so a submitted task is a running task
+        self._slots = _Slots(max_workers)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._executor is None:
+                try:
+                    context = multiprocessing.get_context(START_METHOD)
+                    context.set_forkserver_preload([__name__])
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=context,
+                        initializer=_init_worker,
+                        max_tasks_per_child=self.max_tasks_per_child,
+                    )
+                except (ValueError, OSError) as e:
+                    logger.warning(f"Extraction pool unavailable, running inline: {e}")
+                    self.enabled = False
+            return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Kill every worker of ``executor`` (one is stuck) and let the next call build a new pool."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # Another task already recycled it
+            self._executor = None
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _submit(
+        self, executor: ProcessPoolExecutor, task: str, payload: Payload
+    ) -> Tuple["Future[Any]", Optional[shared_memory.SharedMemory]]:
+        block = None
+        binary = isinstance(payload, bytes)
+        data = None
+        if len(payload) >= SHARED_MEMORY_MIN_BYTES:
+            data = payload if binary else payload.encode("utf-8")
+        if data:
+            block = shared_memory.SharedMemory(create=True, size=len(data))
+            block.buf[:len(data)] = data
+            future = executor.submit(_run_task, task, None, (block.name, len(data), binary), self.cpu_seconds)
+        else:
+            future = executor.submit(_run_task, task, payload, None, self.cpu_seconds)
+        return future, block
+
+    @staticmethod
+    def _release(block: Optional[shared_memory.SharedMemory]) -> None:
+        if block is not None:
+            block.close()
+            block.unlink()
+
+    def _recycled_by_other(self, executor: ProcessPoolExecutor, error: BaseException) -> bool:
+        """Whether ``error`` only means another task's failure took down ``executor`` (worth one retry)."""
+        return isinstance(error, BrokenProcessPool) and self._executor is not executor
+
+    def _failed(self, executor: ProcessPoolExecutor, task: str, error: BaseException) -> ExtractionLimitExceeded:
+        if isinstance(error, (FutureTimeoutError, asyncio.TimeoutError)):
+            logger.warning(f"Scraping task '{task}' exceeded {self.timeout}s, recycling the pool")
+            self._recycle(executor)
+            return ExtractionLimitExceeded("Extraction exceeded time budget")
+        logger.error(f"Scraping worker crashed during '{task}', recycling the pool")
+        self._recycle(executor)
+        return ExtractionLimitExceeded("Extraction worker crashed")
+
+    def run(self, task: str, payload: Payload) -> Any:
+        """Run ``task`` on ``payload`` (text or image bytes) in a worker and block until it finishes."""
+        if not self.enabled:
+            return _TASKS[task](payload)
+        self._slots.acquire()
+        try:
+            for attempt in range(2):
+                executor = self._get_executor()
+                if executor is None:
+                    return _TASKS[task](payload)
+                future, block = self._submit(executor, task, payload)
+                try:
+                    return future.result(timeout=self.timeout)
+                except (FutureTimeoutError, BrokenProcessPool) as e:
+                    if attempt == 0 and self._recycled_by_other(executor, e):
+                        continue
+                    raise self._failed(executor, task, e) from e
+                finally:
+                    self._release(block)
+        finally:
+            self._slots.release()
+
+    async def run_async(self, task: str, payload: Payload) -> Any:
+        """Awaitable ``run``; the event loop only waits on the worker's result."""
+        if not self.enabled:
+            return await asyncio.to_thread(_TASKS[task], payload)
+        await self._slots.acquire_async()
+        try:
+            for attempt in range(2):
+                executor = self._get_executor()
+                if executor is None:
+                    return await asyncio.to_thread(_TASKS[task], payload)
+                future, block = self._submit(executor, task, payload)
+                try:
+                    return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+                except (asyncio.TimeoutError, BrokenProcessPool) as e:
+                    if attempt == 0 and self._recycled_by_other(executor, e):
+                        continue
+                    raise self._failed(executor, task, e) from e
+                finally:
+                    self._release(block)
+        finally:
+            self._slots.release()
+
+    def extract_clean_text(self, html: str) -> str:
+        return self.run("extract", html)
+
+    async def extract_clean_text_async(self, html: str) -> str:
+        return await self.run_async("extract", html)
+
+    def estimate_difficulty(self, text: str) -> DifficultyLevel:
+        try:
+            return self.run("difficulty", text)
+        except ExtractionLimitExceeded as e:
+            logger.warning(f"Difficulty estimation failed: {e}")
+            return "medium"
+
+    async def estimate_difficulty_async(self, text: str) -> DifficultyLevel:
+        try:
+            return await self.run_async("difficulty", text)
+        except ExtractionLimitExceeded as e:
+            logger.warning(f"Difficulty estimation failed: {e}")
+            return "medium"
+
+    def make_thumbnail(self, data: bytes) -> Thumbnail:
+        """Thumbnail of an image file; raises ValueError for unusable images."""
+        return self.run("thumbnail", data)
+
+
+# Global pool instance (shut down on application shutdown)
+extraction_pool = ExtractionPool(
+    max_workers=settings.extraction_pool_workers,
+    max_tasks_per_child=settings.extraction_max_tasks_per_child,
+    cpu_seconds=settings.extraction_cpu_seconds,
+    timeout=settings.extraction_timeout_seconds,
+    enabled=settings.enable_extraction_pool,
+)
@@ -1,119 +1,532 @@
 
 ## quiz_generator.py
+import asyncio
+import contextlib
+import time
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from .cache import get_cached_quiz, set_cached_quiz
-from .content_fetcher import fetch_article_html
-from .text_cleaner import extract_clean_text
-from .topic_classifier import classify_topic
-from .difficulty_estimator import estimate_difficulty
+from .chunked_generation import chunk_executor, generate_chunked, parse_questions
+from .cloze_generator import generate_cloze
+from .async_fetcher import fetch_article_async
+from .content_fetcher import fetch_article_html, link_canonical
+from .content_store import content_store, store_article
+from .context_selector import select_context
+from .dedupe import content_fingerprint, content_index, simhash
+from .image_assets import attach_images, collect_images
+from .process_pool import extraction_pool
+from .stages import StageCache, StageReport, stage_cache, stage_key
+from .topic_classifier import DEFAULT_TOPIC, classify_topic, local_topic, normalize_topic
 from .openai_wrapper import call_openai
 import logging
+from smart_quiz_api.config import settings
 from smart_quiz_api.constants import DEFAULT_MODEL
 from smart_quiz_api.models.enum import QuizType
+from smart_quiz_api.services.openai_service import extract_json_payload
+from smart_quiz_api.services.quiz_library import canonical_url, is_generation_failure
+from smart_quiz_api.utils.text_analysis import analyze
 
 logger = logging.getLogger(__name__)
 
 MAX_SNIPPET = 1600
 MIN_SNIPPET = 1400
 VALID_QUIZ_TYPES = ["MCQ", "TF", "IMAGE"]
+VALID_MODES = ["ai", "local"]   # local: cloze questions built without the LLM
+COMBINED_MAX_TOKENS = 900   # JSON framing and the topic label on top of the usual 700
+
+
+def _check_quiz_type(quiz_type: str) -> None:
+    if quiz_type not in VALID_QUIZ_TYPES:
+        raise ValueError(f"Invalid quiz type: {quiz_type}. Must be one of {VALID_QUIZ_TYPES}")
+
+
+def _check_mode(mode: str) -> None:
+    if mode not in VALID_MODES:
+        raise ValueError(f"Invalid mode: {mode}. Must be one of {VALID_MODES}")
+
+
+def _get_cached(url: str, quiz_type: str, report: StageReport) -> Optional[Dict[str, Any]]:
+    start = time.perf_counter()
+    try:
+        cached = get_cached_quiz(url, quiz_type)
+        if cached:
+            logger.info(f"Returning cached quiz for {url} ({quiz_type})")
+            report.record("result", True, time.perf_counter() - start)
+            return cached
+    except Exception as e:
+        logger.warning(f"Cache retrieval failed, continuing without cache: {e}")
+    return None
+
+
+def _get_cached_canonical(
+    url: str,
+    canonical: Optional[str],
+    quiz_type: str,
+    report: StageReport
+) -> Optional[Dict[str, Any]]:
+    """A cached quiz for the page's ``<link rel="canonical">`` target, aliased to ``url``."""
+    if not canonical or canonical_url(canonical) == canonical_url(url):
+        return None
+    cached = _get_cached(canonical, quiz_type, report)
+    if cached:
+        _store_result([url], quiz_type, cached)
+    return cached
+
+
+def _store_result(urls: List[Optional[str]], quiz_type: str, result: Dict[str, Any]) -> None:
+    for target in {canonical_url(u): u for u in urls if u}.values():
+        try:
+            set_cached_quiz(target, quiz_type, result)
+        except Exception as e:
+            logger.warning(f"Failed to cache quiz: {e}")
+
+
+def _result_variant(quiz_type: str, num_questions: Optional[int], mode: str = "ai") -> str:
+    """Result cache key part: the quiz type, plus the question count when one was asked for and a non-AI mode."""
+    parts = [quiz_type]
+    if num_questions is not None:
+        parts.append(str(num_questions))
+    if mode != "ai":
+        parts.append(mode)
+    return ":".join(parts)
+
+
+def _stage_cache(use_cache: bool) -> StageCache:
+    # A throwaway in-memory cache makes every stage a miss when caching is off
+    return stage_cache if use_cache else StageCache(use_redis=False)
+
+
+def make_snippet(clean_text: str) -> str:
+    """The first ~1.5k characters of the article, cut at a sentence end when possible."""
+    if len(clean_text) <= MAX_SNIPPET:
+        return clean_text
+    end = analyze(clean_text).last_sentence_end(MIN_SNIPPET + 1, MAX_SNIPPET + 1)
+    return clean_text[:end] if end else clean_text[:MAX_SNIPPET]
+
+
+def _select_context(cache: StageCache, clean_text: str, snippet: str, model: str, report: StageReport) -> str:
+    """The article's most salient sentences within ``SCRAPER_CONTEXT_TOKENS``; the snippet when that is 0."""
+    budget = settings.scraper_context_tokens
+    if budget <= 0:
+        return snippet
+    selection = cache.run(
+        "context",
+        {"text": clean_text, "budget": budget, "model": model},
+        lambda: select_context(clean_text, budget, model, snippet),
+        report,
+    )
+    report.count("context_tokens_saved", selection.tokens_saved)
+    return selection.text
+
+
+def _generate(prompt: str, model: str, max_tokens: int = 700) -> str:
+    try:
+        return call_openai(prompt, model=model, max_tokens=max_tokens)
+    except Exception as e:
+        logger.error(f"OpenAI call failed: {e}")
+        # Provide a fallback response
+        return f"Failed to generate quiz. Error: {str(e)}"
+
+
+def _quiz_prompt(quiz_type: str, topic: str, difficulty: str, content: str) -> str:
+    return f"""Generate a {quiz_type} quiz based on the following content.
+
+Topic: {topic}
+Difficulty: {difficulty}
+
+Content:
+{content}
+
+Instructions:
+- For MCQ: Create 5 multiple choice questions with 4 options each
+- For TF: Create 10 true/false questions  
+- For IMAGE: Create 5 questions that would work well with images/diagrams
+
+Format the output as a structured quiz with clear questions and answers."""
+
+
+def _combined_prompt(quiz_type: str, difficulty: str, content: str) -> str:
+    return f"""Classify the following content into a single topic (e.g. History, Science, Technology, etc) \
+and generate a {quiz_type} quiz based on it.
+
+Difficulty: {difficulty}
+
+Content:
+{content}
+
+Instructions:
+- For MCQ: Create 5 multiple choice questions with 4 options each
+- For TF: Create 10 true/false questions with options ["True", "False"]
+- For IMAGE: Create 5 questions that would work well with images/diagrams
+
+Respond with JSON only, in this format:
+{{"topic": "<topic name>", "questions": [{{"question": "...", "options": ["..."], "answer": "..."}}]}}"""
+
+
+def combined_topic(response: Any) -> Optional[str]:
+    """The topic of a combined topic + questions response, or None if it is not usable."""
+    if not isinstance(response, str) or is_generation_failure(response):
+        return None
+    try:
+        payload = extract_json_payload(response)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("questions"), list) or not payload["questions"]:
+        return None
+    return normalize_topic(payload.get("topic"))
+
+
+def _generate_combined(
+    cache: StageCache,
+    quiz_type: str,
+    difficulty: str,
+    context: str,
+    model: str,
+    report: StageReport
+) -> Tuple[Optional[str], Optional[str]]:
+    """Topic and quiz from a single LLM call; (None, None) when the response is unusable."""
+    prompt = _combined_prompt(quiz_type, difficulty, context)
+    response = cache.run(
+        "generate",
+        {"prompt": prompt, "model": model},
+        lambda: _generate(prompt, model, max_tokens=COMBINED_MAX_TOKENS),
+        report,
+        cacheable=lambda text: combined_topic(text) is not None,
+    )
+    topic = combined_topic(response)
+    return (topic, response) if topic else (None, None)
+
+
+def _generate_long(
+    cache: StageCache,
+    quiz_type: str,
+    difficulty: str,
+    clean_text: str,
+    num_questions: Optional[int],
+    topic: Optional[str],
+    model: str,
+    report: StageReport
+) -> Tuple[Optional[str], Optional[str]]:
+    """Topic and whole-article quiz; a missing topic is classified alongside the chunk calls."""
+    def generate(prompt: str, max_tokens: int) -> str:
+        return cache.run(
+            "generate",
+            {"prompt": prompt, "model": model},
+            lambda: _generate(prompt, model, max_tokens=max_tokens),
+            report,
+            cacheable=lambda text: bool(parse_questions(text)),
+        )
+
+    pending_topic = None if topic else chunk_executor.submit(
+        cache.run, "classify", clean_text, lambda: classify_topic(clean_text), report
+    )
+    quiz = generate_chunked(clean_text, quiz_type, difficulty, num_questions, generate)
+    return (topic or pending_topic.result()), quiz
+
+
+def _generate_local(
+    clean_text: str, quiz_type: str, num_questions: Optional[int], report: StageReport
+) -> Optional[str]:
+    """Cloze quiz built without the LLM (milliseconds, so never cached)."""
+    start = time.perf_counter()
+    quiz = generate_cloze(clean_text, quiz_type, num_questions)
+    report.record("cloze", False, time.perf_counter() - start)
+    return quiz
+
+
+def _generate_ai(
+    cache: StageCache,
+    url: str,
+    quiz_type: str,
+    difficulty: str,
+    clean_text: str,
+    snippet: str,
+    topic: Optional[str],
+    num_questions: Optional[int],
+    model: str,
+    report: StageReport
+) -> Tuple[str, str]:
+    """Topic and quiz from the LLM: chunked for long articles, else one combined call, else classify + generate."""
+    quiz = None
+
+    # Long articles (or an explicit question count): concurrent calls over sentence-aligned chunks
+    if num_questions is not None or 0 < settings.scraper_long_document_chars < len(clean_text):
+        topic, quiz = _generate_long(cache, quiz_type, difficulty, clean_text, num_questions, topic, model, report)
+        if quiz is None:
+            logger.warning(f"Long-document generation unusable for {url}, falling back to a single call")
+
+    # Otherwise the prompt carries the article's most salient sentences, not just its prefix
+    context = _select_context(cache, clean_text, snippet, model, report) if quiz is None else snippet
+
+    # and one LLM round trip for topic + questions
+    if not topic and quiz is None and settings.scraper_combined_generation:
+        topic, quiz = _generate_combined(cache, quiz_type, difficulty, context, model, report)
+        if topic:
+            cache.set("classify", stage_key("classify", clean_text), topic)
+        else:
+            logger.warning(f"Combined generation unusable for {url}, falling back to separate calls")
+
+    if not topic:
+        topic = cache.run("classify", clean_text, lambda: classify_topic(clean_text), report)
+    if quiz is None:
+        prompt = _quiz_prompt(quiz_type, topic, difficulty, context)
+        quiz = cache.run(
+            "generate",
+            {"prompt": prompt, "model": model},
+            lambda: _generate(prompt, model),
+            report,
+            cacheable=lambda text: not is_generation_failure(text),
+        )
+    return topic, quiz
+
+
+def _build_quiz(
+    url: str,
+    quiz_type: str,
+    clean_text: str,
+    model: str,
+    use_cache: bool,
+    report: StageReport,
+    canonical: Optional[str] = None,
+    num_questions: Optional[int] = None,
+    mode: str = "ai",
+    html: Optional[str] = None,
+    offline: bool = False
+) -> Dict[str, Any]:
+    """
+    Classify, prompt and cache a quiz for already-extracted article text.
+
+    IMAGE quizzes get the page's images attached; ``html`` is the page, or
+    None to read it from the content store. ``offline`` never downloads an
+    image: only thumbnails already stored are attached, found through the
+    shared stage cache even when ``use_cache`` is off.
+    """
+    if analyze(clean_text).word_count < 100:
+        raise ValueError("Insufficient content extracted from URL")
+
+    cache = _stage_cache(use_cache)
+    variant = _result_variant(quiz_type, num_questions, mode)
+
+    # Same or near-duplicate article (syndicated copy, AMP page) already quizzed?
+    start = time.perf_counter()
+    fingerprint = content_fingerprint(clean_text)
+    fingerprint_hash = simhash(clean_text)
+    match = content_index.find(fingerprint, fingerprint_hash) if use_cache else None
+    content_key = stage_key("content", {"content": match or fingerprint, "quiz_type": variant, "model": model})
+    hit, stored = cache.get("content", content_key) if match else (False, None)
+    report.record("dedupe", hit, time.perf_counter() - start)
+    if hit:
+        result = dict(stored, source_url=url)
+        if canonical_url(stored.get("source_url", "")) != canonical_url(url):
+            result["duplicate_of"] = stored.get("source_url")
+        _store_result([url, canonical], variant, result)
+        logger.info(f"Reusing {quiz_type} quiz of duplicate content for {url} [{report.summary()}]")
+        return result
+
+    # Every stage below except generate is independent of quiz_type
+    difficulty = cache.run("difficulty", clean_text, lambda: extraction_pool.estimate_difficulty(clean_text), report)
+    snippet = cache.run("snippet", clean_text, lambda: make_snippet(clean_text), report)
+
+    # Cached or confident local topic
+    topic = cache.run("classify", clean_text, lambda: local_topic(clean_text), report, cacheable=bool)
+
+    degraded = False
+    if mode == "local":
+        quiz = _generate_local(clean_text, quiz_type, num_questions, report)
+        if quiz is None:
+            raise ValueError("Insufficient content for a local quiz")
+        topic = topic or DEFAULT_TOPIC
+    else:
+        topic, quiz = _generate_ai(
+            cache, url, quiz_type, difficulty, clean_text, snippet, topic, num_questions, model, report
+        )
+        if is_generation_failure(quiz):
+            # LLM down or timing out: local questions instead of an apology string, never cached
+            local = _generate_local(clean_text, quiz_type, num_questions, report)
+            if local is not None:
+                logger.warning(f"LLM generation failed for {url}, serving a local quiz")
+                quiz, degraded = local, True
+
+    images: List[Dict[str, Any]] = []
+    if quiz_type == "IMAGE" and settings.image_max_per_quiz > 0 and not is_generation_failure(quiz):
+        page = html if html is not None else _stored_html(url)
+        if page:
+            images = collect_images(
+                page, url, settings.image_max_per_quiz, stage_cache if offline else cache, report, offline
+            )
+            quiz = attach_images(quiz, images)
+
+    result = {
+        "topic": topic,
+        "difficulty": difficulty,
+        "quiz_type": quiz_type,
+        "source_url": url,
+        "scraped_at": datetime.now(timezone.utc).isoformat(),
+        "content_excerpt": snippet,
+        "generator": "local" if mode == "local" or degraded else "ai",
+        "quiz": quiz
+    }
+    if images:
+        result["images"] = images
+    if degraded:
+        result["degraded"] = True
+
+    # Cache the result, under the URL and by content
+    if use_cache and not degraded:
+        _store_result([url, canonical], variant, result)
+        if not is_generation_failure(quiz):
+            cache.set("content", content_key, result)
+            if match is None:
+                content_index.add(fingerprint, fingerprint_hash)
+
+    logger.info(f"Generated {quiz_type} quiz for {url} (topic: {topic}, difficulty: {difficulty}) [{report.summary()}]")
+    return result
+
+
+def _stored_html(url: str) -> Optional[str]:
+    stored = content_store.get(url) if content_store.enabled else None
+    return content_store.get_html(stored.hash) if stored else None
+
+
+def _build_from_store(
+    url: str,
+    quiz_type: str,
+    model: str,
+    use_cache: bool,
+    report: StageReport,
+    num_questions: Optional[int],
+    mode: str = "ai"
+) -> Dict[str, Any]:
+    """``_build_quiz`` on the text kept in the content store for ``url``; no network access."""
+    start = time.perf_counter()
+    stored = content_store.get(url) if content_store.enabled else None
+    report.record("store", stored is not None, time.perf_counter() - start)
+    if stored is None:
+        raise ValueError(f"No stored content for {url}")
+    return _build_quiz(
+        url, quiz_type, stored.text, model, use_cache, report, stored.canonical_link, num_questions, mode,
+        offline=True
+    )
 
 
 def generate_quiz_from_url(
     url: str,
     quiz_type: QuizType = "MCQ", 
     model: str = DEFAULT_MODEL,
-    use_cache: bool = True
+    use_cache: bool = True,
+    report: Optional[StageReport] = None,
+    num_questions: Optional[int] = None,
+    offline: bool = False,
+    mode: str = "ai"
 ) -> Dict[str, Any]:
     """
     Generate a quiz from a URL by scraping content and using AI.
+
+    Runs as memoized stages (see ``stages``); only the final generate stage
+    depends on ``quiz_type``. Long articles, and any request with
+    ``num_questions``, are quizzed over the whole text in concurrent chunk
+    calls (see ``chunked_generation``). ``mode="local"`` builds cloze
+    questions without the LLM (see ``cloze_generator``); the same local
+    questions are served, uncached and marked ``degraded``, when the LLM
+    call fails. IMAGE quizzes get thumbnails of the page's images on their
+    questions and under ``images`` (see ``image_assets``).
     
     Args:
         url: The URL to scrape content from
         quiz_type: Type of quiz to generate (MCQ, TF, IMAGE)
         model: OpenAI model to use for generation
         use_cache: Whether to use Redis caching
+        report: Collects per-stage hit/miss and timing, if given
+        num_questions: Number of questions; the quiz type's default if None
+        offline: Build from the text kept in the content store, without fetching
+        mode: "ai" (LLM questions) or "local" (cloze questions, no LLM call)
         
     Returns:
         Dictionary containing quiz data and metadata
         
     Raises:
-        ValueError: If quiz_type is invalid or content extraction fails
+        ValueError: If quiz_type or mode is invalid, content extraction fails, or
+            ``offline`` is set and the URL is not in the content store
     """
-    if quiz_type not in VALID_QUIZ_TYPES:
-        raise ValueError(f"Invalid quiz type: {quiz_type}. Must be one of {VALID_QUIZ_TYPES}")
+    _check_quiz_type(quiz_type)
+    _check_mode(mode)
+    report = report if report is not None else StageReport()
+    variant = _result_variant(quiz_type, num_questions, mode)
 
     # Check cache first
     if use_cache:
-        try:
-            cached = get_cached_quiz(url, quiz_type)
-            if cached:
-                logger.info(f"Returning cached quiz for {url} ({quiz_type})")
-                return cached
-        except Exception as e:
-            logger.warning(f"Cache retrieval failed, continuing without cache: {e}")
+        cached = _get_cached(url, variant, report)
+        if cached:
+            return cached
 
     try:
+        if offline:
+            return _build_from_store(url, quiz_type, model, use_cache, report, num_questions, mode)
+
         # Fetch and process content
-        html = fetch_article_html(url)
-        clean_text = extract_clean_text(html)
-        
-        if len(clean_text.split()) < 100:
-            raise ValueError("Insufficient content extracted from URL")
-            
-        topic = classify_topic(clean_text)
-        difficulty = estimate_difficulty(clean_text)
-
-        # Create content snippet
-        snippet = clean_text[:MAX_SNIPPET]
-        for end in range(min(len(clean_text), MAX_SNIPPET), MIN_SNIPPET, -1):
-            if clean_text[end:end+1] in ".!?":
-                snippet = clean_text[:end+1]
-                break
-
-        # Generate quiz prompt
-        prompt = f"""Generate a {quiz_type} quiz based on the following content.
+        cache = _stage_cache(use_cache)
+        html = cache.run("fetch", canonical_url(url), lambda: fetch_article_html(url), report)
+        canonical = link_canonical(html, url)
+        if use_cache:
+            cached = _get_cached_canonical(url, canonical, variant, report)
+            if cached:
+                return cached
+        clean_text = cache.run("extract", html, lambda: extraction_pool.extract_clean_text(html), report)
+        store_article([url, canonical], html, clean_text, canonical)
+        return _build_quiz(url, quiz_type, clean_text, model, use_cache, report, canonical, num_questions, mode, html)
+    except Exception as e:
+        logger.error(f"Failed to generate quiz from {url}: {str(e)}")
+        raise
 
-Topic: {topic}
-Difficulty: {difficulty}
 
-Content:
-{snippet}
+async def generate_quiz_from_url_async(
+    url: str,
+    quiz_type: QuizType = "MCQ",
+    model: str = DEFAULT_MODEL,
+    use_cache: bool = True,
+    report: Optional[StageReport] = None,
+    host_slots: Optional[asyncio.Semaphore] = None,
+    num_questions: Optional[int] = None,
+    offline: bool = False,
+    mode: str = "ai"
+) -> Dict[str, Any]:
+    """
+    Async variant of ``generate_quiz_from_url`` for use in async routes.
 
-Instructions:
-- For MCQ: Create 5 multiple choice questions with 4 options each
-- For TF: Create 10 true/false questions  
-- For IMAGE: Create 5 questions that would work well with images/diagrams
+    The page is fetched through the shared pooled fetcher (conditional GET,
+    extracted text reused on 304); classification and the OpenAI call run in
+    a worker thread so the event loop is never blocked. ``host_slots`` is
+    held only while the page downloads (per-host limits in batch imports).
+    """
+    _check_quiz_type(quiz_type)
+    _check_mode(mode)
+    report = report if report is not None else StageReport()
+    variant = _result_variant(quiz_type, num_questions, mode)
 
-Format the output as a structured quiz with clear questions and answers."""
+    if use_cache:
+        cached = _get_cached(url, variant, report)
+        if cached:
+            return cached
 
-        try:
-            quiz = call_openai(prompt, model=model)
-        except Exception as e:
-            logger.error(f"OpenAI call failed: {e}")
-            # Provide a fallback response
-            quiz = f"Failed to generate quiz. Error: {str(e)}"
-        
-        result = {
-            "topic": topic,
-            "difficulty": difficulty,
-            "quiz_type": quiz_type,
-            "source_url": url,
-            "scraped_at": datetime.now(timezone.utc).isoformat(),
-            "content_excerpt": snippet,
-            "quiz": quiz
-        }
-
-        # Cache the result
+    try:
+        if offline:
+            return await asyncio.to_thread(
+                _build_from_store, url, quiz_type, model, use_cache, report, num_questions, mode
+            )
+
+        async with host_slots or contextlib.nullcontext():
+            fetched = await fetch_article_async(url, report)
         if use_cache:
-            try:
-                set_cached_quiz(url, quiz_type, result)
-            except Exception as e:
-                logger.warning(f"Failed to cache quiz: {e}")
-            
-        logger.info(f"Generated {quiz_type} quiz for {url} (topic: {topic}, difficulty: {difficulty})")
-        return result
-        
+            cached = _get_cached_canonical(url, fetched.canonical_link, variant, report)
+            if cached:
+                return cached
+        await asyncio.to_thread(
+            store_article, [url, fetched.canonical_link], fetched.html, fetched.text, fetched.canonical_link
+        )
+        return await asyncio.to_thread(
+            _build_quiz, url, quiz_type, fetched.text, model, use_cache, report, fetched.canonical_link,
+            num_questions, mode, fetched.html
+        )
     except Exception as e:
         logger.error(f"Failed to generate quiz from {url}: {str(e)}")
         raise
@@ -0,0 +1,254 @@
+## readability.py
+"""
+In-house readability engine.
+
+Each text is tokenized once into words and sentence terminators
+(``utils.text_analysis.tokenize``), so a document's shared ``TextAnalysis``
+tokens can be scored directly. Syllables are counted with a rule table
+instead of a dictionary: vowel groups, minus silent endings ("-e", "-ed",
+"-es", ...), plus vowel pairs that are split across syllables ("-ia-",
+"-io-", ...).
+
+With NumPy, the words of every text in a batch are packed right-aligned
+into one byte matrix, so the vowel groups and every suffix and pair rule
+are single array operations over all words at once, and the per-text
+totals are ``bincount``s. Without NumPy the same table is applied word by
+word.
+
+All metrics come from the same counts: Flesch reading ease, Flesch-Kincaid
+grade, Gunning fog, SMOG, Coleman-Liau and ARI. Word and sentence counting
+follow textstat (short sentences of at most two words are ignored). On
+English prose whose words are in CMUdict, the Flesch-Kincaid grade is within
+0.3 grades of textstat's (mean 0.08). Words outside CMUdict, such as names and
+jargon, score higher than textstat's Pyphen fallback, which undercounts
+syllables ("bokadu" = 1). See ``benchmarks/bench_readability.py``.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+from smart_quiz_api.utils.text_analysis import is_terminator, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Try to import numpy, fallback to per-word rules if not available
+try:
+    import numpy as np  # type: ignore
+    _has_numpy = True
+except ImportError:
+    _has_numpy = False
+    logger.warning("numpy not available, readability scoring runs per word")
+
+_VOWELS = b"aeiouy"
+_CONSONANTS = b"bcdfghjklmnpqrstvwxz"
+
+_LETTERS = _VOWELS + _CONSONANTS
+
+# (suffix, characters allowed right before it, delta)
+SUFFIX_RULES: Tuple[Tuple[bytes, bytes, int], ...] = (
+    (b"e", _CONSONANTS.replace(b"l", b""), -1),        # make, there
+    (b"le", _VOWELS, -1),                              # mile, whole (but table, little)
+    (b"les", _VOWELS, -1),                             # miles (but particles)
+    (b"ed", _CONSONANTS.replace(b"t", b"").replace(b"d", b""), -1),  # jumped (but wanted)
+    (b"es", b"bfkmnprtvw", -1),                        # makes, hopes (but boxes, wishes, pages)
+    (b"ely", _CONSONANTS, -1),                         # lovely, lately
+    (b"ue", b"gq", -1),                                # league, unique
+    (b"ire", _LETTERS, 1),                             # fire, empire
+    (b"ing", _VOWELS, 1),                              # being, going, trying
+)
+
+# (vowel pair, characters that must NOT come right before it, delta)
+PAIR_RULES: Tuple[Tuple[bytes, bytes, int], ...] = (
+    (b"ia", b"cst", 1),                                # piano, media (but special, Asia, initial)
+    (b"io", b"cglnstx", 1),                            # violin, radio (but nation, region, million)
+    (b"iu", b"", 1),                                   # stadium, medium
+    (b"ua", b"gq", 1),                                 # actual, usual (but quality, language)
+)
+
+_TERMINATORS = b".!?"
+
+
+@dataclass(frozen=True)
+class ReadabilityScores:
+    words: int
+    sentences: int
+    syllables: int
+    polysyllables: int          # Words with 3+ syllables
+    letters: int
+    flesch_reading_ease: float
+    flesch_kincaid_grade: float
+    gunning_fog: float
+    smog_index: float
+    coleman_liau_index: float
+    automated_readability_index: float
+
+
+def _scores(words: int, sentences: int, syllables: int, polysyllables: int, letters: int) -> ReadabilityScores:
+    if not words:
+        return ReadabilityScores(0, 0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    sentences = max(sentences, 1)
+    words_per_sentence = words / sentences
+    syllables_per_word = syllables / words
+    return ReadabilityScores(
+        words=words,
+        sentences=sentences,
+        syllables=syllables,
+        polysyllables=polysyllables,
+        letters=letters,
+        flesch_reading_ease=206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word,
+        flesch_kincaid_grade=0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59,
+        gunning_fog=0.4 * (words_per_sentence + 100 * polysyllables / words),
+        smog_index=1.043 * math.sqrt(polysyllables * 30 / sentences) + 3.1291,
+        coleman_liau_index=0.0588 * (100 * letters / words) - 0.296 * (100 * sentences / words) - 15.8,
+        automated_readability_index=4.71 * letters / words + 0.5 * words_per_sentence - 21.43,
+    )
+
+
+# === Per-word path (no numpy) ===
+def count_syllables(word: str) -> int:
+    """Syllables in one lowercase word, by the rule table."""
+    data = word.encode("ascii", "replace")
+    groups, previous = 0, False
+    for position, char in enumerate(data):
+        vowel = char in _VOWELS and not (char == ord("y") and position == 0)
+        if vowel and not previous:
+            groups += 1
+        previous = vowel
+    for suffix, before, delta in SUFFIX_RULES:
+        if data.endswith(suffix) and len(data) > len(suffix) and data[-len(suffix) - 1] in before:
+            groups += delta
+    for pair, excluded, delta in PAIR_RULES:
+        start = data.find(pair)
+        while start != -1:
+            if start == 0 or data[start - 1] not in excluded:
+                groups += delta
+            start = data.find(pair, start + 1)
+    return max(groups, 1)
+
+
+def _score_tokens(tokens: List[str]) -> ReadabilityScores:
+    words = sentences = sentence_words = syllables = polysyllables = letters = 0
+    for token in tokens:
+        if is_terminator(token):
+            sentences += sentence_words > 2
+            sentence_words = 0
+            continue
+        count = count_syllables(token)
+        words += 1
+        sentence_words += 1
+        syllables += count
+        polysyllables += count >= 3
+        letters += sum(char.isalpha() for char in token)
+    sentences += sentence_words > 2
+    return _scores(words, sentences, syllables, polysyllables, letters)
+
+
+# === Vectorized path ===
+def _table(chars: bytes) -> "np.ndarray":
+    """Byte -> bool lookup table, so a class test is one fancy-index over the matrix."""
+    table = np.zeros(256, dtype=bool)
+    table[np.frombuffer(chars, dtype=np.uint8)] = True
+    return table
+
+
+if _has_numpy:
+    # The rule table compiled to lookup tables once at import
+    _VOWEL_TABLE = _table(_VOWELS)
+    _LETTER_TABLE = _table(_LETTERS + b"?")
+    _TERMINATOR_TABLE = _table(_TERMINATORS)
+    _COMPILED_SUFFIXES = [(suffix, _table(before), delta) for suffix, before, delta in SUFFIX_RULES]
+    _COMPILED_PAIRS = [(pair, _table(excluded), delta) for pair, excluded, delta in PAIR_RULES]
+
+
+def _syllable_matrix(data: "np.ndarray", lengths: "np.ndarray") -> "np.ndarray":
+    """Syllables per word for words packed back to back in ``data``."""
+    pad = 4   # Room for the longest suffix plus the character before it
+    width = int(lengths.max()) + pad
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    columns = width - np.repeat(lengths, lengths) + (np.arange(len(data)) - np.repeat(starts, lengths))
+    matrix = np.zeros((len(lengths), width), dtype=np.uint8)
+    matrix[rows, columns] = data
+
+    vowels = _VOWEL_TABLE[matrix]
+    first = width - lengths
+    vowels[np.arange(len(lengths)), first] &= matrix[np.arange(len(lengths)), first] != ord("y")
+    counts = np.count_nonzero(vowels[:, 1:] & ~vowels[:, :-1], axis=1)
+
+    for suffix, before, delta in _COMPILED_SUFFIXES:
+        size = len(suffix)
+        match = before[matrix[:, width - size - 1]]
+        for offset, char in enumerate(suffix):
+            match &= matrix[:, width - size + offset] == char
+        counts += delta * match
+    for pair, excluded, delta in _COMPILED_PAIRS:
+        match = (matrix[:, 1:-1] == pair[0]) & (matrix[:, 2:] == pair[1]) & ~excluded[matrix[:, :-2]]
+        counts += delta * np.count_nonzero(match, axis=1)
+    return np.maximum(counts, 1)
+
+
+def _score_batch_numpy(token_lists: List[List[str]]) -> List[ReadabilityScores]:
+    tokens = [token for tokens in token_lists for token in tokens]
+    if not tokens:
+        return [_scores(0, 0, 0, 0, 0) for _ in token_lists]
+    # Non-ASCII characters become one "?" each, so lengths line up with the encoded bytes
+    data = np.frombuffer("".join(tokens).encode("ascii", "replace"), dtype=np.uint8)
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    document = np.repeat(np.arange(len(token_lists)), [len(t) for t in token_lists])
+
+    starts = np.cumsum(lengths) - lengths
+    terminator = _TERMINATOR_TABLE[data[starts]]
+    is_word = ~terminator
+    syllables = np.where(is_word, _syllable_matrix(data, lengths), 0)
+    letters = np.add.reduceat(_LETTER_TABLE[data].astype(np.int64), starts) * is_word
+
+    # A sentence ends at each terminator and at each document boundary
+    boundary = terminator | np.r_[True, document[1:] != document[:-1]]
+    sentence = np.cumsum(boundary)
+    sentence_words = np.bincount(sentence, weights=is_word)
+    sentence_document = np.zeros(len(sentence_words), dtype=np.int64)
+    sentence_document[sentence] = document
+    long_sentences = np.bincount(sentence_document, weights=sentence_words > 2, minlength=len(token_lists))
+
+    size = len(token_lists)
+    words = np.bincount(document, weights=is_word, minlength=size)
+    total_syllables = np.bincount(document, weights=syllables, minlength=size)
+    polysyllables = np.bincount(document, weights=syllables >= 3, minlength=size)
+    total_letters = np.bincount(document, weights=letters, minlength=size)
+    return [
+        _scores(
+            int(words[i]), int(long_sentences[i]), int(total_syllables[i]),
+            int(polysyllables[i]), int(total_letters[i]),
+        )
+        for i in range(size)
+    ]
+
+
+# === Public API ===
+def score_token_lists(token_lists: Sequence[List[str]]) -> List[ReadabilityScores]:
+    """Readability scores for already tokenized texts (see ``TextAnalysis.tokens``), in one pass."""
+    if _has_numpy:
+        return _score_batch_numpy(list(token_lists))
+    return [_score_tokens(tokens) for tokens in token_lists]
+
+
+def score_texts(texts: Sequence[str]) -> List[ReadabilityScores]:
+    """Readability scores for many texts (or chunks of one text) in one pass."""
+    return score_token_lists([tokenize(text or "") for text in texts])
+
+
+def score_text(text: str) -> ReadabilityScores:
+    return score_texts([text])[0]
+
+
+__all__ = [
+    "ReadabilityScores",
+    "score_text",
+    "score_texts",
+    "score_token_lists",
+    "count_syllables",
+    "SUFFIX_RULES",
+    "PAIR_RULES",
+]
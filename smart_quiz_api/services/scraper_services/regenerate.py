@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Bulk quiz re-generation from the content store, without fetching any page.
+
+Rebuilds quizzes for every stored URL (or the given ones) with the current
+prompts and settings and writes one JSON line per URL, in the same shape as
+the batch endpoint. Result caches are bypassed so every quiz is regenerated;
+only the LLM is called. ``--reextract`` also re-runs HTML extraction on the
+stored pages, e.g. after the extractor changed.
+
+Usage:
+    python -m smart_quiz_api.services.scraper_services.regenerate [--quiz-type MCQ] [--num-questions N]
+        [--url URL ...] [--limit N] [--workers 4] [--reextract] [--output quizzes.jsonl]
+"""
+
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from smart_quiz_api.constants import DEFAULT_MODEL
+from smart_quiz_api.services.quiz_library import is_generation_failure
+from .content_store import content_store
+from .process_pool import extraction_pool
+from .quiz_generator import VALID_QUIZ_TYPES, generate_quiz_from_url
+
+logger = logging.getLogger(__name__)
+
+
+def reextract(url: str) -> None:
+    """Re-run extraction on the stored HTML of ``url`` and store the new text."""
+    stored = content_store.get(url)
+    html = content_store.get_html(stored.hash) if stored else None
+    if html is None:
+        raise ValueError(f"No stored HTML for {url}")
+    content_store.replace_text(stored.hash, extraction_pool.extract_clean_text(html))
+
+
+def regenerate_one(url: str, quiz_type: str, model: str, num_questions: Optional[int], extract: bool) -> Dict[str, Any]:
+    try:
+        if extract:
+            reextract(url)
+        quiz = generate_quiz_from_url(
+            url, quiz_type, model=model, use_cache=False,  # type: ignore[arg-type]
+            num_questions=num_questions, offline=True,
+        )
+    except Exception as e:
+        return {"url": url, "status": "error", "error": str(e) or type(e).__name__}
+    if is_generation_failure(quiz.get("quiz")):
+        return {"url": url, "status": "error", "error": "Quiz generation failed"}
+    return {"url": url, "status": "ok", "quiz": quiz}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quiz-type", default="MCQ", choices=VALID_QUIZ_TYPES)
+    parser.add_argument("--num-questions", type=int, help="Questions per quiz (default: the quiz type's default)")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--url", action="append", help="Stored URL to regenerate (repeatable; default: all)")
+    parser.add_argument("--limit", type=int, help="Regenerate at most this many URLs")
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="URLs in flight (LLM calls are still bounded by LLM_MAX_CONCURRENCY)",
+    )
+    parser.add_argument("--reextract", action="store_true", help="Re-run HTML extraction on the stored pages first")
+    parser.add_argument("--output", help="JSON lines output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if not content_store.enabled:
+        parser.error("The content store is disabled (CONTENT_STORE_MAX_MB=0)")
+    urls = args.url or list(content_store.urls())
+    if args.limit is not None:
+        urls = urls[:args.limit]
+    if not urls:
+        print(f"No stored pages in {content_store.root}", file=sys.stderr)
+        return 1
+
+    counts = {"ok": 0, "error": 0}
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            results = executor.map(
+                lambda url: regenerate_one(url, args.quiz_type, args.model, args.num_questions, args.reextract), urls
+            )
+            for result in results:
+                counts[result["status"]] += 1
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"🔁 Regenerated {counts['ok']} of {len(urls)} quizzes offline ({counts['error']} failed)", file=sys.stderr)
+    return 0 if counts["error"] == 0 else 2
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
@@ -0,0 +1,226 @@
+## stages.py
+"""
+Stage-level memoization for the URL → quiz pipeline.
+
+``generate_quiz_from_url`` runs as explicit stages:
+
+    fetch → extract → difficulty → snippet → context → classify → generate
+
+Each stage is cached on a hash of its own input, so only the stages whose
+input changed are recomputed. Only ``generate`` depends on the quiz type:
+asking for a TF quiz after an MCQ quiz on the same article reuses the page,
+the extracted text, the topic and the difficulty, and makes a single LLM
+call. Classify first asks a local keyword model (``topic_model``); when
+neither it nor the cache knows the topic, classify and generate are folded
+into one LLM call that returns both (``SCRAPER_COMBINED_GENERATION``). Long
+articles run ``generate`` once per chunk, concurrently (``chunked_generation``),
+each chunk cached on its own prompt. ``mode="local"``, and a failed LLM call,
+replace ``generate`` with ``cloze``: questions built locally in milliseconds,
+never cached. IMAGE quizzes get thumbnails of the page's own images
+(``image_assets``). Every run records per-stage hit/miss and timing in a
+``StageReport``, which the quiz routes return as a ``Server-Timing`` header
+and log as structured fields.
+
+Stages with small, stable outputs are persisted to Redis; the raw page is
+only kept in process memory for a short time.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from smart_quiz_api.services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+STAGE_MEMORY_ENTRIES = 256
+STAGE_MEMORY_BYTES = 64 * 1024 * 1024   # Raw pages can be up to 10MB each
+
+
+@dataclass(frozen=True)
+class StagePolicy:
+    ttl: int                 # Seconds
+    persist: bool = True     # Also store in Redis
+
+
+STAGE_POLICIES: Dict[str, StagePolicy] = {
+    "fetch": StagePolicy(ttl=300, persist=False),         # Raw HTML: large and changes upstream
+    "extract": StagePolicy(ttl=7 * 24 * 3600),
+    "classify": StagePolicy(ttl=7 * 24 * 3600),
+    "difficulty": StagePolicy(ttl=7 * 24 * 3600),
+    "snippet": StagePolicy(ttl=3600, persist=False),      # Cheap to recompute
+    "context": StagePolicy(ttl=3600, persist=False),      # Salient sentences for the prompt (see context_selector)
+    "generate": StagePolicy(ttl=3600),                    # Same TTL as the final quiz cache
+    "content": StagePolicy(ttl=7 * 24 * 3600),            # Quiz per content fingerprint (see dedupe)
+    "image": StagePolicy(ttl=7 * 24 * 3600),              # Stored thumbnail per image URL (see image_assets)
+}
+
+
+def stage_key(stage: str, stage_input: Any) -> str:
+    """Cache key for ``stage`` from a hash of its input (strings as-is, anything else as sorted JSON)."""
+    raw = stage_input if isinstance(stage_input, str) else json.dumps(stage_input, sort_keys=True)
+    return f"scrape_stage:{stage}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    hit: bool
+    seconds: float
+
+
+@dataclass
+class StageReport:
+    """Per-stage hit/miss and timing of one pipeline run, plus named counters (e.g. prompt tokens saved)."""
+    stages: List[StageTiming] = field(default_factory=list)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, stage: str, hit: bool, seconds: float) -> None:
+        self.stages.append(StageTiming(stage, hit, seconds))
+
+    def count(self, name: str, value: int) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> List[Dict[str, Any]]:
+        return [
+            {"stage": s.stage, "hit": s.hit, "ms": round(s.seconds * 1000, 2)}
+            for s in self.stages
+        ]
+
+    def summary(self) -> str:
+        return ", ".join(
+            [f"{s.stage}={'hit' if s.hit else 'miss'}/{s.seconds * 1000:.1f}ms" for s in self.stages]
+            + [f"{name}={value}" for name, value in self.counters.items()]
+        )
+
+    def server_timing(self) -> str:
+        """The stages as a ``Server-Timing`` header value, e.g. ``fetch;desc="miss";dur=812.4``."""
+        return ", ".join(
+            f'{s.stage};desc="{"hit" if s.hit else "miss"}";dur={s.seconds * 1000:.1f}' for s in self.stages
+        )
+
+    def log_fields(self) -> Dict[str, Any]:
+        """
+        Structured log fields (``logger.info(..., extra=report.log_fields())``).
+
+        Stages that ran more than once (one generate call per chunk) are
+        summed; a stage is a hit only if every run of it was.
+        """
+        ms: Dict[str, float] = {}
+        hits: Dict[str, bool] = {}
+        for s in self.stages:
+            ms[s.stage] = round(ms.get(s.stage, 0.0) + s.seconds * 1000, 2)
+            hits[s.stage] = hits.get(s.stage, True) and s.hit
+        return {"stage_ms": ms, "stage_hit": hits, "stage_counters": dict(self.counters)}
+
+
+class StageCache:
+    """Per-stage cache: in-process LRU with expiry in front of Redis."""
+
+    def __init__(
+        self,
+        max_entries: int = STAGE_MEMORY_ENTRIES,
+        max_bytes: int = STAGE_MEMORY_BYTES,
+        use_redis: bool = True
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, stage: str, key: str) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, size = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return True, value
+                del self._entries[key]
+                self._bytes -= size
+
+        policy = STAGE_POLICIES[stage]
+        if not (self.use_redis and policy.persist):
+            return False, None
+        raw = redis_service.get(key)
+        if not raw:
+            return False, None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return False, None
+        self._remember(key, value, policy.ttl)
+        return True, value
+
+    def set(self, stage: str, key: str, value: Any) -> None:
+        policy = STAGE_POLICIES[stage]
+        self._remember(key, value, policy.ttl)
+        if self.use_redis and policy.persist:
+            redis_service.setex(key, policy.ttl, json.dumps(value))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remember(self, key: str, value: Any, ttl: int) -> None:
+        size = len(value) if isinstance(value, str) else 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self._bytes > self.max_bytes and len(self._entries) > 1):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def run(
+        self,
+        stage: str,
+        stage_input: Any,
+        compute: Callable[[], Any],
+        report: StageReport,
+        cacheable: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """Return the cached output of ``stage`` for ``stage_input``, computing it on a miss."""
+        start = time.perf_counter()
+        key = stage_key(stage, stage_input)
+        hit, value = self.get(stage, key)
+        if not hit:
+            value = compute()
+            if cacheable(value):
+                self.set(stage, key, value)
+        report.record(stage, hit, time.perf_counter() - start)
+        return value
+
+    async def run_async(
+        self,
+        stage: str,
+        stage_input: Any,
+        compute: Callable[[], Awaitable[Any]],
+        report: StageReport,
+        cacheable: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """``run`` for stages whose computation is a coroutine."""
+        start = time.perf_counter()
+        key = stage_key(stage, stage_input)
+        hit, value = self.get(stage, key)
+        if not hit:
+            value = await compute()
+            if cacheable(value):
+                self.set(stage, key, value)
+        report.record(stage, hit, time.perf_counter() - start)
+        return value
+
+
+# Global stage cache shared by the sync and async pipelines
+stage_cache = StageCache()
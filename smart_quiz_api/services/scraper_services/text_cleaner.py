@@ -3,6 +3,7 @@
 ## text_cleaner.py
 from bs4 import BeautifulSoup
 import logging
+from smart_quiz_api.utils.text_analysis import analyze
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +15,28 @@ except ImportError:
     _has_readability = False
     logger.warning("readability library not available, using BeautifulSoup fallback")
 
-def extract_clean_text(html: str) -> str:
-    """Extract clean text from HTML using readability or BeautifulSoup fallback."""
+# Try to import the lxml single-parse extractor, fallback to readability/BeautifulSoup if not available
+try:
+    from .html_extractor import extract_article_text
+    _has_fast_extractor = True
+except ImportError:
+    _has_fast_extractor = False
+    logger.warning("lxml library not available, using readability/BeautifulSoup extraction")
+
+def extract_clean_text(html: str, engine: str = "fast") -> str:
+    """
+    Extract clean text from HTML.
+
+    The default ``"fast"`` engine parses the document once with lxml (see
+    ``html_extractor``). ``"readability"`` is the slower path: readability,
+    then BeautifulSoup on its summary, then a full BeautifulSoup fallback.
+    """
     if not html or not html.strip():
         raise ValueError("Empty HTML content")
 
+    if engine == "fast" and _has_fast_extractor:
+        return extract_article_text(html)
+
     # Try readability first if available
     if _has_readability:
         try:
@@ -27,7 +45,7 @@ def extract_clean_text(html: str) -> str:
             soup = BeautifulSoup(summary_html, "html.parser")  # type: ignore
             clean_text = soup.get_text(separator=" ", strip=True)
 
-            if len(clean_text.split()) >= 100:
+            if analyze(clean_text).word_count >= 100:
                 return clean_text
             else:
                 logger.warning("Readability produced insufficient content, using fallback")
@@ -44,7 +62,7 @@ def extract_clean_text(html: str) -> str:
             
         clean_text = soup.get_text(separator=" ", strip=True)
 
-        if len(clean_text.split()) < 50:
+        if analyze(clean_text).word_count < 50:
             raise ValueError("Insufficient content extracted")
 
         return clean_text
@@ -1,28 +1,58 @@
-
-## topic_classifier.py
+from smart_quiz_api.config import settings
 from smart_quiz_api.services.openai_service import safe_openai_chat
+from .topic_model import predict_topic
+from typing import Any, Optional
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TOPIC = "General Knowledge"
+MAX_TOPIC_WORDS = 6
+
+# Openings of a chatty answer ("I think...", "Here is...", "The topic is...") rather than a label
+_PROSE_START = re.compile(r"^(i|i'm|here|this|sorry|the (topic|text|main|answer))\b", re.IGNORECASE)
+
+
+def normalize_topic(raw: Any) -> Optional[str]:
+    """A usable topic label from an LLM answer, or None if it looks like prose."""
+    if not isinstance(raw, str):
+        return None
+    topic = raw.strip()
+    if (
+        not topic
+        or len(topic) > 50
+        or "\n" in topic
+        or len(topic.split()) > MAX_TOPIC_WORDS
+        or topic.endswith((".", "!", "?", ":"))
+        or _PROSE_START.match(topic)
+    ):
+        return None
+    return topic
+
+
+def local_topic(text: str) -> Optional[str]:
+    """The local model's topic when it is confident enough to skip the LLM, else None."""
+    return predict_topic(text, settings.topic_confidence_threshold)
+
+
 def classify_topic(text: str) -> str:
-    """Classify the topic of given text using AI."""
+    """Classify the topic of given text, asking the LLM only when the local model is unsure."""
     try:
         if not text or len(text.strip()) < 50:
-            return "General Knowledge"
-            
+            return DEFAULT_TOPIC
+
+        topic = local_topic(text)
+        if topic:
+            return topic
+
         sample_text = text[:500]
         prompt = f"Classify this text into a single topic (e.g. History, Science, Technology, etc). Return only the topic name:\n\n{sample_text}"
         response = safe_openai_chat(prompt, max_tokens=50, temperature=0.3)
-        topic = response.strip()
-        
+
         # Validate topic response
-        if topic and len(topic) <= 50 and not topic.lower().startswith(('i', 'the', 'this', 'here')):
-            return topic
-        else:
-            return "General Knowledge"
-            
+        return normalize_topic(response) or DEFAULT_TOPIC
+
     except Exception as e:
         logger.error(f"Topic classification failed: {str(e)}")
-        return "General Knowledge"
-
+        return DEFAULT_TOPIC
@@ -0,0 +1,119 @@
+## topic_model.py
+"""
+Local keyword model for article topics.
+
+A linear model over sublinear term frequencies: every topic has a weight per
+term (``data/topic_weights.json``), a topic's score is the sum of
+``weight * (1 + log(count))`` over the first ``max_words`` words of the text
+(taken from its shared ``TextAnalysis``), and a softmax over the scores
+gives the confidence. A fixed ``background`` score takes part in the
+softmax, so text with little topical evidence gets a low confidence instead
+of a confident guess.
+
+Scoring is a dict lookup per word, well under a millisecond for an article;
+callers only fall back to the LLM when the confidence is below
+``TOPIC_CONFIDENCE_THRESHOLD``. The weights were tuned on
+``data/topic_eval.jsonl``; ``benchmarks/bench_topic_classifier.py`` measures
+them on the held-out ``data/topic_holdout.jsonl``.
+"""
+
+import json
+import logging
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from smart_quiz_api.utils.text_analysis import analyze
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "topic_weights.json")
+
+
+def _normalize(word: str) -> str:
+    """Fold simple plurals so "planets" and "planet" share a weight."""
+    if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+@dataclass(frozen=True)
+class TopicPrediction:
+    topic: str
+    confidence: float
+
+
+class TopicModel:
+    """Keyword-weighted linear topic classifier."""
+
+    def __init__(
+        self, weights: Dict[str, Dict[str, float]], background: float = 4.0, scale: float = 1.0, max_words: int = 1000
+    ):
+        self.topics: List[str] = sorted(weights)
+        self.background = background
+        self.scale = scale
+        self.max_words = max_words
+        # Inverted index: term -> [(topic index, weight)]
+        self._terms: Dict[str, List[Tuple[int, float]]] = {}
+        for index, topic in enumerate(self.topics):
+            for term, weight in weights[topic].items():
+                self._terms.setdefault(_normalize(term.lower()), []).append((index, weight))
+
+    @classmethod
+    def load(cls, path: str = WEIGHTS_PATH) -> "TopicModel":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["weights"],
+            background=data.get("background", 4.0),
+            scale=data.get("scale", 1.0),
+            max_words=data.get("max_words", 1000),
+        )
+
+    def scores(self, words: Sequence[str]) -> List[float]:
+        totals = [0.0] * len(self.topics)
+        counts = Counter(_normalize(word) for word in words[:self.max_words])
+        for term, count in counts.items():
+            postings = self._terms.get(term)
+            if postings:
+                tf = 1 + math.log(count)
+                for index, weight in postings:
+                    totals[index] += weight * tf
+        return totals
+
+    def predict(self, text: str) -> TopicPrediction:
+        """The best topic and its softmax probability against every topic and the background."""
+        scores = self.scores(analyze(text or "").words)
+        best = max(range(len(scores)), key=scores.__getitem__)
+        peak = max(scores[best], self.background)
+        denominator = math.exp((self.background - peak) * self.scale) + sum(
+            math.exp((score - peak) * self.scale) for score in scores
+        )
+        return TopicPrediction(self.topics[best], math.exp((scores[best] - peak) * self.scale) / denominator)
+
+
+@lru_cache(maxsize=1)
+def get_topic_model() -> Optional[TopicModel]:
+    try:
+        return TopicModel.load()
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Local topic model unavailable, using the LLM only: {e}")
+        return None
+
+
+def predict_topic(text: str, threshold: float) -> Optional[str]:
+    """The local model's topic for ``text`` if its confidence reaches ``threshold``, else None."""
+    model = get_topic_model()
+    if model is None:
+        return None
+    prediction = model.predict(text)
+    if prediction.confidence >= threshold:
+        return prediction.topic
+    logger.debug(f"Local topic '{prediction.topic}' below threshold ({prediction.confidence:.2f} < {threshold})")
+    return None
+
+
+__all__ = ["TopicModel", "TopicPrediction", "get_topic_model", "predict_topic"]
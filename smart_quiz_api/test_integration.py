@@ -9,7 +9,7 @@ Run this script to verify that the entire system is functioning correctly.
 import sys
 import os
 import logging
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -271,6 +271,1475 @@ def test_utils():
         print(f"❌ Utilities test failed: {str(e)}")
         assert False
 
+def test_serializers():
+    """Test the fast serialization path matches the response_model output."""
+    print("📦 Testing serializers...")
+
+    try:
+        from types import SimpleNamespace
+        from datetime import datetime, timezone
+        import json
+        from smart_quiz_api.schema import QuizOut
+        from smart_quiz_api.serializers import FastJSONResponse, quiz_to_dto, get_type_adapter
+
+        question = SimpleNamespace(
+            id=1, question_text="2 + 2?", correct_answer="4", question_type=None,
+            options=[SimpleNamespace(id=1, text="3"), SimpleNamespace(id=2, text="4")]
+        )
+        quiz = SimpleNamespace(
+            id=1, title="Maths", category="Science", difficulty="easy",
+            created_at=datetime.now(timezone.utc), questions=[question]
+        )
+        payload = quiz_to_dto(quiz)
+        expected = get_type_adapter(QuizOut).dump_python(
+            get_type_adapter(QuizOut).validate_python(payload), mode="json", by_alias=True
+        )
+        assert json.loads(FastJSONResponse(payload).body) == expected
+        assert payload["quiz_type"] == "mcq"
+        assert [a["is_correct"] for a in payload["questions"][0]["answers"]] == [False, True]
+
+        print("✅ Serializers test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Serializers test failed: {str(e)}")
+        assert False
+
+def test_quiz_library():
+    """Test library keys are stable across equivalent generation inputs."""
+    print("📚 Testing quiz library keys...")
+
+    try:
+        from smart_quiz_api.config import settings
+        from smart_quiz_api.services.quiz_library import (
+            canonical_url, library_key_for_topic, library_key_for_url
+        )
+
+        assert canonical_url("HTTPS://Example.com:443/a/?utm_source=x&b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+        assert library_key_for_url("https://example.com/a?b=2", "mcq") == \
+            library_key_for_url("https://EXAMPLE.com/a/?b=2", "MCQ")
+        assert library_key_for_url("https://example.com/a", "MCQ") != library_key_for_url("https://example.com/a", "TF")
+        assert library_key_for_topic(" World  History", "Easy", "mcq") == \
+            library_key_for_topic("world history", "easy", "MCQ")
+
+        # Fenced replies parse; unparseable ones are never turned into a storable quiz
+        import json
+        from smart_quiz_api.services import quiz_pool as quiz_pool_module
+        from smart_quiz_api.services.openai_service import parse_ai_quiz_response
+        from smart_quiz_api.services.quiz_library import store_in_library
+
+        question = {"question": "Which planet is red?", "options": ["Mars", "Venus"], "answer": "Mars"}
+        replies = {
+            "fenced": "Here is your quiz:\n```json\n" + json.dumps([question]) + "\n```",
+            "wrapped": json.dumps({"questions": [question]}),
+            "prose": "1. Which planet is red? Mars",
+        }
+        original_chat = quiz_pool_module.safe_openai_chat
+        try:
+            for kind, reply in replies.items():
+                quiz_pool_module.safe_openai_chat = lambda prompt, use_cache=True, report=None, reply=reply: reply
+                payload, raw = quiz_pool_module.generate_ai_payload("Planets", "easy", "MCQ")
+                if kind == "prose":
+                    assert payload is None and raw == reply
+                else:
+                    assert payload is not None and payload["questions"] == [question], kind
+        finally:
+            quiz_pool_module.safe_openai_chat = original_chat
+        placeholder = parse_ai_quiz_response(replies["prose"], "MCQ")
+        assert store_in_library(
+            None, "k" * 64, {}, title="t", category="c", difficulty="easy",  # type: ignore[arg-type]
+            quiz_type="MCQ", questions=placeholder,
+        ) is None
+
+        # Library rows stay out of the quiz listings, and expired entries are regenerated
+        import importlib
+        from datetime import datetime, timedelta, timezone
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from smart_quiz_api.models import Quiz
+        from smart_quiz_api.models.base import Base
+        from smart_quiz_api.models.enum import DifficultyEnum
+        from smart_quiz_api.services.quiz_library import get_library_payload
+
+        quiz_router = importlib.import_module("smart_quiz_api.routers.quiz_router")
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Quiz(title="Mine", category="Science", difficulty=DifficultyEnum.EASY, user_id="u1"))
+            db.commit()
+            key = library_key_for_topic("Planets", "easy", "MCQ")
+
+            def store(title: str) -> Any:
+                return store_in_library(db, key, {"title": title}, title=title, category="Planets", difficulty="easy",
+                                        quiz_type="MCQ", questions=[question])
+
+            first = store("First")
+            assert first is not None and get_library_payload(db, key) == {"title": "First"}
+            assert store("Again") is None, "a fresh entry is kept"
+            for view in ("full", "summary"):
+                listed = json.loads(quiz_router.list_quizzes(view=view, fields=None, tag=None, db=db).body)
+                assert [q["title"] for q in listed] == ["Mine"], listed
+            listed = json.loads(quiz_router.list_user_quizzes("u1", view="full", fields=None, db=db).body)
+            assert [q["title"] for q in listed] == ["Mine"]
+
+            first.created_at = datetime.now(timezone.utc) - timedelta(hours=settings.library_ttl_hours + 1)
+            db.commit()
+            assert get_library_payload(db, key) is None, "expired entries are regenerated"
+            second = store("Second")
+            assert second is not None and get_library_payload(db, key) == {"title": "Second"}
+            db.refresh(first)
+            assert first.library_key is None and first.generation_payload is not None
+            listed = json.loads(quiz_router.list_quizzes(view="full", fields=None, tag=None, db=db).body)
+            assert [q["title"] for q in listed] == ["Mine"], "retired entries stay out of the listings"
+
+        print("✅ Quiz library test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Quiz library test failed: {str(e)}")
+        assert False
+
+def test_quiz_pool():
+    """Test pool refills serve parsed quizzes and never pool an unparseable reply."""
+    print("🧺 Testing quiz pool...")
+
+    try:
+        import json
+        from smart_quiz_api.services import quiz_pool as quiz_pool_module
+        from smart_quiz_api.services.quiz_pool import QuizPool
+
+        question = {"question": "Which planet is red?", "options": ["Mars", "Venus"], "answer": "Mars"}
+        reply = {"text": "1. Which planet is red? Mars"}
+        original_chat = quiz_pool_module.safe_openai_chat
+        quiz_pool_module.safe_openai_chat = lambda prompt, use_cache=True, report=None: reply["text"]
+        try:
+            pool = QuizPool(size=1, hot_threshold=1)
+            assert pool.take("Planets", "easy", "MCQ") is None
+            assert pool.refill_once() == 0 and pool.refill_failures == 1
+            assert pool.take("Planets", "easy", "MCQ") is None, "prose replies are not pooled"
+
+            reply["text"] = "```json\n" + json.dumps([question]) + "\n```"
+            assert pool.refill_once() == 1
+            pooled = pool.take("Planets", "easy", "MCQ")
+            assert pooled is not None and pooled["questions"] == [question]
+        finally:
+            quiz_pool_module.safe_openai_chat = original_chat
+
+        print("✅ Quiz pool test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Quiz pool test failed: {str(e)}")
+        assert False
+
+def test_quiz_update():
+    """Test editing a quiz keeps users' answers and feedback, and refuses to change answered questions."""
+    print("✏️ Testing quiz update...")
+
+    try:
+        import importlib
+        from fastapi import BackgroundTasks, HTTPException
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from smart_quiz_api.models import Feedback, Quiz, QuizQuestion, QuestionOption, UserAnswer
+        from smart_quiz_api.models.base import Base
+        from smart_quiz_api.models.enum import DifficultyEnum, QuestionTypeEnum
+        from smart_quiz_api.schema import QuizCreate
+
+        quiz_router = importlib.import_module("smart_quiz_api.routers.quiz_router")
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+
+        def question(text: str, answer: str, options: List[str]) -> QuizQuestion:
+            return QuizQuestion(
+                question_text=text, correct_answer=answer, question_type=QuestionTypeEnum.MCQ,
+                options=[QuestionOption(position=i, text=o) for i, o in enumerate(options)],
+                explanation=f"Because {answer}",
+            )
+
+        quiz = Quiz(title="Planets", category="Science", difficulty=DifficultyEnum.EASY, questions=[
+            question("Red planet?", "Mars", ["Mars", "Venus"]),
+            question("Largest planet?", "Jupiter", ["Jupiter", "Earth"]),
+            question("Ringed planet?", "Saturn", ["Saturn", "Mercury"]),
+        ])
+        db.add(quiz)
+        db.commit()
+        red, largest, ringed = sorted(quiz.questions, key=lambda q: q.id)
+        db.add_all([
+            UserAnswer(user_id="u1", question_id=red.id, selected_answer="Mars", is_correct=True),
+            Feedback(user_id="u2", quiz_id=quiz.id, question_id=largest.id, message="Too easy"),
+        ])
+        db.commit()
+        ids = (red.id, largest.id, ringed.id)
+
+        def edit(questions: List[tuple]) -> None:
+            quiz_router.update_quiz(quiz.id, QuizCreate(
+                title="Planets", topic="Science", difficulty="easy", quiz_type="mcq",
+                questions=[
+                    {"text": t, "correct_answer": a, "answers": [{"text": o} for o in opts]}
+                    for t, a, opts in questions
+                ],
+            ), BackgroundTasks(), db)
+
+        red_planet = ("Red planet?", "Mars", ["Mars", "Venus"])
+        largest_planet = ("Largest planet?", "Jupiter", ["Jupiter", "Earth"])
+
+        # Answered questions unchanged, the unanswered one edited into a new row
+        edit([red_planet, largest_planet, ("Ringed giant?", "Saturn", ["Saturn", "Mercury", "Mars"])])
+        db.expire_all()
+        rows = {q.id: q for q in db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz.id)}
+        assert len(rows) == 3 and ids[0] in rows and ids[1] in rows and ids[2] not in rows
+        assert rows[ids[0]].explanation == "Because Mars", "unchanged question keeps its enrichment"
+        edited = max(rows.values(), key=lambda q: q.id)
+        assert edited.question_text == "Ringed giant?" and edited.option_texts == ["Saturn", "Mercury", "Mars"]
+        assert db.query(UserAnswer).count() == 1 and db.query(Feedback).count() == 1, "answers and feedback survive"
+
+        # Changing or removing an answered question would move its history onto other content
+        for questions in (
+            [("Capital of France?", "Paris", ["Paris", "Rome"]), largest_planet],  # answered question changed
+            [red_planet],  # question with feedback removed
+        ):
+            try:
+                edit(questions)
+                assert False, "changing an answered question is refused"
+            except HTTPException as e:
+                assert e.status_code == 409
+        db.expire_all()
+        answer = db.query(UserAnswer).one()
+        assert answer.question.question_text == "Red planet?" and answer.question.correct_answer == "Mars"
+        assert db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz.id).count() == 3
+        db.close()
+
+        print("✅ Quiz update test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Quiz update test failed: {str(e)}")
+        assert False
+
+def test_quiz_enrichment():
+    """Test failed enrichment is neither cached nor retried by reads until its backoff expires."""
+    print("💡 Testing quiz enrichment...")
+
+    try:
+        import asyncio
+        import importlib
+        import json
+        import time
+        import httpx
+        from contextlib import contextmanager
+        from fastapi import FastAPI
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        from smart_quiz_api.database import get_db
+        from smart_quiz_api.models import Quiz, QuizQuestion, QuestionOption
+        from smart_quiz_api.models.base import Base
+        from smart_quiz_api.models.enum import DifficultyEnum, QuestionTypeEnum
+        from smart_quiz_api.services import quiz_enrichment
+        from smart_quiz_api.services.openai_service import ai_tasks
+
+        # One shared connection: the streaming test reads and enriches from other threads
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        def red_planet_quiz() -> int:
+            with Session() as db:
+                quiz = Quiz(
+                    title="Planets", category="Science", difficulty=DifficultyEnum.EASY,
+                    questions=[QuizQuestion(
+                        question_text="Red planet?", correct_answer="Mars", question_type=QuestionTypeEnum.MCQ,
+                        options=[QuestionOption(position=0, text="Mars"), QuestionOption(position=1, text="Venus")],
+                    )],
+                )
+                db.add(quiz)
+                db.commit()
+                return quiz.id
+
+        @contextmanager
+        def test_session():
+            with Session() as db:
+                yield db
+                db.commit()
+
+        quiz_id = red_planet_quiz()
+        reply = {"text": "Sorry, I cannot help with that."}
+        cached: List[str] = []
+        originals = (
+            quiz_enrichment.db_session, ai_tasks.call_openai, ai_tasks.set_cached_response, ai_tasks.get_cached_response
+        )
+        quiz_enrichment.db_session = test_session
+        ai_tasks.call_openai = lambda prompt, **kwargs: time.sleep(reply.get("delay", 0)) or reply["text"]
+        ai_tasks.set_cached_response = lambda prompt, response: cached.append(response)
+        ai_tasks.get_cached_response = lambda prompt: None
+        try:
+            assert quiz_enrichment.should_enrich(quiz_id)
+            assert quiz_enrichment.enrich_quiz(quiz_id) == 0
+            assert cached == [], "an unparseable reply is not cached"
+            assert not quiz_enrichment.should_enrich(quiz_id), "reads back off after a failed run"
+
+            # Writes retry right away; success clears the backoff
+            reply["text"] = '[{"index": 1, "explanation": "Iron oxide makes Mars red.", "confidence": 0.9}]'
+            assert quiz_enrichment.enrich_quiz(quiz_id) == 1
+            assert quiz_enrichment.should_enrich(quiz_id)
+            with Session() as db:
+                question = db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).one()
+                assert question.explanation == "Iron oxide makes Mars red." and not quiz_enrichment.is_stale(question)
+
+            # A streamed read starts enrichment before streaming, so it waits for the run instead of ending at once
+            quiz_router = importlib.import_module("smart_quiz_api.routers.quiz_router")
+            app = FastAPI()
+            app.include_router(quiz_router.router, prefix="/quiz")
+
+            def test_db():
+                with Session() as db:
+                    yield db
+
+            app.dependency_overrides[get_db] = test_db
+            original_session_local = quiz_router.SessionLocal
+            quiz_router.SessionLocal = Session
+            reply["delay"] = 0.3
+            stale_id = red_planet_quiz()
+
+            async def stream() -> List[Dict[str, Any]]:
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    response = await client.get(f"/quiz/{stale_id}/explain", params={"stream": "true"})
+                    return [json.loads(line) for line in response.text.splitlines()]
+
+            try:
+                lines = asyncio.run(stream())
+            finally:
+                quiz_router.SessionLocal = original_session_local
+            assert [line.get("explanation") for line in lines] == ["Iron oxide makes Mars red."], lines
+        finally:
+            (quiz_enrichment.db_session, ai_tasks.call_openai,
+             ai_tasks.set_cached_response, ai_tasks.get_cached_response) = originals
+
+        print("✅ Quiz enrichment test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Quiz enrichment test failed: {str(e)}")
+        assert False
+
+def test_quiz_tagging():
+    """Test tagging survives a concurrent run creating the same tag and does not cache replies."""
+    print("🏷️ Testing quiz tagging...")
+
+    try:
+        import os
+        import tempfile
+        from sqlalchemy import create_engine, event
+        from sqlalchemy.orm import sessionmaker
+        from smart_quiz_api.models import QuestionTag, Quiz, QuizQuestion, Tag
+        from smart_quiz_api.models.base import Base
+        from smart_quiz_api.models.enum import DifficultyEnum, QuestionTypeEnum
+        from smart_quiz_api.services import quiz_tagging
+        from smart_quiz_api.services.openai_service import ai_tasks
+
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'tags.db')}")
+            Base.metadata.create_all(engine)
+            Session = sessionmaker(bind=engine)
+            with Session() as db:
+                quiz = Quiz(title="Planets", category="Science", difficulty=DifficultyEnum.EASY, questions=[
+                    QuizQuestion(
+                        question_text="Red planet?", correct_answer="Mars", question_type=QuestionTypeEnum.MCQ
+                    ),
+                    QuizQuestion(
+                        question_text="Largest planet?", correct_answer="Jupiter", question_type=QuestionTypeEnum.MCQ
+                    ),
+                ])
+                db.add(quiz)
+                db.commit()
+                quiz_id = quiz.id
+
+            cached: List[str] = []
+            originals = (ai_tasks.call_openai, ai_tasks.set_cached_response, ai_tasks.get_cached_response)
+            ai_tasks.call_openai = lambda prompt, **kwargs: '[["Planets", "Mars"], ["planets", "Jupiter"]]'
+            ai_tasks.set_cached_response = lambda prompt, response: cached.append(response)
+            ai_tasks.get_cached_response = lambda prompt: None
+            try:
+                with Session() as db:
+                    questions = (
+                        db.query(QuizQuestion).filter(QuizQuestion.quiz_id == quiz_id).order_by(QuizQuestion.id).all()
+                    )
+                    raced: List[bool] = []
+
+                    @event.listens_for(db, "do_orm_execute")
+                    def create_concurrently(state):  # type: ignore[no-untyped-def]
+                        # Another tagging run commits "planets" right after this run looked it up
+                        if state.is_select and not raced:
+                            raced.append(True)
+                            result = state.invoke_statement().freeze()
+                            with Session() as other:
+                                other.add(Tag(name="planets"))
+                                other.commit()
+                            return result()
+
+                    assert quiz_tagging.tag_questions(db, questions) == 2
+                    db.commit()
+                assert raced and cached == [], "the tag lookup raced and the reply was not cached"
+            finally:
+                ai_tasks.call_openai, ai_tasks.set_cached_response, ai_tasks.get_cached_response = originals
+
+            with Session() as db:
+                assert sorted(t.name for t in db.query(Tag)) == ["jupiter", "mars", "planets"]
+                assert db.query(QuestionTag).count() == 4
+            engine.dispose()
+
+        print("✅ Quiz tagging test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Quiz tagging test failed: {str(e)}")
+        assert False
+
+def test_content_decoding():
+    """Test header checks and charset handling of the article fetch path."""
+    print("🔤 Testing content decoding...")
+
+    try:
+        from smart_quiz_api.services.scraper_services.content_fetcher import (
+            DownloadBudget, check_response_headers, decode_html, header_charset
+        )
+
+        check_response_headers("text/html; charset=utf-8", 1024)
+        for content_type, length in [("application/pdf", None), ("text/html", 50 * 1024 * 1024)]:
+            try:
+                check_response_headers(content_type, length)
+                assert False, f"{content_type} should be rejected"
+            except ValueError:
+                pass
+
+        latin = '<meta charset="iso-8859-1"><p>café</p>'.encode("latin-1")
+        assert "café" in decode_html(latin)
+        assert decode_html("café".encode("latin-1"), header_charset("text/html; charset=ISO-8859-1")) == "café"
+        assert decode_html("naïve ✓".encode("utf-8")) == "naïve ✓"
+
+        budget = DownloadBudget(max_bytes=10)
+        try:
+            budget.add(b"x" * 11)
+            assert False, "byte limit should abort the download"
+        except ValueError:
+            pass
+
+        print("✅ Content decoding test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Content decoding test failed: {str(e)}")
+        assert False
+
+def test_html_extraction():
+    """Test the single-parse extractor keeps the article and drops page chrome."""
+    print("📰 Testing HTML extraction...")
+
+    try:
+        from smart_quiz_api.services.scraper_services.html_extractor import extract_article_text
+
+        paragraph = "Photosynthesis converts light, water and carbon dioxide into glucose and oxygen. " * 4
+        html = (
+            "<html><head><script>var tracking = 1;</script></head><body>"
+            "<nav><a href='/'>Home</a> <a href='/about'>About us</a></nav>"
+            f"<div class='post-content'>{''.join(f'<p>{paragraph}</p>' for _ in range(5))}</div>"
+            "<div class='sidebar'><a href='/r/1'>Related reading on something else entirely</a></div>"
+            "<footer>Copyright notice</footer></body></html>"
+        )
+        text = extract_article_text(html)
+        assert "Photosynthesis" in text
+        assert "tracking" not in text and "About us" not in text and "Copyright" not in text
+
+        try:
+            extract_article_text("<html><body><p>Too short</p></body></html>")
+            assert False, "short pages should be rejected"
+        except ValueError:
+            pass
+
+        print("✅ HTML extraction test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ HTML extraction test failed: {str(e)}")
+        assert False
+
+def test_extraction_pool():
+    """Test extraction in worker processes, including the shared-memory hand-off."""
+    print("🧵 Testing extraction pool...")
+
+    try:
+        from smart_quiz_api.services.scraper_services.process_pool import (
+            SHARED_MEMORY_MIN_BYTES, ExtractionPool
+        )
+
+        paragraph = "<p>" + "Glaciers carve valleys, deposit moraines and feed rivers with meltwater. " * 5 + "</p>"
+        html = f"<html><body><nav>Menu</nav><article>{paragraph * 800}</article></body></html>"
+        assert len(html) >= SHARED_MEMORY_MIN_BYTES
+
+        pool = ExtractionPool(max_workers=1, max_tasks_per_child=2, timeout=60)
+        try:
+            for _ in range(3):  # Crosses a worker recycle
+                text = pool.extract_clean_text(html)
+                assert text.startswith("Glaciers") and "Menu" not in text
+        finally:
+            pool.shutdown()
+
+        # A burst much longer than the timeout: time spent queued for a worker does not count
+        import asyncio
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        big = html * 10
+        pool = ExtractionPool(max_workers=2, max_tasks_per_child=100, timeout=60)
+        try:
+            pool.extract_clean_text(big)
+            start = time.perf_counter()
+            pool.extract_clean_text(big)
+            elapsed = time.perf_counter() - start
+            pool.timeout = max(0.5, 6 * elapsed)
+            burst = int(2 * pool.max_workers * pool.timeout / elapsed)  # Two timeouts' worth of queue per worker
+            with ThreadPoolExecutor(max_workers=burst) as threads:
+                assert all(threads.map(lambda _: pool.extract_clean_text(big), range(burst)))
+
+            async def gather() -> list:
+                return await asyncio.gather(*(pool.extract_clean_text_async(big) for _ in range(burst)))
+
+            assert all(asyncio.run(gather()))
+        finally:
+            pool.shutdown()
+
+        inline = ExtractionPool(enabled=False)
+        assert inline.extract_clean_text(html) == text
+
+        print("✅ Extraction pool test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Extraction pool test failed: {str(e)}")
+        assert False
+
+def test_pipeline_stages():
+    """Test stage memoization and reporting."""
+    print("🪜 Testing pipeline stages...")
+
+    try:
+        from smart_quiz_api.services.scraper_services.stages import StageCache, StageReport
+
+        cache = StageCache(use_redis=False)
+        calls: List[str] = []
+
+        def classify() -> str:
+            calls.append("classify")
+            return "Science"
+
+        first, second = StageReport(), StageReport()
+        assert cache.run("classify", "article text", classify, first) == "Science"
+        assert cache.run("classify", "article text", classify, second) == "Science"
+        assert calls == ["classify"]
+        assert [s["hit"] for s in first.as_dict() + second.as_dict()] == [False, True]
+
+        cache.run("generate", {"prompt": "p"}, lambda: "", first, cacheable=bool)
+        assert not cache.get("generate", "missing")[0]
+        cache.run("generate", {"prompt": "p"}, lambda: "quiz", second, cacheable=bool)
+        assert second.stages[-1].hit is False, "failed generations must not be memoized"
+
+        print("✅ Pipeline stages test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Pipeline stages test failed: {str(e)}")
+        assert False
+
+def test_duplicate_detection():
+    """Test URL canonicalization, rel=canonical parsing and near-duplicate lookup."""
+    print("🪞 Testing duplicate detection...")
+
+    try:
+        from smart_quiz_api.services.quiz_library import canonical_url
+        from smart_quiz_api.services.scraper_services.content_fetcher import link_canonical
+        from smart_quiz_api.services.scraper_services.dedupe import (
+            ContentIndex, content_fingerprint, simhash
+        )
+
+        assert canonical_url("https://m.example.com/news/story/amp?fbclid=1") == "https://example.com/news/story"
+        assert canonical_url("https://www.example.com/news/story/") == "https://example.com/news/story"
+        assert canonical_url("https://example.com/a?gclid=1&utm_medium=mail&msclkid=2") == "https://example.com/a"
+        # Parameters that can select different content are kept
+        for url in (
+            "https://github.com/org/repo/blob/README.md?ref=main",
+            "https://example.com/a?amp=1",
+            "https://example.com/a?share=abc",
+            "https://example.com/a?outputType=amp",
+            "https://example.com/a?spm=1",
+        ):
+            assert canonical_url(url) == url, url
+        assert canonical_url("https://github.com/org/repo?ref=main") != \
+            canonical_url("https://github.com/org/repo?ref=dev")
+        assert link_canonical('<link href="/news/story" rel="canonical">', "https://amp.example.com/x") == \
+            "https://amp.example.com/news/story"
+
+        article = " ".join(
+            f"Section {i} explains how glaciers, rivers and winds shaped valley number {i * 7} "
+            f"over {i + 3} thousand years."
+            for i in range(60)
+        )
+        syndicated = "Republished from Partner News. " + article + " Copyright Partner News."
+        unrelated = " ".join(
+            f"Chapter {i} covers how markets, banks and traders priced bond issue {i * 5} during {i + 2} decades."
+            for i in range(60)
+        )
+
+        index = ContentIndex(use_redis=False)
+        original = content_fingerprint(article)
+        index.add(original, simhash(article))
+        assert index.find(content_fingerprint(article.upper()), simhash(article)) == original
+        assert index.find(content_fingerprint(syndicated), simhash(syndicated)) == original
+        assert index.find(content_fingerprint(unrelated), simhash(unrelated)) is None
+
+        print("✅ Duplicate detection test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Duplicate detection test failed: {str(e)}")
+        assert False
+
+def test_url_batch():
+    """Test batch URL deduplication and per-URL errors."""
+    print("📚 Testing URL batch...")
+
+    try:
+        import asyncio
+        from smart_quiz_api.services.scraper_services.interface import (
+            dedupe_urls, scrape_and_generate_quiz_many
+        )
+
+        groups = dedupe_urls([
+            "https://example.com/a?utm_source=mail", "https://www.example.com/a", "https://example.com/b", ""
+        ])
+        assert list(groups) == ["https://example.com/a", "https://example.com/b"]
+        assert groups["https://example.com/a"] == ["https://example.com/a?utm_source=mail", "https://www.example.com/a"]
+
+        async def collect() -> List[Dict[str, Any]]:
+            return [r async for r in scrape_and_generate_quiz_many(["not a url", "ftp://example.com/x", "not a url"])]
+
+        results = asyncio.run(collect())
+        assert len(results) == 2 and all(r["status"] == "error" and r["error"] for r in results)
+
+        print("✅ URL batch test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ URL batch test failed: {str(e)}")
+        assert False
+
+def test_combined_generation():
+    """Test single-call topic + questions generation and its two-call fallback."""
+    print("🧩 Testing combined generation...")
+
+    try:
+        from smart_quiz_api.services.scraper_services import quiz_generator
+        from smart_quiz_api.services.scraper_services.stages import StageReport
+
+        combined = '{"topic": "Geology", "questions": [{"question": "Q?", "options": ["A", "B"], "answer": "A"}]}'
+        assert quiz_generator.combined_topic(f"```json\n{combined}\n```") == "Geology"
+        assert quiz_generator.combined_topic('{"topic": "Geology", "questions": []}') is None
+        assert quiz_generator.combined_topic("Failed to generate quiz. Error: timeout") is None
+        for topic in (
+            "Information Technology", "International Relations", "Theology", "Thermodynamics", "Hereditary Diseases"
+        ):
+            assert quiz_generator.combined_topic(combined.replace("Geology", topic)) == topic, topic
+        for prose in (
+            "I think it is Geology", "Here is the topic", "This text is about rocks", "The topic is Geology", "Geology."
+        ):
+            assert quiz_generator.combined_topic(combined.replace("Geology", prose)) is None, prose
+
+        article = " ".join(f"Glaciers carved valley {i} over thousands of years of slow erosion." for i in range(40))
+        prompts: List[str] = []
+        original_call, original_classify = quiz_generator.call_openai, quiz_generator.classify_topic
+        original_local = quiz_generator.local_topic
+
+        def fake_call(prompt: str, model: str = "", max_tokens: int = 700) -> str:
+            prompts.append(prompt)
+            return responses.pop(0)
+
+        quiz_generator.call_openai = fake_call
+        quiz_generator.classify_topic = lambda text: "Earth Science"
+        quiz_generator.local_topic = lambda text: None
+        try:
+            responses = [combined]
+            result = quiz_generator._build_quiz("https://example.com/a", "MCQ", article, "gpt-4o", False, StageReport())
+            assert result["topic"] == "Geology" and result["quiz"] == combined and len(prompts) == 1
+
+            responses = ["Here is your quiz: 1. Q? A", "1. Q? A"]
+            result = quiz_generator._build_quiz("https://example.com/b", "MCQ", article, "gpt-4o", False, StageReport())
+            assert result["topic"] == "Earth Science" and result["quiz"] == "1. Q? A" and len(prompts) == 3
+        finally:
+            quiz_generator.call_openai, quiz_generator.classify_topic = original_call, original_classify
+            quiz_generator.local_topic = original_local
+
+        print("✅ Combined generation test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Combined generation test failed: {str(e)}")
+        assert False
+
+def test_topic_model():
+    """Test the local topic model and its confidence gate."""
+    print("🏷️ Testing local topic model...")
+
+    try:
+        import json
+        from smart_quiz_api.services.scraper_services.topic_model import TopicModel, get_topic_model, predict_topic
+
+        model = get_topic_model()
+        assert model is not None, "shipped topic weights must load"
+        sports = (
+            "The striker scored twice as the team won the league match; "
+            "the coach praised every player in the stadium."
+        )
+        assert model.predict(sports).topic == "Sports"
+        assert predict_topic(sports, 0.5) == "Sports"
+        recipe = "Whisk the eggs with sugar, fold in the flour and bake until golden."
+        assert model.predict(recipe).confidence < 0.5 and predict_topic(recipe, 0.5) is None
+
+        # Held-out sample, never used to tune the weights
+        holdout = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "topic_holdout.jsonl")
+        with open(holdout, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        correct = sum(model.predict(row["text"]).topic == row["topic"] for row in rows)
+        assert len(rows) >= 30 and correct / len(rows) >= 0.8, f"held-out accuracy {correct}/{len(rows)}"
+
+        tiny = TopicModel({"A": {"planet": 1.0}, "B": {"market": 1.0}}, background=1.0)
+        assert tiny.predict("Planets orbit; the planet turns.").topic == "A"
+
+        print("✅ Local topic model test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Local topic model test failed: {str(e)}")
+        assert False
+
+def test_readability():
+    """Test the in-house readability engine and batch difficulty estimation."""
+    print("📏 Testing readability engine...")
+
+    try:
+        from smart_quiz_api.services.scraper_services import readability
+        from smart_quiz_api.utils.text_analysis import tokenize
+        from smart_quiz_api.services.scraper_services.difficulty_estimator import (
+            estimate_difficulty, estimate_difficulty_batch
+        )
+
+        expected = {"make": 1, "table": 2, "jumped": 1, "wanted": 2, "boxes": 2, "piano": 3, "being": 2, "nation": 2}
+        assert {word: readability.count_syllables(word) for word in expected} == expected
+
+        simple = "The cat sat on the mat. The dog ran to the park. We all had fun in the sun. " * 12
+        dense = ("Institutional considerations notwithstanding, the administration's comprehensive "
+                 "reorganization necessitated extraordinary interdepartmental coordination. ") * 12
+        single = [readability.score_text(text) for text in (simple, dense, "")]
+        assert readability.score_texts([simple, dense, ""]) == single
+        assert single[0].sentences == 36 and single[0].words == 228 and single[2].words == 0
+        assert single[0].flesch_kincaid_grade < 3 < 15 < single[1].flesch_kincaid_grade
+        assert readability._score_tokens(tokenize(dense)) == single[1], "numpy and per-word paths differ"
+
+        assert estimate_difficulty_batch([simple, dense, "short"]) == ["easy", "hard", "medium"]
+        assert estimate_difficulty(dense) == "hard"
+
+        print("✅ Readability engine test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Readability engine test failed: {str(e)}")
+        assert False
+
+def test_text_analysis():
+    """Test the shared per-document text analysis and the utils built on it."""
+    print("🔬 Testing text analysis...")
+
+    try:
+        from smart_quiz_api.utils.text_analysis import analyze
+        from smart_quiz_api.utils.text_utils import extract_keywords, validate_quiz_text
+        from smart_quiz_api.services.scraper_services.quiz_generator import make_snippet
+
+        text = "Glaciers carve valleys. Rivers don't stop! Glaciers move slowly, and glaciers melt? Yes."
+        analysis = analyze(text)
+        assert analyze(text) is analysis, "analysis must be memoized per text"
+        assert analysis.words[:5] == ["glaciers", "carve", "valleys", "rivers", "dont"]
+        assert analysis.word_count == 13 and analysis.unique_word_count == 11
+        assert analysis.sentence_ends == [23, 42, 83, 88]
+        tricky = 'The U.S. economy grew 3.5 percent. "Good," said Dr. Lee of example.com. Rates rose.'
+        assert [tricky[:end] for end in analyze(tricky).sentence_ends] == [
+            "The U.S. economy grew 3.5 percent.", tricky[:-12], tricky
+        ]
+        assert analysis.last_sentence_end(24, 60) == 42 and analysis.last_sentence_end(43, 80) is None
+        assert extract_keywords(text, 1) == ["glaciers"]
+        assert validate_quiz_text(text, min_words=5)[0] and not validate_quiz_text(text, min_words=50)[0]
+
+        article = "A sentence of about forty characters here. " * 60
+        snippet = make_snippet(article)
+        assert 1400 < len(snippet) <= 1601 and snippet.endswith(".")
+
+        print("✅ Text analysis test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Text analysis test failed: {str(e)}")
+        assert False
+
+def test_chunked_generation():
+    """Test long-document mode: sentence-aligned chunks, concurrent calls, merged questions."""
+    print("📚 Testing chunked generation...")
+
+    try:
+        import json
+        import threading
+        import time
+        from smart_quiz_api.services.scraper_services import quiz_generator
+        from smart_quiz_api.services.scraper_services.chunked_generation import merge_questions, parse_questions
+        from smart_quiz_api.services.scraper_services.stages import StageReport
+        from smart_quiz_api.utils import analyze, split_text_into_chunks
+
+        chunks = split_text_into_chunks("First sentence here. Second one! Third? " * 4, 45)
+        assert all(len(c) <= 45 and c[-1] in ".!?" for c in chunks), chunks
+        # Chunks are cut from the text as-is: decimals, abbreviations and domains are not sentence ends
+        text = "The U.S. economy grew 3.5 percent, per example.com data. Dr. Lee agreed.  Rates  held."
+        assert split_text_into_chunks(text, 60) == [
+            "The U.S. economy grew 3.5 percent, per example.com data.", "Dr. Lee agreed.  Rates  held."
+        ]
+        assert split_text_into_chunks(text) == [text]
+        long = split_text_into_chunks("word " * 30 + "x" * 30, 20)
+        assert all(len(c) <= 20 for c in long[:-1]) and long[-1] == "x" * 30
+        assert " ".join(long).split() == ["word"] * 30 + ["x" * 30]
+
+        good = {"question": "Which glacier carved the fjord?", "options": ["A", "B"], "answer": "A"}
+        bad = {"question": "Which option?", "options": ["A", "B"], "answer": "C"}
+        assert parse_questions(json.dumps({"questions": [good, bad]})) == [good]
+        repeat = dict(good, question="Which glacier carved the fjord ?")
+        other = {"question": "How fast do rivers erode rock?", "answer": "Slowly"}
+        merged = merge_questions([[good], [repeat, other]], 5, analyze("glacier fjord glacier river"))
+        assert merged == [good, other], merged
+
+        article = " ".join(
+            f"Glaciers carved valley number {i} over thousands of years of slow erosion." for i in range(120)
+        )
+        prompts: List[str] = []
+        in_flight, peak = [0], [0]
+        lock = threading.Lock()
+        original_call, original_local = quiz_generator.call_openai, quiz_generator.local_topic
+
+        def fake_call(prompt: str, model: str = "", max_tokens: int = 700) -> str:
+            with lock:
+                prompts.append(prompt)
+                part = len(prompts)
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.2)
+            with lock:
+                in_flight[0] -= 1
+            return json.dumps({"questions": [
+                {"question": f"Which {subject} {verb} part {part}?", "options": ["Yes", "No"], "answer": "Yes"}
+                for subject in ("glacier", "river", "ice sheet", "moraine") for verb in ("formed", "eroded")
+            ]})
+
+        quiz_generator.call_openai = fake_call
+        quiz_generator.local_topic = lambda text: "Earth Science"
+        try:
+            result = quiz_generator._build_quiz(
+                "https://example.com/long", "MCQ", article, "gpt-4o", False, StageReport(), num_questions=20
+            )
+        finally:
+            quiz_generator.call_openai, quiz_generator.local_topic = original_call, original_local
+
+        questions = json.loads(result["quiz"])["questions"]
+        assert len(questions) == 20 and result["topic"] == "Earth Science"
+        assert len(prompts) >= 3 and peak[0] > 1, f"{len(prompts)} chunk calls, {peak[0]} at once"
+        assert "valley number 119" in " ".join(prompts), "the end of the article must be quizzed"
+
+        print("✅ Chunked generation test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Chunked generation test failed: {str(e)}")
+        assert False
+
+def test_context_selection():
+    """Test salience-based prompt context and its token report."""
+    print("✂️ Testing context selection...")
+
+    try:
+        from smart_quiz_api.services.openai_service import estimate_tokens
+        from smart_quiz_api.services.scraper_services.context_selector import select_context
+        from smart_quiz_api.services.scraper_services.stages import StageReport
+
+        facts = [
+            f"The Roman legion {n} marched from Londinium to Eboracum in the year {100 + n} under General Agricola."
+            for n in range(40)
+        ]
+        text = "Share this article. Subscribe to our newsletter today. " + " ".join(facts)
+        snippet = text[:1600]
+        selection = select_context(text, 120, "gpt-4o", snippet)
+        assert "Share this" not in selection.text and "Subscribe" not in selection.text
+        assert selection.tokens <= 120 and selection.tokens == estimate_tokens(selection.text, "gpt-4o")
+        assert selection.tokens_saved == estimate_tokens(snippet, "gpt-4o") - selection.tokens > 0
+        chosen = [facts.index(sentence + ".") for sentence in selection.text.split(". ") if sentence + "." in facts]
+        assert chosen == sorted(chosen), "sentences must keep their article order"
+
+        # Sentences with decimals and abbreviations are scored and sent whole, never as fragments
+        units = [
+            f"In {1990 + n} the U.S. Navy moved fleet {n} to a base {n}.5 miles from Pearl Harbor, Dr. Nimitz said."
+            for n in range(40)
+        ]
+        selection = select_context(" ".join(units), 150, "gpt-4o", "")
+        picked = [unit for unit in units if unit in selection.text]
+        assert picked and selection.text == " ".join(picked), selection.text
+
+        short = "Rivers carve canyons over millions of years of steady erosion."
+        assert select_context(short, 120, "gpt-4o", short).text == short
+
+        report = StageReport()
+        report.count("context_tokens_saved", 40)
+        report.count("context_tokens_saved", 2)
+        assert report.counters == {"context_tokens_saved": 42} and "context_tokens_saved=42" in report.summary()
+
+        print("✅ Context selection test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Context selection test failed: {str(e)}")
+        assert False
+
+def test_content_store():
+    """Test the on-disk content store and offline regeneration from it."""
+    print("🗄️ Testing content store...")
+
+    try:
+        import io
+        import json
+        import os
+        import tempfile
+        from contextlib import redirect_stderr, redirect_stdout
+        from smart_quiz_api.services.scraper_services import content_store as store_module, quiz_generator, regenerate
+        from smart_quiz_api.services.scraper_services.content_store import ContentStore
+
+        with tempfile.TemporaryDirectory() as root:
+            store = ContentStore(root, max_bytes=10 * 1024 * 1024)
+            html = "<html><body>" + "<p>Glaciers carve valleys.</p>" * 200 + "</body></html>"
+            text = "Glaciers carve valleys over thousands of years of slow and steady erosion. " * 30
+            digest = store.put(["https://www.example.com/a?utm_source=x", None], html, text, "https://example.com/a")
+            assert store.put(["https://example.com/copy"], html, text) == digest, "same content, same object"
+            assert len(os.listdir(os.path.join(root, "objects", digest[:2]))) == 2
+            stored = store.get("https://example.com/a")
+            assert stored is not None and stored.text == text and stored.canonical_link == "https://example.com/a"
+            assert store.get_html(digest) == html and store.get("https://example.com/missing") is None
+            assert sorted(store.urls()) == ["https://example.com/a", "https://example.com/copy"]
+
+            original_mmap = store_module.MMAP_MIN_BYTES
+            store_module.MMAP_MIN_BYTES = 1
+            try:
+                assert store.get("https://example.com/copy").text == text, "memory-mapped read"
+            finally:
+                store_module.MMAP_MIN_BYTES = original_mmap
+
+            # LRU: reading "a" keeps it, the other page is evicted once the store is over its limit
+            small = ContentStore(os.path.join(root, "small"), max_bytes=int(store.size() * 2.5))
+            for n in range(3):
+                small.put([f"https://example.com/{n}"], html + str(n), text + str(n))
+                small.get("https://example.com/0")
+            assert small.get("https://example.com/0") is not None and small.get("https://example.com/1") is None
+            assert small.size() <= small.max_bytes
+
+            prompts = []
+            original = (
+                quiz_generator.call_openai, quiz_generator.local_topic,
+                quiz_generator.content_store, regenerate.content_store,
+            )
+            quiz_generator.call_openai = lambda prompt, model="", max_tokens=700: prompts.append(prompt) or "1. Q? A"
+            quiz_generator.local_topic = lambda text: "Earth Science"
+            quiz_generator.content_store = regenerate.content_store = store
+            try:
+                result = quiz_generator.generate_quiz_from_url(
+                    "https://example.com/a", "TF", use_cache=False, offline=True
+                )
+                assert result["quiz"] == "1. Q? A" and result["topic"] == "Earth Science" and len(prompts) == 1
+                try:
+                    quiz_generator.generate_quiz_from_url("https://example.com/missing", use_cache=False, offline=True)
+                    assert False, "missing content must raise"
+                except ValueError:
+                    pass
+
+                out = io.StringIO()
+                with redirect_stdout(out), redirect_stderr(io.StringIO()):
+                    assert regenerate.main(["--quiz-type", "TF"]) == 0
+                lines = [json.loads(line) for line in out.getvalue().splitlines()]
+                assert sorted(line["url"] for line in lines) == ["https://example.com/a", "https://example.com/copy"]
+                assert all(line["status"] == "ok" for line in lines)
+            finally:
+                (quiz_generator.call_openai, quiz_generator.local_topic,
+                 quiz_generator.content_store, regenerate.content_store) = original
+
+        print("✅ Content store test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Content store test failed: {str(e)}")
+        assert False
+
+def test_feed_ingestion():
+    """Test feed/sitemap parsing and background quiz ingestion with rate limits, against a local server."""
+    print("📰 Testing feed ingestion...")
+
+    try:
+        import asyncio
+        import gzip
+        import threading
+        from collections import deque
+        import time
+        from email.utils import formatdate
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from smart_quiz_api.services import feed_ingestion
+        from smart_quiz_api.services.feed_ingestion import FeedIngestor, parse_date, parse_feed
+
+        now = time.time()
+        assert parse_date("Tue, 10 Jun 2003 04:00:00 GMT") == 1055217600.0
+        assert parse_date("2003-06-10T04:00:00Z") == 1055217600.0 and parse_date("soon") is None
+
+        pages: Dict[str, bytes] = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = pages.get(self.path)
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "application/xml")
+                self.end_headers()
+                self.wfile.write(body or b"")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        pages["/rss.xml"] = f"""<?xml version="1.0"?><rss version="2.0"><channel>
+            <image><url>{base}/logo.png</url></image>
+            <item><link>/news/1</link><pubDate>{formatdate(now - 600, usegmt=True)}</pubDate></item>
+            <item><link>{base}/news/2</link><pubDate>{formatdate(now - 60, usegmt=True)}</pubDate></item>
+            <item><link>{base}/news/stored</link></item>
+            <item><link>{base}/news/old</link><pubDate>{formatdate(now - 30 * 86400, usegmt=True)}</pubDate></item>
+        </channel></rss>""".encode()
+        pages["/sitemap-index.xml"] = f"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+            <sitemap><loc>{base}/sitemap-news.xml.gz</loc></sitemap></sitemapindex>""".encode()
+        pages["/sitemap-news.xml.gz"] = gzip.compress(f"""<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+            <url><loc>{base}/news/3</loc></url>
+            <url><loc>{base}/news/1?utm_source=sitemap</loc></url></urlset>""".encode())
+        atom = b"""<feed xmlns="http://www.w3.org/2005/Atom"><entry><link rel="edit" href="/e"/>
+            <link href="https://example.com/a"/><updated>2003-06-10T04:00:00Z</updated></entry></feed>"""
+        assert parse_feed(atom, "https://example.com/feed") == (
+            [feed_ingestion.FeedEntry("https://example.com/a", 1055217600.0)], []
+        )
+
+        generated: List[str] = []
+        stored: List[str] = []
+
+        async def fake_many(urls, quiz_type="MCQ"):
+            for url in urls:
+                generated.append(url)
+                if url.endswith("/news/3"):
+                    yield {"url": url, "duplicates": [], "status": "error", "error": "boom"}
+                else:
+                    yield {"url": url, "duplicates": [], "status": "ok", "quiz": {"quiz": "1. Q? A"}}
+
+        original = feed_ingestion.scrape_and_generate_quiz_many
+        feed_ingestion.scrape_and_generate_quiz_many = fake_many
+        try:
+            ingestor = FeedIngestor([f"{base}/rss.xml", f"{base}/sitemap-index.xml", f"{base}/missing.xml"],
+                                    max_per_minute=2, daily_budget=3)
+            ingestor._in_library = lambda urls: {url for url in urls if url.endswith("/stored")}
+            ingestor._store = lambda url, quiz_data: stored.append(url)
+
+            assert asyncio.run(ingestor.run_once()) == 2, "two URLs a minute"
+            # /news/1 is listed twice, /news/stored is in the library, /news/old is too old; newest first
+            assert generated == [f"{base}/news/2", f"{base}/news/1"] and stored == generated
+            stats = ingestor.stats()
+            assert stats["backlog"] == 1 and stats["generated_last_hour"] == 2 and stats["allowance"] == 0
+            assert stats["already_in_library"] == 1
+            rss, sitemap, missing = stats["feeds"]
+            assert rss["generated"] == 2 and 60 <= rss["avg_lag_seconds"] < 660 and rss["max_lag_seconds"] >= 600
+            assert sitemap["pending"] == 1 and sitemap["oldest_pending_seconds"] is not None
+            assert missing["last_error"] and missing["discovered"] == 0
+
+            assert asyncio.run(ingestor.drain()) == 0, "rate limited"
+            assert ingestor.allowance(time.time() + 61) == 1, "daily budget leaves one more"
+            ingestor._started = deque(t - 61 for t in ingestor._started)
+            assert asyncio.run(ingestor.drain()) == 0 and ingestor.stats()["feeds"][1]["failed"] == 1
+            assert ingestor.allowance() == 0 and ingestor.stats()["backlog"] == 0
+
+            for state in ingestor.feeds.values():
+                state.last_polled = None
+            assert asyncio.run(ingestor.poll_due_feeds()) == 0, "seen URLs are not queued again"
+        finally:
+            feed_ingestion.scrape_and_generate_quiz_many = original
+            server.shutdown()
+
+        print("✅ Feed ingestion test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Feed ingestion test failed: {str(e)}")
+        assert False
+
+def test_cloze_generation():
+    """Test LLM-free cloze questions, mode=local and the degraded-mode fallback."""
+    print("🕳️ Testing cloze generation...")
+
+    try:
+        import json
+        from smart_quiz_api.services.quiz_library import questions_from_text
+        from smart_quiz_api.services.scraper_services import quiz_generator
+        from smart_quiz_api.services.scraper_services.cloze_generator import BLANK, generate_cloze
+        from smart_quiz_api.services.scraper_services.context_selector import split_sentences
+        from smart_quiz_api.services.scraper_services.stages import StageReport
+
+        data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "topic_eval.jsonl")
+        with open(data, encoding="utf-8") as f:
+            article = " ".join(json.loads(line)["text"] for line in f if line.strip())
+
+        mcq = questions_from_text(generate_cloze(article, "MCQ"))
+        assert len(mcq) == 5 and generate_cloze(article, "MCQ") == generate_cloze(article, "MCQ"), "deterministic"
+        for q in mcq:
+            assert BLANK in q["question"] and q["answer"] in q["options"] and len(set(q["options"])) == 4
+            assert q["answer"].lower() not in q["question"].lower().split()
+        tf = questions_from_text(generate_cloze(article, "TF", 6))
+        assert len(tf) == 6 and {q["answer"] for q in tf} == {"True", "False"}
+        assert generate_cloze("Too short.", "MCQ") is None
+
+        # Decimals and abbreviations stay inside their sentence: every question is a whole source sentence
+        news = (
+            "The Federal Reserve raised rates by 0.25 points in March 2023, "
+            "said Jerome Powell at the U.S. central bank meeting. "
+            "Officials expected inflation to slow to 3.5 percent by the end of the year, "
+            "according to Dr. Lee of the bank. "
+            "Markets in New York rallied after the announcement, and bond yields fell across the U.S. Treasury curve. "
+            "Analysts at example.com noted that the rate increase was the ninth in a row since early 2022. "
+            "Mortgage rates rose to 6.8 percent, their highest level since 2008, "
+            "squeezing buyers in most American cities."
+        )
+        sentences = split_sentences(news)
+        assert len(sentences) == 5 and all(sentence in news for sentence in sentences), sentences
+        cloze = questions_from_text(generate_cloze(news, "MCQ", 5))
+        assert cloze
+        for q in cloze:
+            filled = q["question"].removeprefix("Fill in the blank: ").replace(BLANK, q["answer"])
+            assert filled in sentences, filled
+
+        calls: List[str] = []
+
+        def failing_call(prompt: str, model: str = "", max_tokens: int = 700) -> str:
+            calls.append(prompt)
+            raise TimeoutError("LLM down")
+
+        original_call, original_classify = quiz_generator.call_openai, quiz_generator.classify_topic
+        quiz_generator.call_openai = failing_call
+        quiz_generator.classify_topic = lambda text: "General Knowledge"
+        try:
+            report = StageReport()
+            result = quiz_generator._build_quiz(
+                "https://example.com/a", "TF", article, "gpt-4o", False, report, mode="local"
+            )
+            assert not calls and result["generator"] == "local" and "degraded" not in result
+            assert len(questions_from_text(result["quiz"])) == 10 and "cloze" in report.summary()
+
+            result = quiz_generator._build_quiz(
+                "https://example.com/b", "MCQ", article[:3000], "gpt-4o", False, StageReport()
+            )
+            assert calls, "AI mode tries the LLM first"
+            assert result["generator"] == "local" and result["degraded"] is True
+            assert len(questions_from_text(result["quiz"])) == 5
+        finally:
+            quiz_generator.call_openai, quiz_generator.classify_topic = original_call, original_classify
+
+        print("✅ Cloze generation test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Cloze generation test failed: {str(e)}")
+        assert False
+
+def test_image_assets():
+    """
+    Test the IMAGE quiz asset pipeline (candidates, download, thumbnail,
+    store, attach, serve) against a local server.
+    """
+    print("🖼️ Testing image assets...")
+
+    try:
+        import asyncio
+        import json
+        import re
+        import struct
+        import tempfile
+        import threading
+        import zlib
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import httpx
+        from fastapi import FastAPI
+        from smart_quiz_api.routers.quiz_router import router as quiz_router
+        from smart_quiz_api.services.quiz_library import questions_from_text
+        from smart_quiz_api.services.scraper_services import image_assets, image_store, quiz_generator
+        from smart_quiz_api.services.scraper_services.image_assets import (
+            IMAGE_NAME, attach_images, collect_images, image_candidates
+        )
+        from smart_quiz_api.services.scraper_services.image_processing import (
+            THUMBNAIL_SIZE, make_thumbnail, sniff_image
+        )
+        from smart_quiz_api.services.scraper_services.stages import StageCache, StageReport
+
+        def png(width: int, height: int, shade: int) -> bytes:
+            def chunk(kind: bytes, data: bytes) -> bytes:
+                return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+            rows = b"".join(b"\x00" + bytes([shade, 128, 255 - shade]) * width for _ in range(height))
+            header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+            return (
+                b"\x89PNG\r\n\x1a\n"
+                + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+            )
+
+        assert sniff_image(png(160, 120, 0)) == ("png", 160, 120)
+        assert sniff_image(b"GIF89a" + struct.pack("<HH", 300, 200) + b"\x00" * 8) == ("gif", 300, 200)
+        jpeg = b"\xff\xd8\xff\xe0\x00\x04\x00\x00\xff\xc0\x00\x11\x08" + struct.pack(">HH", 600, 800) + b"\x00" * 12
+        assert sniff_image(jpeg) == ("jpeg", 800, 600)
+        webp = b"RIFF\x00\x00\x00\x00WEBPVP8X" + b"\x00" * 8 + (639).to_bytes(3, "little") + (479).to_bytes(3, "little")
+        assert sniff_image(webp) == ("webp", 640, 480) and sniff_image(b"<html>") is None
+        for unusable in (png(40, 40, 0), b"not an image"):
+            try:
+                make_thumbnail(unusable)
+                assert False, "unusable images are rejected"
+            except ValueError:
+                pass
+
+        files = {
+            "/img/hero.png": ("image/png", png(320, 200, 10)),
+            "/img/chart.png": ("image/png", png(400, 300, 200)),
+            "/img/copy.png": ("image/png", png(320, 200, 10)),
+            "/img/tiny.png": ("image/png", png(40, 30, 0)),
+            "/img/page.png": ("text/html", b"<html></html>"),
+        }
+        requested: List[str] = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requested.append(self.path)
+                media_type, body = files.get(self.path, ("text/plain", b""))
+                self.send_response(200 if self.path in files else 404)
+                self.send_header("Content-Type", media_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        page = f"""<html><head><meta property="og:image" content="{base}/img/hero.png"></head><body>
+            <img src="/static/site-logo.png" alt="Logo"><img src="/img/spacer.gif" width="1" height="1">
+            <img src="data:image/png;base64,AAAA"><img src="/img/diagram.svg">
+            <img src="/img/hero.png" alt="Mountain glacier at dawn">
+            <img data-src="/img/tiny.png" alt="Thumbnail strip"><img src='/img/page.png'>
+            <img srcset="/img/small.png 200w, /img/chart.png 640w, /img/large.png 1600w" src="/img/small.png"
+                 alt="Chart of glacier retreat since 1900">
+            <img src="/img/copy.png" alt="Same picture again"></body></html>"""
+        article = f"{base}/news/glaciers"
+
+        candidates = image_candidates(page, article)
+        assert [c.url[len(base):] for c in candidates] == [
+            "/img/hero.png", "/img/tiny.png", "/img/page.png", "/img/chart.png", "/img/copy.png"
+        ], "share image first; logos, spacers, data URIs and SVGs skipped; the srcset source fitting THUMBNAIL_SIZE"
+        assert candidates[0].alt == "Mountain glacier at dawn", "alt text of the matching <img>"
+
+        original_root = image_store.root
+        try:
+            with tempfile.TemporaryDirectory() as root:
+                image_store.root = root
+                cache, report = StageCache(use_redis=False), StageReport()
+                assets = collect_images(page, article, 3, cache, report)
+                # tiny.png is too small and page.png is not an image; copy.png has the same bytes as hero.png
+                assert [a["source_url"][len(base):] for a in assets] == ["/img/hero.png", "/img/chart.png"]
+                for asset in assets:
+                    name = asset["url"].rsplit("/", 1)[-1]
+                    assert asset["url"].startswith("/quiz/images/")
+                    assert IMAGE_NAME.match(name) and image_store.exists(name)
+                    assert max(asset["width"], asset["height"]) <= THUMBNAIL_SIZE
+                assert report.counters["images"] == 2 and "images=miss" in report.summary()
+
+                requested.clear()
+                report = StageReport()
+                assert collect_images(page, article, 3, cache, report) == assets
+                assert sorted(requested) == ["/img/page.png", "/img/tiny.png"], "stored images are not downloaded again"
+
+                quiz = json.dumps({"questions": [
+                    {
+                        "question": "How far has the glacier retreat gone since 1900?",
+                        "options": ["1 km", "5 km"], "answer": "5 km",
+                    },
+                    {"question": "Which gas traps heat?", "options": ["CO2", "Argon"], "answer": "CO2"},
+                    {"question": "What carves valleys?", "options": ["Ice", "Wind"], "answer": "Ice"},
+                ]})
+                questions = questions_from_text(attach_images(quiz, assets))
+                assert questions[0]["image"]["url"] == assets[1]["url"], "best alt-text match"
+                assert questions[1]["image"]["url"] == assets[0]["url"], "unused image before reuse"
+                assert set(questions[2]["image"]) == {"url", "width", "height"}
+                assert attach_images("1. Q? A", assets) == "1. Q? A"
+
+                text_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "topic_eval.jsonl")
+                with open(text_path, encoding="utf-8") as f:
+                    text = " ".join(json.loads(line)["text"] for line in f if line.strip())
+                result = quiz_generator._build_quiz(
+                    article, "IMAGE", text, "gpt-4o", False, StageReport(), mode="local", html=page
+                )
+                assert [a["url"] for a in result["images"]] == [a["url"] for a in assets]
+                assert all(q["image"]["url"] in {a["url"] for a in assets} for q in questions_from_text(result["quiz"]))
+                result = quiz_generator._build_quiz(
+                    article, "MCQ", text, "gpt-4o", False, StageReport(), mode="local", html=page
+                )
+                assert "images" not in result
+
+                # Offline regeneration reuses stored thumbnails and never touches the network
+                def no_network(*args: Any, **kwargs: Any) -> None:
+                    raise AssertionError("offline regeneration downloaded an image")
+
+                original_download, original_stage_cache = image_assets.download_image, quiz_generator.stage_cache
+                image_assets.download_image = no_network
+                requested.clear()
+                try:
+                    cases = ((cache, [a["url"] for a in assets]), (StageCache(use_redis=False), []))
+                    for stage_cache, expected in cases:
+                        quiz_generator.stage_cache = stage_cache
+                        result = quiz_generator._build_quiz(
+                            article, "IMAGE", text, "gpt-4o", False, StageReport(),
+                            mode="local", html=page, offline=True,
+                        )
+                        assert [a["url"] for a in result.get("images", [])] == expected
+                finally:
+                    image_assets.download_image, quiz_generator.stage_cache = original_download, original_stage_cache
+                assert requested == []
+
+                app = FastAPI()
+                app.include_router(quiz_router, prefix="/quiz")
+
+                async def serve() -> None:
+                    transport = httpx.ASGITransport(app=app)
+                    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                        response = await client.get(assets[0]["url"])
+                        assert response.status_code == 200
+                        assert sniff_image(response.content)[1:] == (assets[0]["width"], assets[0]["height"])
+                        assert "immutable" in response.headers["cache-control"]
+                        etag = response.headers["etag"]
+                        assert re.fullmatch(r'"[0-9a-f]{64}"', etag)
+                        assert (await client.get(assets[0]["url"], headers={"If-None-Match": etag})).status_code == 304
+                        assert (await client.get("/quiz/images/" + "0" * 64 + ".png")).status_code == 404
+                        assert (await client.get("/quiz/images/..%2Fsecret.png")).status_code == 404
+
+                asyncio.run(serve())
+        finally:
+            image_store.root = original_root
+            server.shutdown()
+
+        print("✅ Image assets test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Image assets test failed: {str(e)}")
+        assert False
+
+def test_server_timing():
+    """Test per-stage Server-Timing headers and structured log fields on the generate routes."""
+    print("⏱️ Testing Server-Timing...")
+
+    try:
+        import asyncio
+        import importlib
+        import json
+        import httpx
+        from smart_quiz_api.main import app
+        from smart_quiz_api.services import quiz_pool as quiz_pool_module
+        from smart_quiz_api.services.scraper_services.stages import StageReport
+
+        # The routers package re-exports the router object under the module's name
+        quiz_router = importlib.import_module("smart_quiz_api.routers.quiz_router")
+        report = StageReport()
+        report.record("fetch", False, 0.8124)
+        report.record("generate", True, 0.001)
+        report.record("generate", False, 0.5)
+        report.count("images", 2)
+        assert report.server_timing() == (
+            'fetch;desc="miss";dur=812.4, generate;desc="hit";dur=1.0, generate;desc="miss";dur=500.0'
+        )
+        assert report.log_fields() == {
+            "stage_ms": {"fetch": 812.4, "generate": 501.0},
+            "stage_hit": {"fetch": False, "generate": False},
+            "stage_counters": {"images": 2},
+        }
+
+        records: List[logging.LogRecord] = []
+
+        class Capture(logging.Handler):
+            def emit(self, record: logging.LogRecord) -> None:
+                records.append(record)
+
+        handler = Capture()
+        router_logger = logging.getLogger(quiz_router.__name__)
+        router_logger.addHandler(handler)
+        level = router_logger.level
+        router_logger.setLevel(logging.INFO)
+        library: Dict[str, Any] = {}
+        quiz = json.dumps([{"question": "Which planet is red?", "options": ["Mars", "Venus"], "answer": "Mars"}])
+        originals = (
+            quiz_router.get_library_payload, quiz_router.store_in_library, quiz_pool_module.safe_openai_chat
+        )
+
+        def fake_chat(prompt: str, use_cache: bool = True, report: Any = None) -> str:
+            report.record("llm", False, 0.25)
+            return quiz
+
+        quiz_router.get_library_payload = lambda db, key: library.get(key)
+        quiz_router.store_in_library = lambda db, key, payload, **kwargs: library.setdefault(key, payload) and None
+        quiz_pool_module.safe_openai_chat = fake_chat
+        try:
+            async def call() -> List[httpx.Response]:
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    params = {"topic": "Planets", "difficulty": "easy"}
+                    return [await client.get("/quiz/generate/ai", params=params) for _ in range(2)]
+
+            generated, cached = asyncio.run(call())
+            assert generated.status_code == 200 and cached.status_code == 200
+            timing = generated.headers["server-timing"]
+            for entry in (
+                'library;desc="miss"', 'llm;desc="miss";dur=250.0', 'parse;desc="miss"',
+                'store;desc="miss"', "total;dur=",
+            ):
+                assert entry in timing, entry
+            assert 'library;desc="hit"' in cached.headers["server-timing"]
+            assert "llm" not in cached.headers["server-timing"]
+            assert generated.headers["timing-allow-origin"] == "*"
+
+            logged = [r for r in records if getattr(r, "route", None) == "generate/ai"]
+            assert len(logged) == 2 and logged[0].stage_ms["llm"] == 250.0 and logged[0].stage_hit["library"] is False
+            assert logged[1].stage_hit == {"library": True} or logged[1].stage_hit == {"pool": False, "library": True}
+        finally:
+            quiz_router.get_library_payload, quiz_router.store_in_library, quiz_pool_module.safe_openai_chat = originals
+            router_logger.removeHandler(handler)
+            router_logger.setLevel(level)
+
+        print("✅ Server-Timing test passed")
+        assert True
+
+    except Exception as e:
+        print(f"❌ Server-Timing test failed: {str(e)}")
+        assert False
+
 def run_integration_tests():
     """Run all integration tests."""
     print("🚀 Starting Smart Quiz Master API Integration Tests")
@@ -286,6 +1755,29 @@ def run_integration_tests():
         ("Database Models", test_models),
         ("Routers", test_routers),
         ("Utilities", test_utils),
+        ("Serializers", test_serializers),
+        ("Quiz Library", test_quiz_library),
+        ("Quiz Pool", test_quiz_pool),
+        ("Quiz Update", test_quiz_update),
+        ("Quiz Enrichment", test_quiz_enrichment),
+        ("Quiz Tagging", test_quiz_tagging),
+        ("Content Decoding", test_content_decoding),
+        ("HTML Extraction", test_html_extraction),
+        ("Extraction Pool", test_extraction_pool),
+        ("Pipeline Stages", test_pipeline_stages),
+        ("Duplicate Detection", test_duplicate_detection),
+        ("URL Batch", test_url_batch),
+        ("Combined Generation", test_combined_generation),
+        ("Topic Model", test_topic_model),
+        ("Readability", test_readability),
+        ("Text Analysis", test_text_analysis),
+        ("Chunked Generation", test_chunked_generation),
+        ("Context Selection", test_context_selection),
+        ("Content Store", test_content_store),
+        ("Feed Ingestion", test_feed_ingestion),
+        ("Cloze Generation", test_cloze_generation),
+        ("Image Assets", test_image_assets),
+        ("Server-Timing", test_server_timing),
     ]
     
     results: List[Tuple[str, bool]] = []
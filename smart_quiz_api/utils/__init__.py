@@ -24,6 +24,13 @@ from .text_utils import (
     format_quiz_question
 )
 
+# Shared per-document text analysis
+from .text_analysis import (
+    TextAnalysis,
+    analyze,
+    tokenize
+)
+
 # Authentication utilities
 from .auth_utils import (
     verify_token,
@@ -71,6 +78,11 @@ __all__ = [
     "split_text_into_chunks",
     "validate_quiz_text",
     "format_quiz_question",
+
+    # Text analysis
+    "TextAnalysis",
+    "analyze",
+    "tokenize",
     
     # Authentication
     "verify_token",
@@ -0,0 +1,96 @@
+# smart_quiz_api/utils/text_analysis.py
+
+"""
+Single-pass analysis of one document, shared by every scraper stage.
+
+``analyze(text)`` tokenizes the text once into lowercase words and sentence
+terminators and records word counts and sentence boundaries. Keyword
+frequencies and unique-word counts are derived from the same tokens on first
+use. Results are memoized per text, so the extraction checks, the length
+check, dedupe fingerprints, topic model, readability, snippet and the text
+utils all share one tokenization instead of each calling ``text.split()``.
+"""
+
+import bisect
+import re
+from collections import Counter
+from functools import cached_property, lru_cache
+from typing import List, Optional
+
+# Apostrophes and hyphens inside words are dropped, so "don't" and "well-known" are one word
+_JOINER = re.compile(r"(?<=\w)['’\-](?=\w)")
+_TOKEN = re.compile(r"[^\W_]+|[.!?]+")
+# Terminators (and closing quotes/brackets) end a sentence only before whitespace and a
+# capitalized word, or at the end of the text: "3.5", "example.com" and "U.S. economy" do not
+_SENTENCE_END = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s+[\"'“‘(\[]?[A-Z]|\s*$)")
+_WORD_BEFORE = re.compile(r"(?<!\w)([^\W\d_]+)$")
+# Words whose period marks an abbreviation even before a capitalized word ("Dr. Smith")
+ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'vs', 'inc', 'ltd', 'co', 'corp',
+    'mt', 'gen', 'sen', 'rep', 'gov', 'col', 'capt', 'lt', 'fig', 'dept'
+})
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can'
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words and sentence terminators ("." "!?" ...), in order."""
+    return _TOKEN.findall(_JOINER.sub("", text.lower()))
+
+
+def is_terminator(token: str) -> bool:
+    return token[0] in ".!?"
+
+
+def find_sentence_ends(text: str) -> List[int]:
+    """Offsets just past each sentence end in ``text`` (terminators plus closing quotes)."""
+    ends = []
+    for match in _SENTENCE_END.finditer(text):
+        if match.group().startswith(".") and not match.group().startswith(".."):
+            # A single letter ("U.S.", "J. Smith") or a title before the period is an abbreviation
+            word = _WORD_BEFORE.search(text, max(0, match.start() - 12), match.start())
+            if word and (len(word.group(1)) == 1 or word.group(1).lower() in ABBREVIATIONS):
+                continue
+        ends.append(match.end())
+    return ends
+
+
+class TextAnalysis:
+    """Tokens, sentence boundaries and word statistics of one document."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: List[str] = tokenize(text)
+        self.words: List[str] = [token for token in self.tokens if not is_terminator(token)]
+        self.word_count = len(self.words)
+        # Offsets just past each sentence end in ``text``
+        self.sentence_ends: List[int] = find_sentence_ends(text)
+
+    @cached_property
+    def keyword_counts(self) -> Counter:
+        """Frequencies of ASCII words of 3+ letters that are not stop words."""
+        return Counter(
+            word for word in self.words
+            if len(word) >= 3 and word.isascii() and word.isalpha() and word not in STOP_WORDS
+        )
+
+    @cached_property
+    def unique_word_count(self) -> int:
+        return len(set(self.words))
+
+    def last_sentence_end(self, start: int, end: int) -> Optional[int]:
+        """The last sentence boundary in ``(start, end]``, or None."""
+        index = bisect.bisect_right(self.sentence_ends, end) - 1
+        if index >= 0 and self.sentence_ends[index] > start:
+            return self.sentence_ends[index]
+        return None
+
+
+@lru_cache(maxsize=32)
+def analyze(text: str) -> TextAnalysis:
+    """The (memoized) analysis of ``text``."""
+    return TextAnalysis(text)
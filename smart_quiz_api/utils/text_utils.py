@@ -5,7 +5,10 @@ import hashlib
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from .text_analysis import analyze
+
 TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+_WHITESPACE = re.compile(r'\s')
 
 def load_template(template_name: str) -> str:
     """Load a template file from the templates directory."""
@@ -50,66 +53,68 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     """Extract important keywords from text for quiz generation."""
     if not text:
         return []
-    
-    # Remove common stop words
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'can'
-    }
-    
-    # Extract words and filter
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    keywords = [word for word in words if word not in stop_words]
-    
-    # Count frequency and return most common
-    from collections import Counter
-    word_counts = Counter(keywords)
-    return [word for word, _ in word_counts.most_common(max_keywords)]
+
+    # Stop words are already filtered out of the shared analysis' keyword counts
+    return [word for word, _ in analyze(text).keyword_counts.most_common(max_keywords)]
 
 def generate_text_hash(text: str) -> str:
     """Generate a hash for text to use as cache key."""
     return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 def split_text_into_chunks(text: str, max_chunk_size: int = 1000) -> List[str]:
-    """Split text into chunks for processing."""
+    """
+    Split text into chunks of whole sentences; a sentence longer than a chunk is split between words.
+
+    Chunks are cut at offsets in ``text`` and only stripped, so the text inside
+    a chunk is never altered.
+    """
     if not text:
         return []
-    
-    words = text.split()
+
     chunks: List[str] = []
-    current_chunk: List[str] = []
-    current_size = 0
-    
-    for word in words:
-        if current_size + len(word) + 1 > max_chunk_size and current_chunk:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = [word]
-            current_size = len(word)
-        else:
-            current_chunk.append(word)
-            current_size += len(word) + 1
-    
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-    
+
+    def emit(start: int, end: int) -> None:
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+    start = last = 0
+    for end in analyze(text).sentence_ends + [len(text)]:
+        if len(text[start:end].strip()) > max_chunk_size:
+            if last > start:
+                emit(start, last)
+                start = last
+            # One sentence over the limit: cut it at the last whitespace that fits
+            while len(text[start:end].strip()) > max_chunk_size:
+                begin = len(text) - len(text[start:].lstrip())
+                spaces = [m.start() for m in _WHITESPACE.finditer(text, begin + 1, begin + max_chunk_size + 1)]
+                if spaces:
+                    cut = spaces[-1]
+                else:
+                    # A single word over the limit is kept whole
+                    match = _WHITESPACE.search(text, begin, end)
+                    cut = match.start() if match else end
+                emit(begin, cut)
+                start = cut
+        last = end
+    emit(start, len(text))
+
     return chunks
 
 def validate_quiz_text(text: str, min_words: int = 50) -> Tuple[bool, str]:
     """Validate if text is suitable for quiz generation."""
     if not text or not text.strip():
         return False, "Text is empty"
-    
-    word_count = len(text.split())
+
+    analysis = analyze(text)
+    word_count = analysis.word_count
     if word_count < min_words:
         return False, f"Text too short ({word_count} words, minimum {min_words})"
-    
+
     # Check for repetitive content
-    words = text.lower().split()
-    unique_words = set(words)
-    if len(unique_words) < word_count * 0.3:  # Less than 30% unique words
+    if analysis.unique_word_count < word_count * 0.3:  # Less than 30% unique words
         return False, "Text appears to be too repetitive"
-    
+
     return True, "Text is suitable for quiz generation"
 
 def format_quiz_question(question: str, options: List[str], correct_answer: str) -> str: